@@ -0,0 +1,98 @@
+"""Compare the adder strategies on the full rounding pipeline.
+
+For every ``data_bits`` and strategy the benchmark reports the qubit count,
+gate counts and depth of the decomposed pipeline, and the MPS simulation time
+per block over a fixed set of random blocks (checked against the classical
+reference).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+from qiskit_aer import AerSimulator
+
+from adders import ADDER_STRATEGIES
+from bitsliced_verify import classical_reference_arrays, split_inputs
+from main_round import OUTPUT_KEYS, ArithmeticParams, build_rounding_circuit, simulate_blocks
+from peephole import circuit_cost
+
+
+def benchmark_adder(
+    data_bits: int,
+    adder: str,
+    simulator: AerSimulator,
+    blocks: int = 64,
+    batch_size: int = 64,
+    seed: int = 0,
+) -> Dict:
+    params = ArithmeticParams(data_bits=data_bits, adder=adder)
+    circuit = build_rounding_circuit(params, load_inputs=False, fuse_qft=True)
+    entry = {"data_bits": data_bits, "adder": adder, "qubits": circuit.num_qubits}
+    entry.update(circuit_cost(circuit))
+
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, 1 << (4 * data_bits), size=blocks, dtype=np.int64)
+    inputs = split_inputs(indices, data_bits)
+    block_list = [tuple(int(v[pos]) for v in inputs) for pos in range(blocks)]
+    expected = classical_reference_arrays(*inputs, data_bits)
+
+    simulate_blocks(block_list[:1], data_bits, simulator, 1, batch_size, adder)  # build/transpile
+    t0 = time.time()
+    outputs = simulate_blocks(block_list, data_bits, simulator, 1, batch_size, adder)
+    elapsed = time.time() - t0
+    entry["sim_sec_per_block"] = elapsed / max(1, blocks)
+    entry["correct_blocks"] = sum(
+        all(out[key] == int(values[pos]) for key, values in zip(OUTPUT_KEYS, expected))
+        for pos, out in enumerate(outputs)
+    )
+    entry["blocks"] = blocks
+    return entry
+
+
+def run_benchmark(
+    data_bits: Sequence[int],
+    adders: Sequence[str],
+    blocks: int = 64,
+    batch_size: int = 64,
+    seed: int = 0,
+) -> List[Dict]:
+    simulator = AerSimulator(method="matrix_product_state")
+    return [
+        benchmark_adder(bits, adder, simulator, blocks, batch_size, seed)
+        for bits in data_bits
+        for adder in adders
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the adder strategies.")
+    parser.add_argument("--data-bits", type=int, nargs="+", default=[4], help="Logical data bits")
+    parser.add_argument(
+        "--adders", nargs="+", choices=tuple(ADDER_STRATEGIES), default=list(ADDER_STRATEGIES)
+    )
+    parser.add_argument("--blocks", type=int, default=64, help="Random blocks per setting")
+    parser.add_argument("--batch-size", type=int, default=64, help="Blocks per run call")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed")
+    parser.add_argument("--output", type=str, default=None, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.data_bits, args.adders, args.blocks, args.batch_size, args.seed)
+    for entry in results:
+        print(
+            f"data_bits={entry['data_bits']} {entry['adder']:>6}: {entry['qubits']} qubits, "
+            f"{entry['gates']} gates, depth {entry['depth']}, "
+            f"{entry['sim_sec_per_block'] * 1e3:.1f} ms/block, "
+            f"{entry['correct_blocks']}/{entry['blocks']} correct"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
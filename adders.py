@@ -0,0 +1,122 @@
+"""Adder strategies behind QMADD / QMSUB / C_QMSUB.
+
+A strategy appends ``target = target ± control (mod 2**n)`` to a circuit and
+says how many zero-initialized work qubits it needs (returned to |0>).  The
+gate builders resolve the strategy by name, so the pipeline can switch
+between the Draper QFT adder and a Toffoli ripple-carry adder through
+``ArithmeticParams.adder`` alone.
+
+* ``qft``: QFT -> MADD/MSUB -> IQFT, no work qubits; honours
+  ``approximation_degree``.
+* ``ripple``: the Cuccaro et al. MAJ/UMA ripple-carry adder with one carry
+  qubit and no carry-out (so the sum wraps mod 2**n).  Subtraction uses
+  ``t - c = ~(~t + c)``.  Only X/CX/CCX gates, which keeps MPS bond
+  dimension low and lets the permutation backend evaluate it bit by bit.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence, Type
+
+from qiskit import QuantumCircuit, QuantumRegister
+
+from qquantum_module import adder_name, iqft, madd, qft
+
+
+class AdderStrategy(ABC):
+    """Interface: ``num_ancillas``, ``block_name`` and the abstract ``append_add``."""
+
+    name = ""
+
+    def num_ancillas(self, n: int) -> int:
+        return 0
+
+    def block_name(self, base: str) -> str:
+        return f"{base}_{self.name}"
+
+    @abstractmethod
+    def append_add(
+        self,
+        qc: QuantumCircuit,
+        target: Sequence,
+        control: Sequence,
+        ancillas: Sequence,
+        subtract: bool = False,
+    ):
+        """Append ``target ±= control (mod 2**len(target))`` to ``qc``."""
+
+
+class QFTAdder(AdderStrategy):
+    name = "qft"
+
+    def __init__(self, approximation_degree: int = 0):
+        self.approximation_degree = approximation_degree
+
+    def block_name(self, base: str) -> str:
+        return adder_name(base, self.approximation_degree)
+
+    def append_add(self, qc, target, control, ancillas, subtract=False):
+        n = len(target)
+        qc.append(qft(n, self.approximation_degree), list(target))
+        qc.append(
+            madd(n, is_inverse=subtract, approximation_degree=self.approximation_degree),
+            list(target) + list(control),
+        )
+        qc.append(iqft(n, self.approximation_degree), list(target))
+
+
+class RippleCarryAdder(AdderStrategy):
+    name = "ripple"
+
+    def __init__(self, approximation_degree: int = 0):
+        if approximation_degree:
+            raise ValueError("approximation_degree only applies to the qft adder")
+
+    def num_ancillas(self, n: int) -> int:
+        return 1  # carry-in, zero before and after
+
+    @staticmethod
+    def _maj(qc, x, y, z):
+        qc.cx(z, y)
+        qc.cx(z, x)
+        qc.ccx(x, y, z)
+
+    @staticmethod
+    def _uma(qc, x, y, z):
+        qc.ccx(x, y, z)
+        qc.cx(z, x)
+        qc.cx(x, y)
+
+    def append_add(self, qc, target, control, ancillas, subtract=False):
+        n = len(target)
+        carries = [ancillas[0], *control[: n - 1]]
+        if subtract:
+            qc.x(list(target))
+        for idx in range(n):
+            self._maj(qc, carries[idx], target[idx], control[idx])
+        for idx in range(n - 1, -1, -1):
+            self._uma(qc, carries[idx], target[idx], control[idx])
+        if subtract:
+            qc.x(list(target))
+
+
+ADDER_STRATEGIES: Dict[str, Type[AdderStrategy]] = {
+    QFTAdder.name: QFTAdder,
+    RippleCarryAdder.name: RippleCarryAdder,
+}
+
+
+def get_adder_strategy(name: str = "qft", approximation_degree: int = 0) -> AdderStrategy:
+    try:
+        return ADDER_STRATEGIES[name](approximation_degree)
+    except KeyError:
+        raise ValueError(
+            f"Unknown adder '{name}'; choose from {', '.join(ADDER_STRATEGIES)}"
+        ) from None
+
+
+def work_registers(strategy: AdderStrategy, n: int) -> List[QuantumRegister]:
+    """``[QuantumRegister(k, "work")]`` if the strategy needs k > 0 work qubits."""
+    count = strategy.num_ancillas(n)
+    return [QuantumRegister(count, "work")] if count else []
@@ -0,0 +1,204 @@
+"""Gate count vs. correctness of the approximate-QFT adders.
+
+For each ``approximation_degree`` the report lists
+
+* the pipeline's controlled-phase count, gate count and depth after
+  decomposition, and what the IQFT/QFT peephole pass (``fuse_qft``) saves,
+* per adder block (QMADD/QMSUB/C_QMSUB at ``data_bits + 1`` bits): the mean
+  probability of the exact output over sampled basis inputs (``fidelity``)
+  and the fraction of inputs whose most likely output is exact,
+* for the whole pipeline: the same two numbers over random blocks simulated
+  with Aer, plus the simulation time per block.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from qiskit import QuantumCircuit, transpile
+from qiskit.quantum_info import Statevector
+from qiskit_aer import AerSimulator
+
+from bitsliced_verify import classical_reference_arrays, split_inputs
+from c_qmsub_gate import build_c_qmsub_gate
+from compositional_verify import adder_permutation, c_qmsub_permutation
+from main_round import (
+    ArithmeticParams,
+    build_rounding_circuit,
+    get_rounding_template,
+    parse_measurement,
+)
+from peephole import circuit_cost
+from qmadd_gate import build_qmadd_gate
+from qmsub_gate import build_qmsub_gate
+
+
+# name -> (builder, qubit count, exact basis map on an index array)
+ADDERS = {
+    "qmadd": (build_qmadd_gate, lambda n: 2 * n, lambda n: adder_permutation(n, 1)),
+    "qmsub": (build_qmsub_gate, lambda n: 2 * n, lambda n: adder_permutation(n, -1)),
+    "c_qmsub": (build_c_qmsub_gate, lambda n: 2 * n + 1, c_qmsub_permutation),
+}
+
+
+def pipeline_cost(data_bits: int, approximation_degree: int, fuse_qft: bool = False) -> Dict[str, int]:
+    params = ArithmeticParams(data_bits=data_bits, approximation_degree=approximation_degree)
+    return circuit_cost(build_rounding_circuit(params, load_inputs=False, fuse_qft=fuse_qft))
+
+
+def fusion_savings(data_bits: int, approximation_degree: int = 0) -> Dict[str, Dict[str, int]]:
+    """Pipeline cost with and without the IQFT/QFT peephole pass."""
+    before = pipeline_cost(data_bits, approximation_degree)
+    after = pipeline_cost(data_bits, approximation_degree, fuse_qft=True)
+    return {
+        "before": before,
+        "after": after,
+        "saved": {key: before[key] - after[key] for key in before},
+    }
+
+
+def block_fidelity(
+    name: str, n: int, approximation_degree: int, samples: int = 128, seed: int = 0
+) -> Dict[str, float]:
+    """Exact-output probability of one adder block over sampled basis inputs."""
+    builder, width, exact = ADDERS[name]
+    qc = QuantumCircuit(width(n))
+    qc.append(builder(n, approximation_degree), range(width(n)))
+    qc = transpile(qc, basis_gates=["h", "cp", "cx"], optimization_level=0)
+    targets = exact(n)
+
+    size = len(targets)
+    rng = np.random.default_rng(seed)
+    inputs = np.arange(size) if size <= samples else rng.choice(size, samples, replace=False)
+    probabilities = []
+    dominant_exact = 0
+    for index in inputs:
+        amplitudes = Statevector.from_int(int(index), size).evolve(qc).data
+        weights = np.abs(amplitudes) ** 2
+        probabilities.append(weights[targets[index]])
+        dominant_exact += int(np.argmax(weights) == targets[index])
+    return {
+        "fidelity": float(np.mean(probabilities)),
+        "exact_output_rate": dominant_exact / len(inputs),
+        "inputs": len(inputs),
+    }
+
+
+def pipeline_exactness(
+    data_bits: int,
+    approximation_degree: int,
+    simulator: AerSimulator,
+    blocks: int = 32,
+    shots: int = 256,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """Exact-output probability of the full pipeline over random input blocks."""
+    template = get_rounding_template(data_bits, simulator, approximation_degree)
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, 1 << (4 * data_bits), size=blocks, dtype=np.int64)
+    inputs = split_inputs(indices, data_bits)
+    expected = classical_reference_arrays(*inputs, data_bits)
+
+    circuits = [template.bind(*(int(v[pos]) for v in inputs)) for pos in range(blocks)]
+    t0 = time.time()
+    result = simulator.run(circuits, shots=shots, max_parallel_experiments=0).result()
+    elapsed = time.time() - t0
+
+    probabilities = []
+    dominant_exact = 0
+    for pos in range(blocks):
+        target = tuple(int(v[pos]) for v in expected)
+        counts = result.get_counts(pos)
+        hits = sum(
+            count
+            for bitstring, count in counts.items()
+            if parse_measurement(bitstring, template.params.modulus) == target
+        )
+        probabilities.append(hits / shots)
+        dominant_exact += int(template.parse(counts) == target)
+    return {
+        "fidelity": float(np.mean(probabilities)),
+        "exact_output_rate": dominant_exact / blocks,
+        "blocks": blocks,
+        "shots": shots,
+        "sim_sec_per_block": elapsed / blocks,
+    }
+
+
+def approximation_report(
+    data_bits: int,
+    degrees: Sequence[int],
+    block_samples: int = 128,
+    pipeline_blocks: int = 32,
+    shots: int = 256,
+    simulator: Optional[AerSimulator] = None,
+    seed: int = 0,
+) -> List[Dict]:
+    """One entry per approximation degree; ``pipeline_blocks=0`` skips Aer runs."""
+    simulator = simulator or AerSimulator(method="matrix_product_state")
+    n = data_bits + 1
+    report = []
+    for degree in degrees:
+        fusion = fusion_savings(data_bits, degree)
+        entry = {
+            "approximation_degree": degree,
+            "cost": fusion["before"],
+            "fused_cost": fusion["after"],
+            "peephole_saved": fusion["saved"],
+        }
+        entry["blocks"] = {
+            name: block_fidelity(name, n, degree, block_samples, seed) for name in ADDERS
+        }
+        if pipeline_blocks:
+            entry["pipeline"] = pipeline_exactness(
+                data_bits, degree, simulator, pipeline_blocks, shots, seed
+            )
+        report.append(entry)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Approximate-QFT adder trade-off report.")
+    parser.add_argument("--data-bits", type=int, default=4, help="Logical data bits")
+    parser.add_argument(
+        "--degrees", type=int, nargs="+", default=[0, 1, 2, 3], help="Approximation degrees"
+    )
+    parser.add_argument("--block-samples", type=int, default=128, help="Basis inputs per adder")
+    parser.add_argument("--blocks", type=int, default=32, help="Pipeline blocks (0 = skip)")
+    parser.add_argument("--shots", type=int, default=256, help="Shots per pipeline block")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed")
+    parser.add_argument("--output", type=str, default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = approximation_report(
+        args.data_bits, args.degrees, args.block_samples, args.blocks, args.shots, seed=args.seed
+    )
+    for entry in report:
+        cost, saved = entry["cost"], entry["peephole_saved"]
+        blocks = ", ".join(
+            f"{name} {stats['fidelity']:.4f}" for name, stats in entry["blocks"].items()
+        )
+        line = (
+            f"degree {entry['approximation_degree']}: {cost['cp']} cp, depth {cost['depth']} "
+            f"(peephole -{saved['gates']} gates, -{saved['depth']} depth) | "
+            f"block fidelity {blocks}"
+        )
+        if "pipeline" in entry:
+            pipeline = entry["pipeline"]
+            line += (
+                f" | pipeline fidelity {pipeline['fidelity']:.4f}, "
+                f"exact {pipeline['exact_output_rate']:.2%}, "
+                f"{pipeline['sim_sec_per_block'] * 1e3:.1f} ms/block"
+            )
+        print(line)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""Benchmark suite with a versioned JSON baseline and regression checks.
+
+The suite sweeps ``data_bits``, the Aer simulation method, shots and the
+image engine, and times
+
+* ``build``: ``build_rounding_circuit`` of the input-independent body,
+* ``transpile``: transpiling the measured body for the simulator,
+* ``run``: ``simulator.run`` on a batch of bound random blocks (per block;
+  ``shots=0`` runs the shot-free probes),
+* ``pipeline``: ``run_experiment`` end to end on an image (``quantum``,
+  ``permutation`` and ``lut`` engines; the image pipeline always uses the
+  MPS method) and, for ``classical``, the Max-Plus bands of the whole image.
+
+Each measurement is the best and median of ``repeats`` timed calls after one
+warm-up call, so the in-process template and on-disk circuit caches are warm.
+Results are keyed like ``run/bits=4/method=matrix_product_state/shots=0``
+and written with ``SCHEMA_VERSION`` and the software environment.
+``compare`` checks a run against a saved baseline: a key regresses when its
+best time grows by more than its kind's relative threshold and by more than
+``min_delta_sec``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import qiskit
+import qiskit_aer
+from qiskit import transpile
+from qiskit_aer import AerSimulator
+
+from image_io import read_bmp_grayscale
+from image_quantum_experiment import build_parser, run_experiment
+from lut_engine import build_lut, default_lut_path, load_lut, save_lut, template_hash
+from main_round import (
+    ArithmeticParams,
+    add_output_measurements,
+    build_rounding_circuit,
+    dominant_outcomes,
+    get_rounding_template,
+    pipeline_source_digest,
+)
+from maxplus_engine import max_plus_bands, quantize
+
+SCHEMA_VERSION = 1
+ENGINES = ("quantum", "permutation", "lut", "classical")
+KINDS = ("build", "transpile", "run", "pipeline")
+
+
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "qiskit": qiskit.__version__,
+        "qiskit_aer": qiskit_aer.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pipeline_source": pipeline_source_digest(),
+    }
+
+
+def time_call(fn: Callable[[], object], repeats: int = 3, scale: float = 1.0) -> Dict:
+    """Best and median wall time of ``fn`` over ``repeats`` calls, times ``scale``."""
+    fn()  # warm-up
+    samples = []
+    for _ in range(max(1, repeats)):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * scale)
+    return {"best_sec": min(samples), "median_sec": statistics.median(samples), "repeats": len(samples)}
+
+
+def random_blocks(data_bits: int, count: int, seed: int = 0) -> List[tuple]:
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 1 << data_bits, size=(count, 4))
+    return [tuple(int(v) for v in row) for row in values]
+
+
+def _lut_path(data_bits: int, workdir: Path) -> Path:
+    """A LUT matching the current circuit, built with the permutation backend if needed."""
+    digest = template_hash(data_bits)
+    path = default_lut_path(data_bits)
+    try:
+        load_lut(path, data_bits, digest)
+        return path
+    except (OSError, ValueError):
+        path = workdir / f"rounding_lut_{data_bits}bit.npz"
+        if not path.exists():
+            save_lut(path, build_lut(data_bits, backend="permutation"), data_bits, digest)
+        return path
+
+
+def pipeline_call(
+    image: Path, data_bits: int, engine: str, shots: int, blocks: int, workdir: Path
+) -> Callable[[], object]:
+    """One end-to-end image run; outputs go to ``workdir``, console output is dropped."""
+    if engine == "classical":
+        return lambda: max_plus_bands(quantize(read_bmp_grayscale(image), data_bits), data_bits)
+    local = workdir / image.name
+    if not local.exists():
+        shutil.copyfile(image, local)
+    argv = [
+        "--image", str(local), "--bit-depth", str(data_bits), "--engine", engine,
+        "--shots", str(shots), "--max-blocks", str(blocks),
+    ]
+    if engine == "lut":
+        argv += ["--lut", str(_lut_path(data_bits, workdir))]
+    args = build_parser().parse_args(argv)
+
+    def call():
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_experiment(args)
+
+    return call
+
+
+def run_suite(
+    data_bits: Sequence[int] = (2, 4),
+    methods: Sequence[str] = ("matrix_product_state",),
+    shots: Sequence[int] = (0, 512),
+    engines: Sequence[str] = ("quantum", "lut", "classical"),
+    blocks: int = 32,
+    pipeline_blocks: int = 256,
+    image: str = "cameraman.bmp",
+    repeats: int = 3,
+    seed: int = 0,
+    verbose: bool = False,
+) -> Dict:
+    """Run every benchmark of the sweep; returns the JSON-ready result document."""
+    results: Dict[str, Dict] = {}
+
+    def record(key: str, entry: Dict):
+        results[key] = entry
+        if verbose:
+            print(f"{key:<60} {entry['best_sec'] * 1e3:10.3f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for bits in data_bits:
+            params = ArithmeticParams(data_bits=bits)
+            record(
+                f"build/bits={bits}",
+                time_call(
+                    lambda: build_rounding_circuit(params, load_inputs=False, fuse_qft=True),
+                    repeats,
+                ),
+            )
+            body = build_rounding_circuit(params, load_inputs=False, fuse_qft=True)
+            add_output_measurements(body)
+            sample = random_blocks(bits, blocks, seed)
+            for method in methods:
+                simulator = AerSimulator(method=method)
+                record(
+                    f"transpile/bits={bits}/method={method}",
+                    time_call(lambda: transpile(body, simulator, optimization_level=0), repeats),
+                )
+                template = get_rounding_template(bits, simulator)
+                for shot_count in shots:
+                    circuits = [template.bind(*block, probe=shot_count <= 0) for block in sample]
+                    entry = time_call(
+                        lambda: dominant_outcomes(simulator, circuits, shot_count),
+                        repeats,
+                        scale=1.0 / len(circuits),
+                    )
+                    entry["blocks"] = len(circuits)
+                    record(f"run/bits={bits}/method={method}/shots={shot_count}", entry)
+            for engine in engines:
+                if engine == "lut" and bits > 8:
+                    continue  # LUT entries are uint8
+                for shot_count in shots if engine == "quantum" else shots[:1]:
+                    call = pipeline_call(
+                        Path(image), bits, engine, shot_count, pipeline_blocks, workdir
+                    )
+                    entry = time_call(call, repeats)
+                    entry["blocks"] = pipeline_blocks if engine != "classical" else 0
+                    suffix = f"/shots={shot_count}" if engine == "quantum" else ""
+                    record(f"pipeline/bits={bits}/engine={engine}{suffix}", entry)
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "settings": {
+            "data_bits": list(data_bits),
+            "methods": list(methods),
+            "shots": list(shots),
+            "engines": list(engines),
+            "blocks": blocks,
+            "pipeline_blocks": pipeline_blocks,
+            "image": str(image),
+            "repeats": repeats,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def load_results(path: str) -> Dict:
+    document = json.loads(Path(path).read_text())
+    if document.get("schema") != SCHEMA_VERSION:
+        raise ValueError(
+            f"{path} has benchmark schema {document.get('schema')}, expected {SCHEMA_VERSION}"
+        )
+    return document
+
+
+def environment_changes(baseline: Dict, current: Dict) -> Dict[str, tuple]:
+    """Environment fields that differ: ``{field: (baseline, current)}``."""
+    old, new = baseline.get("environment", {}), current.get("environment", {})
+    return {
+        field: (old.get(field), new.get(field))
+        for field in sorted(set(old) | set(new))
+        if old.get(field) != new.get(field)
+    }
+
+
+def compare(
+    baseline: Dict,
+    current: Dict,
+    threshold: float = 0.2,
+    kind_thresholds: Optional[Dict[str, float]] = None,
+    min_delta_sec: float = 1e-3,
+) -> List[Dict]:
+    """One row per benchmark key with ``status`` regression/improvement/ok/new/missing.
+
+    ``kind_thresholds`` overrides ``threshold`` per kind (``build``,
+    ``transpile``, ``run``, ``pipeline``).
+    """
+    for document in (baseline, current):
+        if document.get("schema") != SCHEMA_VERSION:
+            raise ValueError(f"benchmark schema {document.get('schema')} != {SCHEMA_VERSION}")
+    kind_thresholds = kind_thresholds or {}
+    old, new = baseline["results"], current["results"]
+    rows = []
+    for key in sorted(set(old) | set(new)):
+        row = {"key": key, "baseline_sec": None, "current_sec": None, "ratio": None}
+        if key not in new:
+            rows.append({**row, "baseline_sec": old[key]["best_sec"], "status": "missing"})
+            continue
+        if key not in old:
+            rows.append({**row, "current_sec": new[key]["best_sec"], "status": "new"})
+            continue
+        before, after = old[key]["best_sec"], new[key]["best_sec"]
+        limit = kind_thresholds.get(key.split("/", 1)[0], threshold)
+        status = "ok"
+        if after > before * (1 + limit) and after - before > min_delta_sec:
+            status = "regression"
+        elif after < before * (1 - limit) and before - after > min_delta_sec:
+            status = "improvement"
+        rows.append(
+            {
+                "key": key,
+                "baseline_sec": before,
+                "current_sec": after,
+                "ratio": after / before if before else None,
+                "status": status,
+            }
+        )
+    return rows
+
+
+def parse_kind_thresholds(items: Sequence[str]) -> Dict[str, float]:
+    thresholds = {}
+    for item in items:
+        kind, _, value = item.partition("=")
+        if kind not in KINDS or not value:
+            raise ValueError(f"expected <kind>=<fraction> with kind in {KINDS}, got '{item}'")
+        thresholds[kind] = float(value)
+    return thresholds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark build/transpile/run and the image pipeline.")
+    parser.add_argument("--data-bits", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--methods", nargs="+", default=["matrix_product_state"])
+    parser.add_argument("--shots", type=int, nargs="+", default=[0, 512],
+                        help="Shots per block (0 = shot-free readout)")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=["quantum", "lut", "classical"])
+    parser.add_argument("--blocks", type=int, default=32, help="Random blocks per run benchmark")
+    parser.add_argument("--pipeline-blocks", type=int, default=256,
+                        help="Blocks sampled per image pipeline run (0 = all)")
+    parser.add_argument("--image", type=str, default="cameraman.bmp")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed calls per benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="Write the results (a baseline) as JSON")
+    parser.add_argument("--current", type=str, default=None,
+                        help="Compare this saved result instead of running the suite")
+    parser.add_argument("--baseline", type=str, default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown counted as a regression")
+    parser.add_argument("--kind-threshold", nargs="*", default=[], metavar="KIND=FRACTION",
+                        help="Per-kind thresholds, e.g. pipeline=0.5 run=0.3")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="Ignore changes smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    if args.current:
+        current = load_results(args.current)
+    else:
+        current = run_suite(
+            args.data_bits, args.methods, args.shots, args.engines, args.blocks,
+            args.pipeline_blocks, args.image, args.repeats, args.seed, verbose=True,
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2))
+        print(f"Saved results to {args.output}")
+    if not args.baseline:
+        return
+
+    baseline = load_results(args.baseline)
+    for field, (before, after) in environment_changes(baseline, current).items():
+        print(f"note: environment {field} changed: {before} -> {after}")
+    rows = compare(
+        baseline, current, args.threshold, parse_kind_thresholds(args.kind_threshold),
+        args.min_delta_ms / 1e3,
+    )
+    for row in rows:
+        before = "-" if row["baseline_sec"] is None else f"{row['baseline_sec'] * 1e3:.3f}"
+        after = "-" if row["current_sec"] is None else f"{row['current_sec'] * 1e3:.3f}"
+        ratio = "" if row["ratio"] is None else f"x{row['ratio']:.2f}"
+        print(f"{row['status']:<11} {row['key']:<60} {before:>10} -> {after:>10} ms {ratio}")
+    regressions = sum(row["status"] == "regression" for row in rows)
+    print(f"{regressions} regression(s) out of {len(rows)} benchmarks")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
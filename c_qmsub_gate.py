@@ -1,17 +1,26 @@
 from qiskit import QuantumCircuit, QuantumRegister
 
+from adders import get_adder_strategy, work_registers
 from qmsub_gate import build_qmsub_gate
 
 
-def build_c_qmsub_gate(n: int):
-    """比较-减法器：|0⟩|t⟩|c⟩ → |t<c⟩|(t-c) mod 2**n⟩|c⟩"""
+def build_c_qmsub_gate(n: int, approximation_degree: int = 0, adder: str = "qft"):
+    """比较-减法器：|0⟩|t⟩|c⟩ → |t<c⟩|(t-c) mod 2**n⟩|c⟩
+
+    adder 选择加法策略（见 ``adders.py``：``qft`` 或 ``ripple``）；需要工作比特的
+    策略在 control 之后追加 ``work`` 寄存器，运算前后均为 |0⟩。
+    approximation_degree > 0 时（仅 qft）省略最小的若干档旋转（近似 QFT，见
+    ``qquantum_module.keep_rotation``），门名追加 ``_approx<d>`` 以区别于精确版本。
+    """
+    strategy = get_adder_strategy(adder, approximation_degree)
     comp = QuantumRegister(1, "comp")
     target = QuantumRegister(n, "target")
     control = QuantumRegister(n, "control")
-    qc = QuantumCircuit(comp, target, control, name="C_QMSUB")
+    work = work_registers(strategy, n)
+    qc = QuantumCircuit(comp, target, control, *work, name=strategy.block_name("C_QMSUB"))
 
-    qmsub = build_qmsub_gate(n)
-    qc.append(qmsub, list(target) + list(control))
+    qmsub = build_qmsub_gate(n, approximation_degree, adder)
+    qc.append(qmsub, list(target) + list(control) + [q for reg in work for q in reg])
     qc.cx(target[n - 1], comp[0])
 
     return qc.to_instruction()
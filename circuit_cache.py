@@ -0,0 +1,111 @@
+"""Content-addressed disk cache for transpiled circuits, stored as QPY.
+
+Entries are keyed on everything that determines the transpiled template
+(data width, adder variant, simulator method, qiskit/qiskit-aer versions), so
+a later run can load the circuit instead of rebuilding and transpiling it.
+The cache directory is bounded in size; the least recently used entries are
+evicted first.
+
+``HAAR_CIRCUIT_CACHE`` overrides the cache directory (set it to an empty
+string to disable caching) and ``HAAR_CIRCUIT_CACHE_MB`` its size limit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import qiskit
+import qiskit_aer
+from qiskit import QuantumCircuit, qpy
+
+
+CACHE_FORMAT = 1  # bump when the template layout changes incompatibly
+DEFAULT_MAX_MB = 256
+
+
+def cache_dir() -> Optional[Path]:
+    configured = os.environ.get("HAAR_CIRCUIT_CACHE")
+    if configured is not None:
+        return Path(configured) if configured else None
+    return Path.home() / ".cache" / "haar_circuits"
+
+
+def max_cache_bytes() -> int:
+    return int(float(os.environ.get("HAAR_CIRCUIT_CACHE_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+
+
+def cache_key(**fields) -> str:
+    """Hash the given fields together with the library versions."""
+    payload = dict(
+        fields,
+        format=CACHE_FORMAT,
+        qiskit=qiskit.__version__,
+        qiskit_aer=qiskit_aer.__version__,
+    )
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def load_circuit(key: str, directory: Optional[Path] = None) -> Optional[QuantumCircuit]:
+    """Return the cached circuit for ``key``, or None on a miss."""
+    directory = directory if directory is not None else cache_dir()
+    if directory is None:
+        return None
+    path = directory / f"{key}.qpy"
+    try:
+        with open(path, "rb") as handle:
+            circuit = qpy.load(handle)[0]
+    except (OSError, ValueError, qpy.QpyError):
+        return None
+    os.utime(path)  # mark as recently used for eviction
+    return circuit
+
+
+def store_circuit(
+    key: str,
+    circuit: QuantumCircuit,
+    directory: Optional[Path] = None,
+    max_bytes: Optional[int] = None,
+):
+    """Write ``circuit`` under ``key`` and evict old entries beyond the size limit."""
+    directory = directory if directory is not None else cache_dir()
+    if directory is None:
+        return
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a
+        # partially written entry.
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as handle:
+            try:
+                qpy.dump(circuit, handle)
+            except Exception:
+                os.unlink(handle.name)
+                raise
+        os.replace(handle.name, directory / f"{key}.qpy")
+    except OSError:
+        return
+    evict(directory, max_bytes if max_bytes is not None else max_cache_bytes())
+
+
+def evict(directory: Path, max_bytes: int):
+    """Delete least recently used entries until the cache fits in ``max_bytes``."""
+    entries = []
+    for path in directory.glob("*.qpy"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
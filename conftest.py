@@ -0,0 +1,22 @@
+"""Shared pytest configuration."""
+
+import os
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_circuit_cache(tmp_path_factory):
+    """Point the QPY circuit cache at a per-session directory.
+
+    Tests never read or write the user's ``~/.cache/haar_circuits``; one
+    directory per session still lets tests share templates built earlier in
+    the run.
+    """
+    previous = os.environ.get("HAAR_CIRCUIT_CACHE")
+    os.environ["HAAR_CIRCUIT_CACHE"] = str(tmp_path_factory.mktemp("circuit_cache"))
+    yield
+    if previous is None:
+        del os.environ["HAAR_CIRCUIT_CACHE"]
+    else:
+        os.environ["HAAR_CIRCUIT_CACHE"] = previous
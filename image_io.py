@@ -0,0 +1,216 @@
+"""Grayscale image I/O shared by the experiment scripts.
+
+BMP files are memory-mapped and the pixel rows are exposed as a strided view
+of the mapping, so stride padding and bottom-up storage are handled without
+touching individual pixels in Python.  PGM (P2/P5) is supported as well, so
+exported energy maps can be loaded back.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class BmpHeader:
+    width: int
+    height: int
+    bits_per_pixel: int
+    top_down: bool
+    pixel_offset: int
+    row_stride: int
+    palette: Optional[np.ndarray]  # gray value per palette index (8-bit only)
+
+
+def parse_bmp_header(data) -> BmpHeader:
+    """Parse the BMP file and DIB headers (uncompressed 8-bit/24-bit only)."""
+    if bytes(data[:2]) != b"BM":
+        raise ValueError("Expected BMP header (BM)")
+
+    pixel_offset, dib_header_size = struct.unpack_from("<II", data, 10)
+    width, height = struct.unpack_from("<ii", data, 18)
+    planes, bits_per_pixel = struct.unpack_from("<HH", data, 26)
+    compression = struct.unpack_from("<I", data, 30)[0]
+
+    if planes != 1 or compression != 0 or bits_per_pixel not in (8, 24):
+        raise ValueError("Only uncompressed 8-bit/24-bit BMP files are supported")
+
+    palette = None
+    if bits_per_pixel == 8:
+        palette_start = 14 + dib_header_size
+        entries = max(0, (pixel_offset - palette_start) // 4)
+        table = np.frombuffer(data, dtype=np.uint8, count=entries * 4, offset=palette_start)
+        # The red channel of each BGRA entry is the gray level; missing
+        # entries fall back to 0, 1, 2, ... as in the original loaders.
+        palette = np.concatenate(
+            [table[2::4], np.arange(256 - entries, dtype=np.uint8)]
+        )[:256]
+
+    return BmpHeader(
+        width=width,
+        height=abs(height),
+        bits_per_pixel=bits_per_pixel,
+        top_down=height < 0,
+        pixel_offset=pixel_offset,
+        row_stride=((bits_per_pixel * width + 31) // 32) * 4,
+        palette=palette,
+    )
+
+
+def map_bmp_rows(path: Path) -> Tuple[BmpHeader, np.ndarray]:
+    """Memory-map a BMP and return its raw pixel rows in top-to-bottom order.
+
+    The rows are a read-only ``(height, width * bytes_per_pixel)`` view into
+    the mapping; nothing is decoded or copied until ``decode_bmp_rows``.
+    """
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    header = parse_bmp_header(data)
+    end = header.pixel_offset + header.height * header.row_stride
+    if end > data.size:
+        raise ValueError(f"{path} is truncated: expected {end} bytes, found {data.size}")
+
+    rows = data[header.pixel_offset : end].reshape(header.height, header.row_stride)
+    rows = rows[:, : header.width * header.bits_per_pixel // 8]
+    if not header.top_down:
+        rows = rows[::-1]
+    return header, rows
+
+
+def decode_bmp_rows(header: BmpHeader, rows: np.ndarray) -> np.ndarray:
+    """Convert raw BMP rows to a contiguous ``uint8`` grayscale array."""
+    if header.bits_per_pixel == 8:
+        if np.array_equal(header.palette, np.arange(256, dtype=np.uint8)):
+            return np.ascontiguousarray(rows)
+        return header.palette[rows]
+    bgr = rows.reshape(rows.shape[0], header.width, 3)
+    return (bgr.sum(axis=2, dtype=np.uint16) // 3).astype(np.uint8)
+
+
+def read_bmp_grayscale(path: Path) -> np.ndarray:
+    """Load an 8-bit (palette) or 24-bit (RGB average) BMP as a 2-D uint8 array."""
+    header, rows = map_bmp_rows(Path(path))
+    return decode_bmp_rows(header, rows)
+
+
+def read_pgm(path: Path) -> np.ndarray:
+    """Load an ASCII (P2) or binary (P5) PGM as a 2-D array.
+
+    Maps with ``maxval < 256`` come back as uint8, deeper ones as uint16.
+    """
+    data = Path(path).read_bytes()
+    tokens = []
+    pos = 0
+    while len(tokens) < 4:
+        while pos < len(data) and data[pos : pos + 1].isspace():
+            pos += 1
+        if data[pos : pos + 1] == b"#":
+            pos = data.index(b"\n", pos) + 1
+            continue
+        start = pos
+        while pos < len(data) and not data[pos : pos + 1].isspace():
+            pos += 1
+        tokens.append(data[start:pos])
+
+    magic, width, height, maxval = tokens[0], int(tokens[1]), int(tokens[2]), int(tokens[3])
+    dtype = np.uint8 if maxval < 256 else np.uint16
+    if magic == b"P5":
+        raw = np.frombuffer(
+            data, dtype=">u2" if dtype == np.uint16 else np.uint8, count=width * height, offset=pos + 1
+        )
+        return raw.astype(dtype).reshape(height, width)
+    if magic == b"P2":
+        values = np.array(data[pos:].split()[: width * height], dtype=np.int64)
+        return values.astype(dtype).reshape(height, width)
+    raise ValueError(f"Unsupported PGM format {magic!r}")
+
+
+def read_grayscale(path: Path) -> np.ndarray:
+    """Load a BMP or PGM image, chosen by its magic bytes."""
+    with open(path, "rb") as handle:
+        magic = handle.read(2)
+    if magic == b"BM":
+        return read_bmp_grayscale(path)
+    if magic in (b"P2", b"P5"):
+        return read_pgm(path)
+    raise ValueError(f"Unsupported image format in {path}")
+
+
+class PGMWriter:
+    """Stream a binary (P5) PGM to disk row by row.
+
+    Rows are written as they arrive, each repeated ``upsample`` times both
+    horizontally and vertically, so an upsampled map is never held in memory.
+    ``depth=16`` stores big-endian 16-bit samples, which keeps raw
+    (un-normalized) energies.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        width: int,
+        height: int,
+        upsample: int = 1,
+        depth: int = 8,
+        maxval: Optional[int] = None,
+    ):
+        if depth not in (8, 16):
+            raise ValueError("PGM depth must be 8 or 16 bits")
+        self.width = width
+        self.height = height
+        self.upsample = max(1, upsample)
+        self.dtype = np.dtype(np.uint8 if depth == 8 else ">u2")
+        self.maxval = maxval if maxval is not None else (1 << depth) - 1
+        self.rows_written = 0
+        self._handle = open(path, "wb")
+        self._handle.write(
+            f"P5\n{width * self.upsample} {height * self.upsample}\n{self.maxval}\n".encode()
+        )
+
+    def write_rows(self, rows: np.ndarray):
+        rows = np.atleast_2d(rows)
+        if rows.shape[1] != self.width:
+            raise ValueError(f"Expected rows of width {self.width}, got {rows.shape[1]}")
+        if self.rows_written + rows.shape[0] > self.height:
+            raise ValueError("More rows written than declared in the PGM header")
+        if rows.size and (rows.min() < 0 or rows.max() > self.maxval):
+            raise ValueError(f"PGM samples must lie in [0, {self.maxval}]")
+        for row in rows:
+            line = np.repeat(row.astype(self.dtype), self.upsample).tobytes()
+            for _ in range(self.upsample):
+                self._handle.write(line)
+        self.rows_written += rows.shape[0]
+
+    def close(self):
+        if self._handle.closed:
+            return
+        self._handle.close()
+        if self.rows_written != self.height:
+            raise ValueError(f"PGM declared {self.height} rows but {self.rows_written} were written")
+
+    def __enter__(self) -> "PGMWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._handle.close()
+
+
+def write_pgm(
+    path: Path,
+    values: np.ndarray,
+    upsample: int = 1,
+    depth: int = 8,
+    maxval: Optional[int] = None,
+):
+    """Write a 2-D array as a binary PGM (see ``PGMWriter``)."""
+    values = np.asarray(values)
+    height, width = values.shape
+    with PGMWriter(path, width, height, upsample=upsample, depth=depth, maxval=maxval) as writer:
+        writer.write_rows(values)
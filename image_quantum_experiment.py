@@ -1,70 +1,25 @@
 import argparse
 import json
+import os
 import random
 import statistics
+import tempfile
 import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from qiskit import ClassicalRegister, transpile
+import numpy as np
 from qiskit_aer import AerSimulator
 
-from main_round import ArithmeticParams, build_rounding_circuit
-
-
-# ---------------------------------------------------------------------------
-# Image helpers (BMP, 8-bit grayscale)
-# ---------------------------------------------------------------------------
-
-def read_bmp_grayscale(path: Path) -> List[List[int]]:
-    """Minimal BMP loader (8-bit or 24-bit, uncompressed)."""
-    data = path.read_bytes()
-    if data[:2] != b"BM":
-        raise ValueError("Expected BMP header (BM)")
-
-    pixel_offset = int.from_bytes(data[10:14], "little")
-    dib_header_size = int.from_bytes(data[14:18], "little")
-    width = int.from_bytes(data[18:22], "little", signed=True)
-    height = int.from_bytes(data[22:26], "little", signed=True)
-    planes = int.from_bytes(data[26:28], "little")
-    bits_per_pixel = int.from_bytes(data[28:30], "little")
-    compression = int.from_bytes(data[30:34], "little")
-
-    if planes != 1 or compression != 0 or bits_per_pixel not in (8, 24):
-        raise ValueError("Only uncompressed 8-bit/24-bit BMP files are supported")
-
-    top_down = height < 0
-    height = abs(height)
-    row_stride = ((bits_per_pixel * width + 31) // 32) * 4
-
-    palette = None
-    if bits_per_pixel == 8:
-        palette_entries = (pixel_offset - 14 - dib_header_size) // 4
-        palette = [
-            data[14 + dib_header_size + idx * 4 + 2] for idx in range(palette_entries)
-        ]
-        if len(palette) < 256:
-            palette.extend(range(256 - len(palette)))
-
-    pixels = [[0] * width for _ in range(height)]
-    for row in range(height):
-        src_row = row if top_down else height - 1 - row
-        row_start = pixel_offset + src_row * row_stride
-        row_bytes = data[row_start : row_start + row_stride]
-        for col in range(width):
-            if bits_per_pixel == 8:
-                index = row_bytes[col]
-                pixels[row][col] = palette[index] if palette else index
-            else:
-                base = col * 3
-                b, g, r = row_bytes[base : base + 3]
-                pixels[row][col] = (r + g + b) // 3
-    return pixels
-
-
-def quantize_pixels(pixels: List[List[int]], bit_depth: int) -> List[List[int]]:
-    shift = max(0, 8 - bit_depth)
-    return [[value >> shift for value in row] for row in pixels]
+from adders import ADDER_STRATEGIES
+from image_io import PGMWriter, decode_bmp_rows, map_bmp_rows, read_bmp_grayscale, write_pgm
+from lut_engine import default_lut_path, load_lut, lut_lookup, template_hash
+from main_round import OUTPUT_KEYS, get_rounding_template, iter_block_batches, simulate_blocks
+from maxplus_engine import block_planes, max_plus_bands, quantize
+from permutation_backend import simulate_blocks_basis
 
 
 # ---------------------------------------------------------------------------
@@ -79,37 +34,9 @@ def simulate_block(
     data_bits: int,
     simulator: AerSimulator,
     shots: int,
+    adder: str = "qft",
 ) -> Dict[str, int]:
-    params = ArithmeticParams(data_bits=data_bits, a=a, b=b, c=c, d=d)
-    qc = build_rounding_circuit(params)
-    n = params.arith_bits
-
-    cr_a = ClassicalRegister(n, "c_a")
-    cr_d = ClassicalRegister(n, "c_d")
-    cr_res1 = ClassicalRegister(n, "c_res1")
-    cr_res2 = ClassicalRegister(n, "c_res2")
-    qc.add_register(cr_a, cr_d, cr_res1, cr_res2)
-
-    reg_a = next(reg for reg in qc.qregs if reg.name == "a")
-    reg_d = next(reg for reg in qc.qregs if reg.name == "d")
-    res1 = next(reg for reg in qc.qregs if reg.name == "res1")
-    res2 = next(reg for reg in qc.qregs if reg.name == "res2")
-    qc.measure(reg_a, cr_a)
-    qc.measure(reg_d, cr_d)
-    qc.measure(res1, cr_res1)
-    qc.measure(res2, cr_res2)
-    transpiled = transpile(qc, simulator, optimization_level=0)
-    result = simulator.run(transpiled, shots=shots).result()
-    counts = result.get_counts(transpiled)
-    meas_result = max(counts.items(), key=lambda item: item[1])[0]
-
-    bits = meas_result.split(" ")[::-1]
-    mask = params.modulus - 1
-    reg_a = int(bits[0], 2) & mask
-    reg_d = int(bits[1], 2) & mask
-    res1 = int(bits[2], 2) & mask
-    res2 = int(bits[3], 2) & mask
-    return {"reg_a": reg_a, "reg_d": reg_d, "res1": res1, "res2": res2}
+    return simulate_blocks([(a, b, c, d)], data_bits, simulator, shots, 1, adder)[0]
 
 
 def classical_block(a: int, b: int, c: int, d: int, data_bits: int) -> Dict[str, int]:
@@ -125,6 +52,18 @@ def block_energy(values: Dict[str, int]) -> int:
     return abs(values["res1"]) + abs(values["res2"]) + abs(values["reg_a"])
 
 
+def dedup_blocks(
+    blocks: List[Tuple[int, int, int, int]],
+) -> Tuple[List[Tuple[int, int, int, int]], List[int]]:
+    """Distinct blocks in first-seen order and, per block, its distinct index.
+
+    ``[unique_outputs[i] for i in inverse]`` scatters results back to every block.
+    """
+    index: Dict[Tuple[int, int, int, int], int] = {}
+    inverse = [index.setdefault(block, len(index)) for block in blocks]
+    return list(index), inverse
+
+
 def percentile(values: List[float], q: float) -> float:
     if not values:
         return 0.0
@@ -134,28 +73,227 @@ def percentile(values: List[float], q: float) -> float:
     return sorted_vals[idx]
 
 
-def save_pgm(path: Path, pixels: List[List[int]], upsample: bool):
-    if upsample:
-        pixels = upsample_blocks(pixels)
-    height = len(pixels)
-    width = len(pixels[0])
-    header = f"P2\n{width} {height}\n255\n"
-    lines = [" ".join(str(v) for v in row) for row in pixels]
-    path.write_text(header + "\n".join(lines))
+# ---------------------------------------------------------------------------
+# Batched / sharded execution
+# ---------------------------------------------------------------------------
+
+def simulate_selected(
+    blocks: List[Tuple[int, int, int, int]],
+    data_bits: int,
+    simulator: AerSimulator,
+    shots: int,
+    batch_size: int,
+    verbose: bool = False,
+    adder: str = "qft",
+    pack_size: int = 1,
+    mps_layout: bool = False,
+) -> Tuple[List[Dict[str, int]], List[float]]:
+    """Run blocks through the batched executor; return outputs and per-block times."""
+    outputs: List[Dict[str, int]] = []
+    timings: List[float] = []
+    step = max(1, len(blocks) // 10)
+    t0 = time.time()
+    for batch in iter_block_batches(
+        blocks, data_bits, simulator, shots, batch_size, adder, pack_size, mps_layout
+    ):
+        elapsed = time.time() - t0
+        timings.extend([elapsed / len(batch)] * len(batch))
+        previous = len(outputs)
+        outputs.extend(batch)
+        if verbose and len(outputs) // step > previous // step:
+            print(f"[{len(outputs)}/{len(blocks)}] blocks processed…")
+        t0 = time.time()
+    return outputs, timings
+
+
+# Per-process simulator, created once by the pool initializer and reused for
+# every shard that process receives.
+_WORKER_SIMULATOR = None
+
+
+def _init_worker(data_bits: int, threads: int, adder: str, mps_layout: bool = False):
+    global _WORKER_SIMULATOR
+    _WORKER_SIMULATOR = AerSimulator(
+        method="matrix_product_state", max_parallel_threads=threads
+    )
+    # warm the template cache
+    get_rounding_template(data_bits, _WORKER_SIMULATOR, adder=adder, mps_layout=mps_layout)
 
 
-def upsample_blocks(block_pixels: List[List[int]]) -> List[List[int]]:
-    h = len(block_pixels)
-    w = len(block_pixels[0])
-    upsampled = [[0] * (w * 2) for _ in range(h * 2)]
-    for y in range(h):
-        for x in range(w):
-            value = block_pixels[y][x]
-            upsampled[2 * y][2 * x] = value
-            upsampled[2 * y][2 * x + 1] = value
-            upsampled[2 * y + 1][2 * x] = value
-            upsampled[2 * y + 1][2 * x + 1] = value
-    return upsampled
+def _simulate_shard(
+    blocks: List[Tuple[int, int, int, int]],
+    data_bits: int,
+    shots: int,
+    batch_size: int,
+    adder: str,
+    pack_size: int,
+    mps_layout: bool = False,
+) -> Tuple[List[Dict[str, int]], List[float]]:
+    return simulate_selected(
+        blocks,
+        data_bits,
+        _WORKER_SIMULATOR,
+        shots,
+        batch_size,
+        adder=adder,
+        pack_size=pack_size,
+        mps_layout=mps_layout,
+    )
+
+
+def make_worker_pool(
+    data_bits: int, workers: int, adder: str = "qft", mps_layout: bool = False
+) -> ProcessPoolExecutor:
+    """Process pool whose workers each own one warmed AerSimulator."""
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(data_bits, threads, adder, mps_layout),
+    )
+
+
+def simulate_sharded(
+    blocks: List[Tuple[int, int, int, int]],
+    data_bits: int,
+    shots: int,
+    batch_size: int,
+    workers: int,
+    verbose: bool = False,
+    pool: Optional[ProcessPoolExecutor] = None,
+    adder: str = "qft",
+    pack_size: int = 1,
+    mps_layout: bool = False,
+) -> Tuple[List[Dict[str, int]], List[float]]:
+    """Split blocks into contiguous shards and simulate them in a process pool.
+
+    Shards are merged back in input order, so the outputs are identical to a
+    serial ``simulate_selected`` run over the same blocks.  An existing
+    ``pool`` from ``make_worker_pool`` is reused when given.
+    """
+    shard_size = -(-len(blocks) // workers) if blocks else 1
+    shards = [blocks[idx : idx + shard_size] for idx in range(0, len(blocks), shard_size)]
+
+    outputs: List[Dict[str, int]] = []
+    timings: List[float] = []
+    owned = pool is None
+    pool = pool or make_worker_pool(data_bits, workers, adder, mps_layout)
+    try:
+        results = pool.map(
+            _simulate_shard,
+            shards,
+            repeat(data_bits),
+            repeat(shots),
+            repeat(batch_size),
+            repeat(adder),
+            repeat(pack_size),
+            repeat(mps_layout),
+        )
+        for shard_outputs, shard_timings in results:
+            outputs.extend(shard_outputs)
+            timings.extend(shard_timings)
+            if verbose:
+                print(f"[{len(outputs)}/{len(blocks)}] blocks processed…")
+    finally:
+        if owned:
+            pool.shutdown()
+    return outputs, timings
+
+
+def load_engine_table(data_bits: int, lut_path: Optional[str] = None) -> np.ndarray:
+    """Load the LUT for ``--engine lut``, checking it against the current circuit."""
+    path = Path(lut_path) if lut_path else default_lut_path(data_bits)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"LUT {path} not found; build it with `python lut_engine.py --data-bits {data_bits}`"
+        )
+    return load_lut(path, data_bits, template_hash(data_bits))
+
+
+def lookup_selected(
+    blocks: List[Tuple[int, int, int, int]],
+    data_bits: int,
+    table: np.ndarray,
+) -> Tuple[List[Dict[str, int]], List[float]]:
+    """LUT engine: gather precomputed circuit outputs instead of simulating."""
+    t0 = time.time()
+    bands = lut_lookup(np.array(blocks, dtype=np.int64).reshape(-1, 4), table, data_bits)
+    columns = [bands[key].tolist() for key in OUTPUT_KEYS]
+    outputs = [dict(zip(OUTPUT_KEYS, values)) for values in zip(*columns)]
+    elapsed = time.time() - t0
+    return outputs, [elapsed / max(1, len(blocks))] * len(blocks)
+
+
+class BlockExecutor:
+    """Runs blocks through the engine chosen on the command line.
+
+    Holds the engine's long-lived resources (LUT, simulator or worker pool) so
+    they are created once even when blocks arrive in several strips.
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.table = None
+        self.simulator = None
+        self.pool = None
+        if args.engine == "lut":
+            self.table = load_engine_table(args.bit_depth, args.lut)
+        elif args.engine == "permutation":
+            pass
+        elif args.workers > 1:
+            self.pool = make_worker_pool(
+                args.bit_depth, args.workers, args.adder, args.mps_layout
+            )
+        else:
+            self.simulator = AerSimulator(method="matrix_product_state")
+
+    def run(
+        self, blocks: List[Tuple[int, int, int, int]], verbose: bool = False
+    ) -> Tuple[List[Dict[str, int]], List[float]]:
+        args = self.args
+        if self.table is not None:
+            return lookup_selected(blocks, args.bit_depth, self.table)
+        if args.engine == "permutation":
+            t0 = time.time()
+            outputs = simulate_blocks_basis(
+                blocks, args.bit_depth, shots=args.shots, adder=args.adder
+            )
+            elapsed = time.time() - t0
+            return outputs, [elapsed / max(1, len(blocks))] * len(blocks)
+        if self.pool is not None:
+            return simulate_sharded(
+                blocks,
+                args.bit_depth,
+                args.shots,
+                args.batch_size,
+                args.workers,
+                verbose,
+                self.pool,
+                args.adder,
+                args.pack_size,
+                args.mps_layout,
+            )
+        return simulate_selected(
+            blocks,
+            args.bit_depth,
+            self.simulator,
+            args.shots,
+            args.batch_size,
+            verbose,
+            args.adder,
+            args.pack_size,
+            args.mps_layout,
+        )
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def __enter__(self) -> "BlockExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 
 # ---------------------------------------------------------------------------
@@ -165,22 +303,14 @@ def upsample_blocks(block_pixels: List[List[int]]) -> List[List[int]]:
 def run_experiment(args: argparse.Namespace):
     image_path = Path(args.image)
     pixels = read_bmp_grayscale(image_path)
-    quant = quantize_pixels(pixels, args.bit_depth)
-    height = len(quant)
-    width = len(quant[0])
+    quant = quantize(pixels, args.bit_depth)
+    height, width = quant.shape
     block_h = height // 2
     block_w = width // 2
-    all_blocks: List[Tuple[int, int, Tuple[int, int, int, int]]] = []
-
-    for by in range(block_h):
-        for bx in range(block_w):
-            block = (
-                quant[2 * by][2 * bx],
-                quant[2 * by][2 * bx + 1],
-                quant[2 * by + 1][2 * bx],
-                quant[2 * by + 1][2 * bx + 1],
-            )
-            all_blocks.append((by, bx, block))
+    block_values = np.stack(block_planes(quant), axis=-1).reshape(-1, 4).tolist()
+    all_blocks: List[Tuple[int, int, Tuple[int, int, int, int]]] = [
+        (idx // block_w, idx % block_w, tuple(block)) for idx, block in enumerate(block_values)
+    ]
 
     total_blocks = len(all_blocks)
     if args.max_blocks > 0 and args.max_blocks < total_blocks:
@@ -189,34 +319,29 @@ def run_experiment(args: argparse.Namespace):
     else:
         selected = all_blocks
 
-    simulator = AerSimulator(method="matrix_product_state")
-
-    quantum_energy_map = [[0] * block_w for _ in range(block_h)]
-    classical_energy_map = [[0] * block_w for _ in range(block_h)]
+    quantum_energy_map = np.zeros((block_h, block_w), dtype=np.int64)
     quantum_energies: List[int] = []
-    classical_energies: List[int] = []
     reg_d_values: List[int] = []
-    timings: List[float] = []
 
     start = time.time()
-    for idx, (by, bx, block) in enumerate(selected, start=1):
-        a, b, c, d = block
-        classical = classical_block(a, b, c, d, args.bit_depth)
-        classical_energy = block_energy(classical)
-        classical_energy_map[by][bx] = classical_energy
-        classical_energies.append(classical_energy)
+    classical_energy_map = max_plus_bands(quant, args.bit_depth)["energy"]
+    classical_energies = [int(classical_energy_map[by, bx]) for by, bx, _ in selected]
 
-        t0 = time.time()
-        quantum = simulate_block(a, b, c, d, args.bit_depth, simulator, args.shots)
-        timings.append(time.time() - t0)
+    blocks = [block for _, _, block in selected]
+    if args.no_dedup:
+        unique, inverse = blocks, list(range(len(blocks)))
+    else:
+        unique, inverse = dedup_blocks(blocks)
+    with BlockExecutor(args) as executor:
+        unique_outputs, timings = executor.run(unique, args.verbose)  # one timing per simulation
+    quantum_outputs = [unique_outputs[idx] for idx in inverse]
+
+    for (by, bx, _), quantum in zip(selected, quantum_outputs):
         energy_q = block_energy(quantum)
-        quantum_energy_map[by][bx] = energy_q
+        quantum_energy_map[by, bx] = energy_q
         quantum_energies.append(energy_q)
         reg_d_values.append(quantum["reg_d"])
 
-        if args.verbose and idx % max(1, len(selected) // 10) == 0:
-            print(f"[{idx}/{len(selected)}] blocks processed…")
-
     total_time = time.time() - start
 
     summary = {
@@ -227,8 +352,16 @@ def run_experiment(args: argparse.Namespace):
         "block_cols": block_w,
         "total_blocks": total_blocks,
         "sampled_blocks": len(selected),
+        "unique_blocks": len(unique),
+        "dedup_ratio": len(selected) / max(1, len(unique)),
         "bit_depth": args.bit_depth,
+        "engine": args.engine,
+        "adder": args.adder,
         "shots": args.shots,
+        "batch_size": args.batch_size,
+        "pack_size": args.pack_size,
+        "mps_layout": args.mps_layout,
+        "workers": args.workers,
         "avg_quantum_energy": statistics.fmean(quantum_energies),
         "p90_quantum_energy": percentile(quantum_energies, 0.9),
         "avg_classical_energy": statistics.fmean(classical_energies),
@@ -243,23 +376,235 @@ def run_experiment(args: argparse.Namespace):
     print(f"Saved summary to {summary_path}")
 
     if len(selected) == total_blocks:
-        q_map = normalize_map(quantum_energy_map)
-        c_map = normalize_map(classical_energy_map)
+        if args.pgm_depth == 16:
+            q_map, c_map = quantum_energy_map, classical_energy_map  # raw energies
+        else:
+            q_map = normalize_map(quantum_energy_map)
+            c_map = normalize_map(classical_energy_map)
         quantum_pgm = image_path.with_name(f"{image_path.stem}_quantum_energy.pgm")
         classical_pgm = image_path.with_name(f"{image_path.stem}_classical_energy.pgm")
-        save_pgm(quantum_pgm, q_map, upsample=args.upsample)
-        save_pgm(classical_pgm, c_map, upsample=args.upsample)
+        factor = 2 if args.upsample else 1
+        write_pgm(quantum_pgm, q_map, upsample=factor, depth=args.pgm_depth)
+        write_pgm(classical_pgm, c_map, upsample=factor, depth=args.pgm_depth)
         print(f"Saved energy maps:\n  Quantum:   {quantum_pgm}\n  Classical: {classical_pgm}")
     else:
         print("Energy maps skipped (sampling mode). Use --max-blocks 0 for full export.")
 
 
-def normalize_map(values: List[List[int]]) -> List[List[int]]:
-    flat = [v for row in values for v in row]
-    vmax = max(flat) if flat else 1
+def normalize_map(values: np.ndarray, vmax: Optional[int] = None) -> np.ndarray:
+    """Scale ``values`` to 0..255 by ``vmax`` (default: the maximum of ``values``)."""
+    values = np.asarray(values)
+    if vmax is None:
+        vmax = int(values.max()) if values.size else 1
     if vmax == 0:
         vmax = 1
-    return [[int(round(255 * val / vmax)) for val in row] for row in values]
+    return np.rint(255 * values / vmax).astype(np.uint8)
+
+
+# ---------------------------------------------------------------------------
+# Streaming (strip-by-strip) runner
+# ---------------------------------------------------------------------------
+
+class HistogramStats:
+    """Running mean/percentile over bounded non-negative integers.
+
+    Memory is one counter per possible value, independent of how many values
+    are fed in; ``percentile`` matches the list-based ``percentile`` above.
+    """
+
+    def __init__(self, max_value: int):
+        self.counts = np.zeros(max_value + 1, dtype=np.int64)
+        self.total = 0
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.int64).ravel()
+        self.counts += np.bincount(values, minlength=self.counts.size)
+        self.total += int(values.sum())
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        idx = int(round((self.count - 1) * q))
+        return int(np.searchsorted(np.cumsum(self.counts), idx, side="right"))
+
+
+def weighted_median(runs: List[Tuple[float, int]]) -> float:
+    """Median of a sample given as (value, multiplicity) runs."""
+    runs = sorted(run for run in runs if run[1] > 0)
+    total = sum(count for _, count in runs)
+    if not total:
+        return 0.0
+    lower_idx, upper_idx = (total - 1) // 2, total // 2
+    seen = 0
+    lower = None
+    for value, count in runs:
+        if lower is None and seen + count > lower_idx:
+            lower = value
+        if seen + count > upper_idx:
+            return (lower + value) / 2
+        seen += count
+    return runs[-1][0]
+
+
+class EnergyMapWriter:
+    """Energy map PGM written strip by strip, scaled like ``run_experiment``.
+
+    ``depth=16`` streams the raw energies straight into the PGM.  ``depth=8``
+    needs the maximum of the whole map for ``normalize_map``, so the raw rows
+    are spooled to an anonymous temporary file and normalized on ``close``.
+    """
+
+    def __init__(self, path: Path, width: int, height: int, upsample: int = 1, depth: int = 8):
+        self.path, self.width, self.height = path, width, height
+        self.upsample, self.depth = upsample, depth
+        self.vmax = 0
+        self._spool = tempfile.TemporaryFile() if depth == 8 else None
+        self._writer = None if depth == 8 else PGMWriter(path, width, height, upsample, depth)
+
+    def write_rows(self, rows: np.ndarray):
+        rows = np.atleast_2d(rows)
+        if self._writer is not None:
+            self._writer.write_rows(rows)
+            return
+        if rows.size:
+            self.vmax = max(self.vmax, int(rows.max()))
+        self._spool.write(rows.astype(np.int64).tobytes())
+
+    def close(self, chunk_rows: int = 256):
+        if self._writer is not None:
+            self._writer.close()
+            return
+        self._spool.seek(0)
+        with PGMWriter(self.path, self.width, self.height, self.upsample, self.depth) as writer:
+            while True:
+                chunk = np.frombuffer(self._spool.read(8 * self.width * chunk_rows), np.int64)
+                if not chunk.size:
+                    break
+                writer.write_rows(normalize_map(chunk.reshape(-1, self.width), self.vmax))
+        self._spool.close()
+
+    def __enter__(self) -> "EnergyMapWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._writer is not None:
+            self._writer.__exit__(exc_type, exc, tb)
+        else:
+            self._spool.close()
+
+
+def run_streaming(args: argparse.Namespace):
+    """Process the image in horizontal strips of ``args.strip_rows`` rows.
+
+    Only one strip is decoded at a time; energy maps are written as each
+    strip finishes (see ``EnergyMapWriter``, which honours ``--pgm-depth``)
+    and the summary statistics are accumulated in fixed-size histograms, so
+    memory is bounded by the strip size.
+    Every block is processed (``--max-blocks`` does not apply).
+    """
+    image_path = Path(args.image)
+    header, rows = map_bmp_rows(image_path)
+    strip_rows = max(2, args.strip_rows - args.strip_rows % 2)
+    block_h = header.height // 2
+    block_w = header.width // 2
+    max_value = (1 << args.bit_depth) - 1
+    max_energy = 3 * (max_value >> 1)
+    factor = 2 if args.upsample else 1
+
+    quantum_stats = HistogramStats(max_energy)
+    classical_stats = HistogramStats(max_energy)
+    reg_d_stats = HistogramStats(max_value)
+    timing_counts: Counter = Counter()
+    unique_blocks = 0
+
+    quantum_pgm = image_path.with_name(f"{image_path.stem}_quantum_energy.pgm")
+    classical_pgm = image_path.with_name(f"{image_path.stem}_classical_energy.pgm")
+    start = time.time()
+    with BlockExecutor(args) as executor, EnergyMapWriter(
+        quantum_pgm, block_w, block_h, factor, args.pgm_depth
+    ) as quantum_writer, EnergyMapWriter(
+        classical_pgm, block_w, block_h, factor, args.pgm_depth
+    ) as classical_writer:
+        for top in range(0, 2 * block_h, strip_rows):
+            strip = decode_bmp_rows(header, rows[top : min(top + strip_rows, 2 * block_h)])
+            quant = quantize(strip, args.bit_depth)
+            classical_energy = max_plus_bands(quant, args.bit_depth)["energy"]
+            planes = np.stack(block_planes(quant), axis=-1)
+            blocks = [tuple(block) for block in planes.reshape(-1, 4).tolist()]
+            if args.no_dedup:
+                unique, inverse = blocks, list(range(len(blocks)))
+            else:
+                unique, inverse = dedup_blocks(blocks)  # within the strip
+
+            unique_outputs, timings = executor.run(unique)
+            outputs = [unique_outputs[idx] for idx in inverse]
+            unique_blocks += len(unique)
+            quantum_energy = np.array(
+                [block_energy(out) for out in outputs], dtype=np.int64
+            ).reshape(classical_energy.shape)
+            reg_d = np.array([out["reg_d"] for out in outputs], dtype=np.int64)
+
+            quantum_stats.update(quantum_energy)
+            classical_stats.update(classical_energy)
+            reg_d_stats.update(reg_d)
+            timing_counts.update(timings)  # one distinct value per batch
+            quantum_writer.write_rows(quantum_energy)
+            classical_writer.write_rows(classical_energy)
+
+            if args.verbose:
+                print(f"[{quantum_stats.count}/{block_h * block_w}] blocks processed…")
+    total_time = time.time() - start
+
+    summary = {
+        "image": str(image_path),
+        "width": header.width,
+        "height": header.height,
+        "block_rows": block_h,
+        "block_cols": block_w,
+        "total_blocks": block_h * block_w,
+        "sampled_blocks": quantum_stats.count,
+        "unique_blocks": unique_blocks,
+        "dedup_ratio": quantum_stats.count / max(1, unique_blocks),
+        "bit_depth": args.bit_depth,
+        "engine": args.engine,
+        "adder": args.adder,
+        "shots": args.shots,
+        "batch_size": args.batch_size,
+        "pack_size": args.pack_size,
+        "mps_layout": args.mps_layout,
+        "workers": args.workers,
+        "strip_rows": strip_rows,
+        "avg_quantum_energy": quantum_stats.mean(),
+        "p90_quantum_energy": quantum_stats.percentile(0.9),
+        "avg_classical_energy": classical_stats.mean(),
+        "p90_classical_energy": classical_stats.percentile(0.9),
+        "avg_reg_d": reg_d_stats.mean(),
+        "median_runtime_per_block_sec": weighted_median(list(timing_counts.items())),
+        "total_runtime_sec": total_time,
+    }
+    summary_path = image_path.with_name(f"{image_path.stem}_quantum_summary.json")
+    summary_path.write_text(json.dumps(summary, indent=2))
+    print(f"Saved summary to {summary_path}")
+    if args.pgm_depth == 16:
+        scale = "16-bit raw energies, maxval=65535"
+    else:  # normalize_map scales each map by its own maximum
+        scale = (
+            f"8-bit normalized, maxval=255 for energy {quantum_writer.vmax} (quantum) "
+            f"/ {classical_writer.vmax} (classical)"
+        )
+    print(
+        f"Saved energy maps ({scale}):\n"
+        f"  Quantum:   {quantum_pgm}\n  Classical: {classical_pgm}"
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -273,7 +618,32 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--image", type=str, default="cameraman.bmp", help="Input BMP")
     parser.add_argument("--bit-depth", type=int, default=4, help="Logical data bits")
     parser.add_argument(
-        "--shots", type=int, default=512, help="Shots per block simulation"
+        "--engine",
+        choices=("quantum", "permutation", "lut"),
+        default="quantum",
+        help=(
+            "quantum: simulate every block with Aer; permutation: evaluate the circuit "
+            "as a basis-state permutation; lut: gather from a precomputed table"
+        ),
+    )
+    parser.add_argument(
+        "--lut",
+        type=str,
+        default=None,
+        help="LUT path for --engine lut (default: rounding_lut_<bits>bit.npz)",
+    )
+    parser.add_argument(
+        "--adder",
+        choices=tuple(ADDER_STRATEGIES),
+        default="qft",
+        help="Adder strategy for --engine quantum and permutation "
+        "(qft: Draper QFT adder; ripple: Cuccaro)",
+    )
+    parser.add_argument(
+        "--shots",
+        type=int,
+        default=0,
+        help="Shots per block simulation (0 = shot-free readout of the basis output)",
     )
     parser.add_argument(
         "--max-blocks",
@@ -281,12 +651,53 @@ def build_parser() -> argparse.ArgumentParser:
         default=2048,
         help="Number of 2x2 blocks to sample (0 = process all)",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="Blocks submitted to the simulator per run call",
+    )
+    parser.add_argument(
+        "--pack-size",
+        type=int,
+        default=1,
+        help="Blocks packed side by side into one circuit (0 = tune automatically)",
+    )
+    parser.add_argument(
+        "--mps-layout",
+        action="store_true",
+        help="Simulate the MPS-reordered circuit (see mps_layout.py); outputs are unchanged",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes, each with its own simulator (1 = in-process)",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Simulate repeated (a, b, c, d) blocks every time instead of once per value",
+    )
     parser.add_argument("--seed", type=int, default=13, help="Sampling seed")
     parser.add_argument(
         "--upsample",
         action="store_true",
         help="Upsample block maps to the original resolution when exporting PGM",
     )
+    parser.add_argument(
+        "--pgm-depth",
+        type=int,
+        choices=(8, 16),
+        default=8,
+        help="8: normalized 0-255 maps; 16: raw (un-normalized) energies",
+    )
+    parser.add_argument(
+        "--strip-rows",
+        type=int,
+        default=0,
+        help="Stream the image in strips of this many rows (even; 0 = load whole image)",
+    )
     parser.add_argument(
         "--verbose", action="store_true", help="Print progress every 10%%"
     )
@@ -294,5 +705,9 @@ def build_parser() -> argparse.ArgumentParser:
 
 
 if __name__ == "__main__":
-    run_experiment(build_parser().parse_args())
+    cli_args = build_parser().parse_args()
+    if cli_args.strip_rows > 0:
+        run_streaming(cli_args)
+    else:
+        run_experiment(cli_args)
 
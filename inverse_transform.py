@@ -15,6 +15,7 @@ from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister, transpile
 from qiskit_aer import AerSimulator
 
 from c_qmsub_gate import build_c_qmsub_gate
+from main_round import RegisterView, _set_initial_state, logical_qubits
 from qmadd_gate import build_qmadd_gate
 from qmsub_gate import build_qmsub_gate
 
@@ -22,7 +23,6 @@ from qmsub_gate import build_qmsub_gate
 @dataclass(frozen=True)
 class InverseParams:
     """逆变换参数"""
-    data_bits: int = 4
     # 输入：分解后的系数
     result1: int  # ⌊((a-b)+(c-d))/2⌋
     result2: int  # ⌊((a-b)-(c-d))/2⌋
@@ -32,6 +32,7 @@ class InverseParams:
     comp_ab: int  # 比较位：1 if a < b else 0
     comp_cd: int  # 比较位：1 if c < d else 0
     comp_min: int # 比较位：1 if min(a,b) < min(c,d) else 0
+    data_bits: int = 4
     # LSB 信息（如果保留）
     lsb_res1: int = 0  # result1 的 LSB
     lsb_res2: int = 0  # result2 的 LSB
@@ -48,29 +49,35 @@ class InverseParams:
 
 def apply_doubling(
     qc: QuantumCircuit,
-    register: QuantumRegister,
-    shift_anc,
+    view: RegisterView,
+    name: str,
+    shift_name: str,
     lsb_value: int,
     data_bits: int,
-):
+) -> list:
     """UR 的逆操作：将 ⌊a/2⌋ 恢复为原始值
     
+    左移只是量子比特的重新标记（``RegisterView.shift_left``），不需要 SWAP：
+    shift_name 的 |0⟩ 成为新的最低位，原最高位（guard，为 0）移入 shift_name。
+
     参数:
-        register: 要恢复的寄存器（当前值为 ⌊a/2⌋）
-        shift_anc: 辅助量子比特（用于存储恢复后的 LSB）
+        view: 逻辑寄存器视图
+        name: 要恢复的寄存器名（当前值为 ⌊a/2⌋）
+        shift_name: 辅助量子比特寄存器名（提供恢复后的 LSB 位置）
         lsb_value: 原始 LSB 值（0 或 1）
         data_bits: 数据位数
+    返回:
+        name 当前对应的物理量子比特列表
     """
-    # 左移：将 register 左移一位
-    for idx in range(len(register) - 1):
-        qc.swap(register[idx], register[idx + 1])
+    register = view.shift_left(name, shift_name)
     
     # 恢复 LSB：根据 lsb_value 设置最低位
     if lsb_value == 1:
         qc.x(register[0])
     
-    # 如果 lsb_value 存储在 shift_anc 中，可以使用：
-    # qc.cx(shift_anc, register[0])
+    # 如果 LSB 仍保存在正向电路的 shift_anc 中，重新标记后它已位于最低位，
+    # 无需任何门。
+    return register
 
 
 def build_inverse_circuit(params: InverseParams) -> QuantumCircuit:
@@ -109,9 +116,9 @@ def build_inverse_circuit(params: InverseParams) -> QuantumCircuit:
         comp_ab, comp_cd, comp_min,
         name="InverseMorphologicalHaar",
     )
+    view = RegisterView(*qc.qregs)
     
     # 初始化：加载分解结果
-    from main_round import _set_initial_state
     _set_initial_state(qc, res1, params.result1, params.data_bits)
     _set_initial_state(qc, res2, params.result2, params.data_bits)
     _set_initial_state(qc, reg_a, params.reg_a, params.data_bits)
@@ -146,9 +153,7 @@ def build_inverse_circuit(params: InverseParams) -> QuantumCircuit:
     # 逆向：C_QMSUB⁻¹ + QMSUB⁻¹ + QMADD⁻¹ + UR₃⁻¹
     
     # 恢复 reg_a（需要 LSB）
-    apply_doubling(
-        qc, reg_a, anc_reg_a_shift[0], params.lsb_reg_a, params.data_bits
-    )
+    reg_a = apply_doubling(qc, view, "a", "anc_a_shift", params.lsb_reg_a, params.data_bits)
     
     # 恢复 reg_b = min(a,b) - min(c,d)
     qc.append(qmsub, list(reg_a) + list(reg_b))  # reg_a -= reg_b
@@ -177,9 +182,7 @@ def build_inverse_circuit(params: InverseParams) -> QuantumCircuit:
     # 逆向：CNOT⁻¹ + QMADD + UR₂⁻¹
     
     # 恢复 result2 = (a-b) - (c-d)
-    apply_doubling(
-        qc, res2, anc_res2_shift[0], params.lsb_res2, params.data_bits
-    )
+    res2 = apply_doubling(qc, view, "res2", "anc_res2_shift", params.lsb_res2, params.data_bits)
     qc.append(qmadd, list(res2) + list(reg_c))  # res2 += reg_c
     # 复制 res2 到 reg_a（逆 CNOT）
     for idx in range(n):
@@ -191,9 +194,7 @@ def build_inverse_circuit(params: InverseParams) -> QuantumCircuit:
     # 逆向：QMSUB ×2 + UR₁⁻¹
     
     # 恢复 result1 = (a-b) + (c-d)
-    apply_doubling(
-        qc, res1, anc_res1_shift[0], params.lsb_res1, params.data_bits
-    )
+    res1 = apply_doubling(qc, view, "res1", "anc_res1_shift", params.lsb_res1, params.data_bits)
     qc.append(qmsub, list(res1) + list(reg_c))  # res1 -= reg_c
     qc.append(qmsub, list(res1) + list(reg_a))  # res1 -= reg_a
     # 现在 res1 应该等于 0（或接近 0，由于取整误差）
@@ -208,6 +209,7 @@ def build_inverse_circuit(params: InverseParams) -> QuantumCircuit:
     # 恢复 c = (c-d) + d
     qc.append(qmadd, list(reg_c) + list(reg_d))  # reg_c += reg_d
     
+    qc.metadata = {"logical_registers": view.layout(qc)}
     return qc
 
 
@@ -257,10 +259,10 @@ def test_inverse_transform():
     cr_c = ClassicalRegister(params.arith_bits, "c_c")
     cr_d = ClassicalRegister(params.arith_bits, "c_d")
     
-    reg_a = next(reg for reg in inv_qc.qregs if reg.name == "a")
-    reg_b = next(reg for reg in inv_qc.qregs if reg.name == "b")
-    reg_c = next(reg for reg in inv_qc.qregs if reg.name == "c")
-    reg_d = next(reg for reg in inv_qc.qregs if reg.name == "d")
+    reg_a = logical_qubits(inv_qc, "a")
+    reg_b = logical_qubits(inv_qc, "b")
+    reg_c = logical_qubits(inv_qc, "c")
+    reg_d = logical_qubits(inv_qc, "d")
     
     inv_qc.add_register(cr_a, cr_b, cr_c, cr_d)
     inv_qc.measure(reg_a, cr_a)
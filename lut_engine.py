@@ -0,0 +1,158 @@
+"""Lookup-table engine for the rounded Haar circuit.
+
+For small ``data_bits`` the whole input space of a 2x2 block is tiny
+(``2**(4*data_bits)`` tuples, 65,536 for 4 bits).  The quantum circuit is run
+once per tuple and the ``(reg_a, reg_d, res1, res2)`` outputs are stored as a
+``uint8`` table, so transforming an image afterwards is a single gather.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+from itertools import islice, product
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit_aer import AerSimulator
+
+from main_round import OUTPUT_KEYS, get_rounding_template, iter_block_batches
+from permutation_backend import simulate_blocks_basis
+
+
+def default_lut_path(data_bits: int) -> Path:
+    return Path(__file__).with_name(f"rounding_lut_{data_bits}bit.npz")
+
+
+def circuit_hash(circuit: QuantumCircuit) -> str:
+    """SHA-256 over the instruction stream (names, parameters, operands)."""
+    digest = hashlib.sha256()
+    for instruction in circuit.data:
+        qubits = [circuit.find_bit(qubit).index for qubit in instruction.qubits]
+        clbits = [circuit.find_bit(clbit).index for clbit in instruction.clbits]
+        params = [f"{float(param):.12g}" for param in instruction.operation.params]
+        digest.update(f"{instruction.operation.name}{params}{qubits}{clbits};".encode())
+    return digest.hexdigest()
+
+
+def template_hash(data_bits: int, simulator: Optional[AerSimulator] = None) -> str:
+    simulator = simulator or AerSimulator(method="matrix_product_state")
+    return circuit_hash(get_rounding_template(data_bits, simulator).circuit)
+
+
+def lut_index(a, b, c, d, data_bits: int):
+    """Row of (a, b, c, d) in the table; works on ints and NumPy arrays."""
+    return ((a << data_bits | b) << data_bits | c) << data_bits | d
+
+
+def build_lut(
+    data_bits: int = 4,
+    simulator: Optional[AerSimulator] = None,
+    batch_size: int = 256,
+    verbose: bool = False,
+    backend: str = "aer",
+) -> np.ndarray:
+    """Simulate every input tuple; returns a ``(2**(4*data_bits), 4)`` uint8 table.
+
+    ``backend="permutation"`` evaluates the same circuit with the basis-state
+    permutation backend, which takes seconds instead of an Aer run per tuple.
+    """
+    if data_bits > 8:
+        raise ValueError("LUT entries are stored as uint8; data_bits must be <= 8")
+    simulator = simulator or AerSimulator(method="matrix_product_state")
+    modulus = 1 << data_bits
+    total = modulus ** 4
+    table = np.zeros((total, len(OUTPUT_KEYS)), dtype=np.uint8)
+
+    row = 0
+    inputs = product(range(modulus), repeat=4)
+    if backend == "permutation":
+        batches = (
+            simulate_blocks_basis(chunk, data_bits, simulator)
+            for chunk in iter(lambda: list(islice(inputs, batch_size)), [])
+        )
+    else:
+        batches = iter_block_batches(inputs, data_bits, simulator, 1, batch_size)
+    for batch in batches:
+        for outputs in batch:
+            table[row] = [outputs[key] for key in OUTPUT_KEYS]
+            row += 1
+        if verbose:
+            print(f"Simulated {row}/{total} inputs...", end="\r")
+    if verbose:
+        print()
+    return table
+
+
+def save_lut(path: Path, table: np.ndarray, data_bits: int, digest: str):
+    with open(path, "wb") as handle:
+        np.savez_compressed(
+            handle, table=table, data_bits=np.int64(data_bits), circuit_hash=np.str_(digest)
+        )
+
+
+def load_lut(path: Path, data_bits: int, expected_hash: Optional[str] = None) -> np.ndarray:
+    """Load a table, checking its data_bits tag and (optionally) circuit hash."""
+    with np.load(path) as archive:
+        stored_bits = int(archive["data_bits"])
+        stored_hash = str(archive["circuit_hash"])
+        table = archive["table"]
+    if stored_bits != data_bits:
+        raise ValueError(f"{path} was built for data_bits={stored_bits}, not {data_bits}")
+    if expected_hash is not None and stored_hash != expected_hash:
+        raise ValueError(f"{path} was built from a different circuit; rebuild the LUT")
+    if table.shape != (1 << (4 * data_bits), len(OUTPUT_KEYS)):
+        raise ValueError(f"{path} has unexpected table shape {table.shape}")
+    return table
+
+
+def lut_lookup(blocks: np.ndarray, table: np.ndarray, data_bits: int) -> Dict[str, np.ndarray]:
+    """Gather outputs for an ``(N, 4)`` array of (a, b, c, d) blocks."""
+    blocks = np.asarray(blocks, dtype=np.int64)
+    rows = table[lut_index(blocks[:, 0], blocks[:, 1], blocks[:, 2], blocks[:, 3], data_bits)]
+    return {key: rows[:, idx] for idx, key in enumerate(OUTPUT_KEYS)}
+
+
+def lut_transform_image(quant: np.ndarray, table: np.ndarray, data_bits: int) -> Dict[str, np.ndarray]:
+    """Apply the table to every 2x2 block of a quantized image.
+
+    Returns ``(H/2, W/2)`` arrays for reg_a, reg_d, res1 and res2.
+    """
+    quant = np.asarray(quant, dtype=np.int64)
+    height, width = (dim - dim % 2 for dim in quant.shape)
+    rows = table[
+        lut_index(
+            quant[0:height:2, 0:width:2],
+            quant[0:height:2, 1:width:2],
+            quant[1:height:2, 0:width:2],
+            quant[1:height:2, 1:width:2],
+            data_bits,
+        )
+    ]
+    return {key: rows[..., idx] for idx, key in enumerate(OUTPUT_KEYS)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the rounded-circuit lookup table.")
+    parser.add_argument("--data-bits", type=int, default=4, help="Logical data bits")
+    parser.add_argument("--output", type=str, default=None, help="Output .npz path")
+    parser.add_argument("--batch-size", type=int, default=256, help="Circuits per run call")
+    parser.add_argument(
+        "--backend",
+        choices=("aer", "permutation"),
+        default="aer",
+        help="aer: simulate each tuple; permutation: basis-state evaluation",
+    )
+    args = parser.parse_args()
+
+    simulator = AerSimulator(method="matrix_product_state")
+    table = build_lut(args.data_bits, simulator, args.batch_size, verbose=True, backend=args.backend)
+    output = Path(args.output) if args.output else default_lut_path(args.data_bits)
+    save_lut(output, table, args.data_bits, template_hash(args.data_bits, simulator))
+    print(f"Saved {table.shape[0]} entries to {output}")
+
+
+if __name__ == "__main__":
+    main()
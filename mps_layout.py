@@ -0,0 +1,197 @@
+"""Qubit ordering for the matrix-product-state simulator.
+
+Aer's MPS method keeps the qubits on a line and, before every multi-qubit
+gate, swaps the operands next to each other (``internal_swap`` in its log);
+the moved qubits stay where they are.  ``build_rounding_circuit`` declares
+a, b, c, d, res1, res2 and then the nine one-qubit ancillas, so ``comp_min``
+and the guards start far from the registers they touch.
+
+``optimize_layout`` picks the initial qubit order: ``mps_swap_count`` replays
+Aer's swap rule for the decomposed gate sequence, and the order is improved
+from the better of the declaration and spectral orders by moving single
+qubits.  ``apply_layout`` rebuilds the circuit on that order while keeping
+every register, so the measurement map and ``logical_qubits`` are unchanged.
+``parse_mps_log`` / ``MPSLogReader`` turn Aer's ``MPS_log_data`` into
+bond-dimension and truncation statistics (see ``mps_layout_report.py``).
+"""
+
+from __future__ import annotations
+
+import re
+from itertools import combinations
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from qiskit import QuantumCircuit, transpile
+
+from peephole import DECOMPOSED_BASIS
+
+
+def interaction_sequence(circuit: QuantumCircuit) -> List[Tuple[int, ...]]:
+    """Operand indices of every multi-qubit gate after decomposition, in order."""
+    decomposed = transpile(circuit, basis_gates=DECOMPOSED_BASIS, optimization_level=0)
+    return [
+        tuple(decomposed.find_bit(qubit).index for qubit in instruction.qubits)
+        for instruction in decomposed.data
+        if instruction.operation.name != "barrier" and len(instruction.qubits) > 1
+    ]
+
+
+def mps_swap_count(sequence: Sequence[Tuple[int, ...]], order: Sequence[int]) -> int:
+    """Internal swaps Aer's MPS method performs for ``sequence`` from ``order``.
+
+    Aer does not move qubits back after a gate: for two operands the right one
+    moves next to the left one, for three the outer ones move next to the
+    middle one, and the new order persists.  This replays that rule and
+    matches the ``internal_swap`` entries of ``MPS_log_data`` exactly.
+    """
+    order = list(order)
+    position = {qubit: index for index, qubit in enumerate(order)}
+    total = 0
+    for operands in sequence:
+        spots = sorted(position[qubit] for qubit in operands)
+        if len(spots) == 2:
+            moves = [(spots[1], spots[0] + 1)]
+        else:
+            moves = [(spots[2], spots[1] + 1), (spots[0], spots[1] - 1)]
+        for source, target in moves:
+            if source == target:
+                continue
+            order.insert(target, order.pop(source))
+            total += abs(source - target)
+            for index in range(min(source, target), max(source, target) + 1):
+                position[order[index]] = index
+    return total
+
+
+def spectral_order(sequence: Sequence[Tuple[int, ...]], num_qubits: int) -> List[int]:
+    """Qubits sorted by the Fiedler vector of the weighted interaction graph."""
+    weights = np.zeros((num_qubits, num_qubits))
+    for operands in sequence:
+        for first, second in combinations(operands, 2):
+            weights[first, second] += 1.0
+            weights[second, first] += 1.0
+    laplacian = np.diag(weights.sum(axis=1)) - weights
+    _, vectors = np.linalg.eigh(laplacian)
+    fiedler = vectors[:, 1] if num_qubits > 1 else vectors[:, 0]
+    return [int(qubit) for qubit in np.argsort(fiedler, kind="stable")]
+
+
+def improve_order(
+    sequence: Sequence[Tuple[int, ...]], order: List[int], max_passes: int = 3
+) -> List[int]:
+    """Move single qubits to the slot that lowers the swap count, until stable."""
+    order = list(order)
+    best = mps_swap_count(sequence, order)
+    for _ in range(max_passes):
+        improved = False
+        for qubit in list(order):
+            rest = [q for q in order if q != qubit]
+            for slot in range(len(order)):
+                candidate = rest[:slot] + [qubit] + rest[slot:]
+                cost = mps_swap_count(sequence, candidate)
+                if cost < best:
+                    order, best, improved = candidate, cost, True
+        if not improved:
+            break
+    return order
+
+
+def optimize_layout(circuit: QuantumCircuit, max_passes: int = 3) -> List[int]:
+    """Qubit indices of ``circuit`` in their new left-to-right MPS order."""
+    sequence = interaction_sequence(circuit)
+    starts = [list(range(circuit.num_qubits))]
+    if sequence:
+        starts.append(spectral_order(sequence, circuit.num_qubits))
+    start = min(starts, key=lambda order: mps_swap_count(sequence, order))
+    return improve_order(sequence, start, max_passes)
+
+
+def apply_layout(circuit: QuantumCircuit, order: Sequence[int]) -> QuantumCircuit:
+    """Copy of ``circuit`` whose qubit ``i`` is the old qubit ``order[i]``.
+
+    Registers, clbits and instructions are shared, only qubit indices move;
+    ``metadata["logical_registers"]`` is renumbered accordingly.
+    """
+    result = QuantumCircuit(
+        [circuit.qubits[index] for index in order],
+        circuit.clbits,
+        name=circuit.name,
+        global_phase=circuit.global_phase,
+    )
+    result.add_register(*circuit.qregs, *circuit.cregs)
+    for instruction in circuit.data:
+        result.append(instruction)
+
+    metadata = dict(circuit.metadata or {})
+    if "logical_registers" in metadata:
+        new_index = {old: new for new, old in enumerate(order)}
+        metadata["logical_registers"] = {
+            name: [new_index[index] for index in indices]
+            for name, indices in metadata["logical_registers"].items()
+        }
+    result.metadata = metadata
+    return result
+
+
+_LOG_ENTRY = re.compile(r"(?:I\d+:)?(\w+) on qubits [\d,]+, BD=\[([\d ]+)\]")
+_DISCARDED = re.compile(r"discarded_value=([0-9.eE+-]+)")
+
+
+def parse_mps_log(log: str) -> Dict[str, float]:
+    """Bond-dimension and truncation statistics of an ``MPS_log_data`` string."""
+    gates = 0
+    internal_swaps = 0
+    max_bond = 1
+    bond_sum = 0
+    for name, bonds in _LOG_ENTRY.findall(log):
+        if name == "internal_swap":
+            internal_swaps += 1
+        else:
+            gates += 1
+        largest = max((int(value) for value in bonds.split()), default=1)
+        max_bond = max(max_bond, largest)
+        bond_sum += largest
+    discarded = [float(value) for value in _DISCARDED.findall(log)]
+    return {
+        "gates": gates,
+        "internal_swaps": internal_swaps,
+        "max_bond_dimension": max_bond,
+        "mean_max_bond_dimension": bond_sum / max(1, gates + internal_swaps),
+        "truncations": len(discarded),
+        "discarded_total": float(sum(discarded)),
+        "discarded_max": max(discarded, default=0.0),
+    }
+
+
+class MPSLogReader:
+    """Per-experiment statistics from ``mps_log_data=True`` results.
+
+    Aer appends to one log per process and returns the whole log with every
+    experiment, so each ``read`` parses only the part added since the last.
+    Run with ``max_parallel_experiments=1`` so experiments log one at a time.
+    """
+
+    def __init__(self):
+        self._seen = ""
+
+    def read(self, metadata: Dict) -> Dict[str, float]:
+        body = metadata.get("MPS_log_data", "").strip("{} ")
+        fresh = body[len(self._seen):] if body.startswith(self._seen) else body
+        self._seen = body
+        return parse_mps_log(fresh)
+
+
+def merge_mps_stats(stats: Sequence[Dict[str, float]]) -> Dict[str, float]:
+    """Aggregate ``parse_mps_log`` results over several experiments."""
+    if not stats:
+        return {}
+    return {
+        "experiments": len(stats),
+        "internal_swaps_per_experiment": float(np.mean([s["internal_swaps"] for s in stats])),
+        "max_bond_dimension": max(s["max_bond_dimension"] for s in stats),
+        "mean_max_bond_dimension": float(np.mean([s["mean_max_bond_dimension"] for s in stats])),
+        "truncations": sum(s["truncations"] for s in stats),
+        "discarded_total": float(sum(s["discarded_total"] for s in stats)),
+        "discarded_max": max(s["discarded_max"] for s in stats),
+    }
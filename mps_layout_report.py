@@ -0,0 +1,120 @@
+"""Effect of the MPS qubit layout on swaps, bond dimension and latency.
+
+For every ``data_bits`` the pipeline template is built with the declaration
+order and with ``mps_layout``; the report lists the predicted and measured
+(``MPS_log_data``) internal swaps per block, the maximum bond dimension,
+truncation events and discarded weight, and the MPS simulation time per block
+over a fixed set of random blocks.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+from qiskit_aer import AerSimulator
+
+from bitsliced_verify import classical_reference_arrays, split_inputs
+from main_round import RoundingTemplate
+from mps_layout import MPSLogReader, interaction_sequence, merge_mps_stats, mps_swap_count
+
+
+def layout_entry(
+    data_bits: int,
+    mps_layout: bool,
+    blocks: int = 16,
+    approximation_degree: int = 0,
+    adder: str = "qft",
+    seed: int = 0,
+    reader: MPSLogReader = None,
+) -> Dict:
+    simulator = AerSimulator(method="matrix_product_state")
+    t0 = time.time()
+    template = RoundingTemplate(data_bits, simulator, approximation_degree, adder, mps_layout)
+    entry = {
+        "data_bits": data_bits,
+        "mps_layout": mps_layout,
+        "adder": adder,
+        "approximation_degree": approximation_degree,
+        "qubits": template.circuit.num_qubits,
+        "template_sec": time.time() - t0,
+        "predicted_swaps": mps_swap_count(
+            interaction_sequence(template.circuit), range(template.circuit.num_qubits)
+        ),
+    }
+
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, 1 << (4 * data_bits), size=blocks, dtype=np.int64)
+    inputs = split_inputs(indices, data_bits)
+    expected = classical_reference_arrays(*inputs, data_bits)
+    circuits = [template.bind(*(int(v[pos]) for v in inputs)) for pos in range(blocks)]
+
+    t0 = time.time()
+    result = simulator.run(circuits, shots=1, max_parallel_experiments=0).result()
+    entry["sim_sec_per_block"] = (time.time() - t0) / max(1, blocks)
+    entry["correct_blocks"] = sum(
+        template.parse(result.get_counts(pos))
+        == tuple(int(values[pos]) for values in expected)
+        for pos in range(blocks)
+    )
+    entry["blocks"] = blocks
+
+    # Telemetry run: logging slows Aer down, so it is kept out of the timing.
+    logger = AerSimulator(method="matrix_product_state", mps_log_data=True)
+    reader = reader or MPSLogReader()
+    stats = []
+    for circuit in circuits:
+        logged = logger.run(circuit, shots=1).result()
+        stats.append(reader.read(logged.results[0].metadata))
+    entry["mps"] = merge_mps_stats(stats)
+    return entry
+
+
+def layout_report(
+    data_bits: Sequence[int],
+    blocks: int = 16,
+    approximation_degree: int = 0,
+    adder: str = "qft",
+    seed: int = 0,
+) -> List[Dict]:
+    reader = MPSLogReader()  # Aer's log is per process, so one reader for all entries
+    return [
+        layout_entry(bits, mps_layout, blocks, approximation_degree, adder, seed, reader)
+        for bits in data_bits
+        for mps_layout in (False, True)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MPS qubit layout report.")
+    parser.add_argument("--data-bits", type=int, nargs="+", default=[2, 4, 6])
+    parser.add_argument("--blocks", type=int, default=16, help="Random blocks per setting")
+    parser.add_argument("--approximation-degree", type=int, default=0)
+    parser.add_argument("--adder", type=str, default="qft")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed")
+    parser.add_argument("--output", type=str, default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = layout_report(
+        args.data_bits, args.blocks, args.approximation_degree, args.adder, args.seed
+    )
+    for entry in report:
+        mps = entry["mps"]
+        print(
+            f"data_bits={entry['data_bits']} layout={'mps' if entry['mps_layout'] else 'declared'}: "
+            f"{mps['internal_swaps_per_experiment']:.0f} swaps/block "
+            f"(predicted {entry['predicted_swaps']}), max BD {mps['max_bond_dimension']}, "
+            f"{mps['truncations']} truncations (discarded {mps['discarded_total']:.2e}), "
+            f"{entry['sim_sec_per_block'] * 1e3:.1f} ms/block, "
+            f"{entry['correct_blocks']}/{entry['blocks']} correct"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
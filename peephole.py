@@ -0,0 +1,97 @@
+"""Unwrap the QFT adders and cancel IQFT/QFT pairs between them.
+
+Every QMADD/QMSUB/C_QMSUB block is QFT -> MADD/MSUB -> IQFT on its target
+register.  When two adders hit the same target back to back (Stage 2 adds
+``a`` then ``c`` into ``res1``; Stage 6 subtracts ``c`` from and then adds
+``b`` to ``reg_a``), the first block's IQFT is immediately undone by the
+second block's QFT.  ``unwrap_adders`` exposes the pieces and
+``cancel_qft_pairs`` drops every IQFT directly followed by the matching QFT
+on the same qubits, leaving the measured output unchanged.
+``build_rounding_circuit(..., fuse_qft=True)`` applies both passes.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from qiskit import QuantumCircuit, transpile
+
+
+ADDER_BLOCKS = ("QMADD", "QMSUB", "C_QMSUB")
+DECOMPOSED_BASIS = ["h", "cp", "x", "cx", "ccx", "swap", "cswap"]
+
+
+def _is_adder(name: str) -> bool:
+    return name.split("_approx")[0] in ADDER_BLOCKS
+
+
+def unwrap_adders(circuit: QuantumCircuit) -> QuantumCircuit:
+    """Replace adder blocks by their QFT, MADD/MSUB, IQFT (and CX) pieces."""
+    result = circuit.copy_empty_like()
+
+    def emit(operation, qubits, clbits):
+        if _is_adder(operation.name):
+            definition = operation.definition
+            for inner in definition.data:
+                emit(
+                    inner.operation,
+                    [qubits[definition.find_bit(q).index] for q in inner.qubits],
+                    [clbits[definition.find_bit(c).index] for c in inner.clbits],
+                )
+        else:
+            result.append(operation, qubits, clbits)
+
+    for instruction in circuit.data:
+        emit(instruction.operation, list(instruction.qubits), list(instruction.clbits))
+    return result
+
+
+def cancel_qft_pairs(circuit: QuantumCircuit) -> Tuple[QuantumCircuit, int]:
+    """Drop IQFT/QFT pairs with nothing in between on their qubits.
+
+    Returns the new circuit and the number of pairs removed.
+    """
+    kept: List = []
+    last_on_qubit: Dict = {}  # qubit -> stack of indices into ``kept``
+    removed = 0
+    for instruction in circuit.data:
+        operation = instruction.operation
+        qubits = list(instruction.qubits)
+        if operation.name == "QFT":
+            tops = {last_on_qubit[q][-1] if last_on_qubit.get(q) else None for q in qubits}
+            if len(tops) == 1 and None not in tops:
+                index = tops.pop()
+                previous = kept[index]
+                if list(previous.qubits) == qubits and previous.operation == operation.inverse():
+                    kept[index] = None
+                    for qubit in qubits:
+                        last_on_qubit[qubit].pop()
+                    removed += 1
+                    continue
+        for qubit in qubits:
+            last_on_qubit.setdefault(qubit, []).append(len(kept))
+        kept.append(instruction)
+
+    result = circuit.copy_empty_like()
+    for instruction in kept:
+        if instruction is not None:
+            result.append(instruction)
+    return result, removed
+
+
+def optimize_adders(circuit: QuantumCircuit) -> Tuple[QuantumCircuit, int]:
+    """``unwrap_adders`` followed by ``cancel_qft_pairs``."""
+    return cancel_qft_pairs(unwrap_adders(circuit))
+
+
+def circuit_cost(circuit: QuantumCircuit) -> Dict[str, int]:
+    """Gate counts and depth after decomposing every block (barriers excluded)."""
+    decomposed = transpile(circuit, basis_gates=DECOMPOSED_BASIS, optimization_level=0)
+    ops = decomposed.count_ops()
+    return {
+        "gates": sum(count for name, count in ops.items() if name != "barrier"),
+        "cp": ops.get("cp", 0),
+        "h": ops.get("h", 0),
+        "ccx": ops.get("ccx", 0),
+        "depth": decomposed.depth(lambda instruction: instruction.operation.name != "barrier"),
+    }
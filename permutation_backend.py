@@ -0,0 +1,248 @@
+"""Basis-state permutation backend for the deterministic arithmetic pipeline.
+
+On a classical basis input every operation in ``build_rounding_circuit`` maps
+a basis state to a basis state: X/CX/SWAP/CSWAP permute bits, and the
+QMADD/QMSUB/C_QMSUB blocks taken as wholes are modular integer operations.
+Such circuits are evaluated here bit by bit, without a state vector or MPS.
+A circuit that contains anything else (H, phase rotations, ...) raises
+``NonPermutationError``; ``simulate_block_basis`` then falls back to Aer.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from qiskit import QuantumCircuit
+from qiskit_aer import AerSimulator
+
+from adders import ADDER_STRATEGIES
+from main_round import (
+    INPUT_REGISTERS,
+    OUTPUT_KEYS,
+    ArithmeticParams,
+    add_output_measurements,
+    build_rounding_circuit,
+    simulate_blocks,
+)
+
+
+Program = List[Tuple[str, tuple]]
+
+BIT_GATES = ("x", "cx", "ccx", "swap", "cswap")
+ADDER_SIGNS = {"QMADD": 1, "QMSUB": -1}
+ADDER_BLOCKS = {"QMADD": 0, "QMSUB": 0, "C_QMSUB": 1}  # qubits besides the two registers
+IGNORED = ("barrier", "id", "delay")
+
+
+class NonPermutationError(ValueError):
+    """Raised when a circuit contains an operation that is not a basis permutation."""
+
+
+def compile_program(circuit: QuantumCircuit) -> Program:
+    """Translate ``circuit`` into a flat list of (op, operands) steps.
+
+    Arithmetic blocks are recognized by ``adder_block``; other composite
+    instructions are inlined through their definition, so e.g. a Toffoli-based
+    adder compiles down to bit gates.
+    """
+    program: Program = []
+    _compile_into(program, circuit, list(range(circuit.num_qubits)), list(range(circuit.num_clbits)))
+    return program
+
+
+def adder_block(name: str, num_qubits: int) -> Optional[Tuple[str, int]]:
+    """``(base, n)`` for an exact QMADD/QMSUB/C_QMSUB block, else ``None``.
+
+    ``name`` must be ``strategy.block_name(base)`` for a registered adder
+    strategy (``QMSUB``, ``QMSUB_ripple``, ...); the register width ``n``
+    then solves ``2n + extra + strategy.num_ancillas(n) == num_qubits``.
+    Approximate blocks (``_approx<d>``) are not basis permutations.
+    """
+    for base, extra in ADDER_BLOCKS.items():
+        for strategy_class in ADDER_STRATEGIES.values():
+            strategy = strategy_class()
+            if strategy.block_name(base) != name:
+                continue
+            for n in range(1, num_qubits // 2 + 1):
+                if 2 * n + extra + strategy.num_ancillas(n) == num_qubits:
+                    return base, n
+    return None
+
+
+def _compile_into(program: Program, circuit: QuantumCircuit, qubit_map, clbit_map):
+    for instruction in circuit.data:
+        operation = instruction.operation
+        name = operation.name
+        qubits = tuple(qubit_map[circuit.find_bit(q).index] for q in instruction.qubits)
+        clbits = tuple(clbit_map[circuit.find_bit(c).index] for c in instruction.clbits)
+        if name in IGNORED:
+            continue
+        if name in BIT_GATES:
+            program.append((name, qubits))
+        elif name == "measure":
+            program.append(("measure", (qubits[0], clbits[0])))
+        elif adder_block(name, len(qubits)) is not None:
+            base, n = adder_block(name, len(qubits))
+            if base == "C_QMSUB":
+                program.append(("csub", (qubits[0], qubits[1 : n + 1], qubits[n + 1 : 2 * n + 1])))
+            else:
+                program.append(("add", (qubits[:n], qubits[n : 2 * n], ADDER_SIGNS[base])))
+        elif getattr(operation, "definition", None) is not None and not operation.params:
+            _compile_into(program, operation.definition, qubits, clbits)
+        else:
+            raise NonPermutationError(f"'{name}' is not a basis-state permutation")
+
+
+class BasisState:
+    """Qubit values of one basis state, with register-level integer access.
+
+    Bit operations only use ``^``, ``&`` and item swaps, so subclasses can
+    store whole vectors of inputs per qubit and reuse ``run_program``; ``one``
+    is the value that XOR-flips a qubit.
+    """
+
+    one = 1
+
+    def __init__(self, qubits: Sequence[int], num_clbits: int):
+        self.bits = list(qubits)
+        self.clbits = [0] * num_clbits
+
+    def read(self, qubits: Sequence[int]):
+        value = 0
+        for idx, qubit in enumerate(qubits):
+            value |= self.bits[qubit] << idx
+        return value
+
+    def write(self, qubits: Sequence[int], value):
+        for idx, qubit in enumerate(qubits):
+            self.bits[qubit] = (value >> idx) & 1
+
+    def add(self, target: Sequence[int], control: Sequence[int], sign: int):
+        """QMADD (``sign=1``) or QMSUB (``sign=-1``): target += sign * control."""
+        mask = (1 << len(target)) - 1
+        self.write(target, (self.read(target) + sign * self.read(control)) & mask)
+
+    def csub(self, comp: int, target: Sequence[int], control: Sequence[int]):
+        """C_QMSUB: target -= control, then comp ^= top bit of target."""
+        self.add(target, control, -1)
+        self.bits[comp] ^= self.bits[target[-1]]
+
+
+def run_program(program: Program, state: BasisState) -> BasisState:
+    bits = state.bits
+    for op, args in program:
+        if op == "x":
+            bits[args[0]] ^= state.one
+        elif op == "cx":
+            bits[args[1]] ^= bits[args[0]]
+        elif op == "ccx":
+            bits[args[2]] ^= bits[args[0]] & bits[args[1]]
+        elif op == "swap":
+            a, b = args
+            bits[a], bits[b] = bits[b], bits[a]
+        elif op == "cswap":
+            ctrl, a, b = args
+            diff = (bits[a] ^ bits[b]) & bits[ctrl]
+            bits[a] ^= diff
+            bits[b] ^= diff
+        elif op == "add":
+            state.add(*args)
+        elif op == "csub":
+            state.csub(*args)
+        elif op == "measure":
+            qubit, clbit = args
+            state.clbits[clbit] = bits[qubit]
+    return state
+
+
+def basis_counts(circuit: QuantumCircuit, shots: int = 1) -> Dict[str, int]:
+    """Aer-style counts for a circuit that starts in |0...0>.
+
+    The bitstring lists classical registers last-added first, separated by
+    spaces, exactly as ``result.get_counts()`` formats it.
+    """
+    state = BasisState([0] * circuit.num_qubits, circuit.num_clbits)
+    run_program(compile_program(circuit), state)
+    words = []
+    for creg in reversed(circuit.cregs):
+        indices = [circuit.find_bit(clbit).index for clbit in creg]
+        words.append("".join(str(state.clbits[idx]) for idx in reversed(indices)))
+    return {" ".join(words): shots}
+
+
+class PermutationTemplate:
+    """Compiled rounding pipeline for one ``data_bits``, evaluated per block."""
+
+    def __init__(self, data_bits: int, adder: str = "qft", approximation_degree: int = 0):
+        self.params = ArithmeticParams(
+            data_bits=data_bits, adder=adder, approximation_degree=approximation_degree
+        )
+        qc = build_rounding_circuit(self.params, load_inputs=False)
+        cregs = add_output_measurements(qc)
+        self.program = compile_program(qc)
+        self.num_qubits = qc.num_qubits
+        self.input_qubits = [
+            [qc.find_bit(q).index for q in next(reg for reg in qc.qregs if reg.name == name)]
+            for name in INPUT_REGISTERS
+        ]
+        self.output_clbits = [[qc.find_bit(c).index for c in creg] for creg in cregs]
+
+    def run(self, a: int, b: int, c: int, d: int) -> Tuple[int, int, int, int]:
+        state = BasisState([0] * self.num_qubits, sum(map(len, self.output_clbits)))
+        for qubits, value in zip(self.input_qubits, (a, b, c, d)):
+            state.write(qubits[: self.params.data_bits], value % self.params.modulus)
+        run_program(self.program, state)
+        mask = self.params.modulus - 1
+        return tuple(
+            sum(state.clbits[idx] << pos for pos, idx in enumerate(clbits)) & mask
+            for clbits in self.output_clbits
+        )
+
+
+_TEMPLATES: Dict[Tuple[int, str, int], Optional[PermutationTemplate]] = {}
+
+
+def get_permutation_template(
+    data_bits: int, adder: str = "qft", approximation_degree: int = 0
+) -> Optional[PermutationTemplate]:
+    """Cached template, or None if the pipeline is not a pure permutation."""
+    key = (data_bits, adder, approximation_degree)
+    if key not in _TEMPLATES:
+        try:
+            _TEMPLATES[key] = PermutationTemplate(data_bits, adder, approximation_degree)
+        except NonPermutationError:
+            _TEMPLATES[key] = None
+    return _TEMPLATES[key]
+
+
+def simulate_block_basis(
+    a: int,
+    b: int,
+    c: int,
+    d: int,
+    data_bits: int,
+    simulator: Optional[AerSimulator] = None,
+    shots: int = 1,
+    adder: str = "qft",
+) -> Dict[str, int]:
+    """Drop-in for ``simulate_block`` that skips Aer whenever it can."""
+    template = get_permutation_template(data_bits, adder)
+    if template is not None:
+        return dict(zip(OUTPUT_KEYS, template.run(a, b, c, d)))
+    simulator = simulator or AerSimulator(method="matrix_product_state")
+    return simulate_blocks([(a, b, c, d)], data_bits, simulator, shots, adder=adder)[0]
+
+
+def simulate_blocks_basis(
+    blocks: Sequence[Tuple[int, int, int, int]],
+    data_bits: int,
+    simulator: Optional[AerSimulator] = None,
+    shots: int = 1,
+    adder: str = "qft",
+) -> List[Dict[str, int]]:
+    """Batched counterpart of ``simulate_block_basis``."""
+    template = get_permutation_template(data_bits, adder)
+    if template is None:
+        simulator = simulator or AerSimulator(method="matrix_product_state")
+        return simulate_blocks(blocks, data_bits, simulator, shots, adder=adder)
+    return [dict(zip(OUTPUT_KEYS, template.run(*block))) for block in blocks]
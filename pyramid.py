@@ -0,0 +1,190 @@
+"""Multi-level (pyramid) morphological Haar decomposition.
+
+Each level turns the 2x2 blocks of its input into the res1/res2/reg_a detail
+bands and the min approximation ``reg_d``; the ``reg_d`` band is then fed back
+as the next level's image.  Since ``reg_d`` stays below ``2**data_bits`` every
+level reuses the same circuit width.  Levels can run on the vectorized
+classical engine, a lookup table, or the quantum circuit itself.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from qiskit_aer import AerSimulator
+
+from image_io import read_bmp_grayscale, write_pgm
+from lut_engine import default_lut_path, load_lut, lut_transform_image, template_hash
+from main_round import OUTPUT_KEYS, get_rounding_template, simulate_blocks
+from maxplus_engine import block_planes, max_plus_bands, quantize
+
+
+DETAIL_BANDS = ("res1", "res2", "reg_a")
+Engine = Callable[[np.ndarray], Dict[str, np.ndarray]]
+
+
+@dataclass
+class PyramidLevel:
+    level: int
+    bands: Dict[str, np.ndarray]  # reg_a, reg_d, res1, res2 on the level's block grid
+    blocks: int
+    elapsed_sec: float
+
+
+def classical_engine(data_bits: int) -> Engine:
+    return lambda quant: max_plus_bands(quant, data_bits)
+
+
+def lut_engine(data_bits: int, table: np.ndarray) -> Engine:
+    return lambda quant: lut_transform_image(quant, table, data_bits)
+
+
+def quantum_engine(
+    data_bits: int, simulator: AerSimulator, shots: int = 0, batch_size: int = 64
+) -> Engine:
+    def run(quant: np.ndarray) -> Dict[str, np.ndarray]:
+        planes = block_planes(quant)
+        blocks = np.stack(planes, axis=-1).reshape(-1, 4).tolist()
+        outputs = simulate_blocks(blocks, data_bits, simulator, shots, batch_size)
+        return {
+            key: np.array([out[key] for out in outputs], dtype=np.int16).reshape(planes[0].shape)
+            for key in OUTPUT_KEYS
+        }
+
+    return run
+
+
+def decompose(quant: np.ndarray, levels: int, engine: Engine) -> List[PyramidLevel]:
+    """Run up to ``levels`` levels, stopping early once the approximation is < 2x2."""
+    result: List[PyramidLevel] = []
+    current = np.asarray(quant)
+    for level in range(1, levels + 1):
+        if min(current.shape) < 2:
+            break
+        t0 = time.time()
+        bands = engine(current)
+        elapsed = time.time() - t0
+        result.append(PyramidLevel(level, bands, bands["reg_d"].size, elapsed))
+        current = bands["reg_d"]
+    return result
+
+
+def pack_bands(levels: List[PyramidLevel]) -> np.ndarray:
+    """Lay the bands out in one array, in the usual wavelet (Mallat) order.
+
+    Level ``k`` occupies the top-left ``2h x 2w`` region of its parent, with
+    res1 top-right, res2 bottom-left and reg_a bottom-right.  The final
+    ``reg_d`` approximation sits in the top-left corner.
+    """
+    if not levels:
+        raise ValueError("No decomposition levels to pack")
+    h, w = levels[0].bands["reg_d"].shape
+    packed = np.zeros((2 * h, 2 * w), dtype=np.uint8)
+    for level in levels:
+        h, w = level.bands["reg_d"].shape
+        packed[:h, w : 2 * w] = level.bands["res1"]
+        packed[h : 2 * h, :w] = level.bands["res2"]
+        packed[h : 2 * h, w : 2 * w] = level.bands["reg_a"]
+        packed[:h, :w] = level.bands["reg_d"]
+    return packed
+
+
+def level_report(
+    levels: List[PyramidLevel],
+    data_bits: int,
+    engine_name: str,
+    simulator: Optional[AerSimulator] = None,
+) -> List[Dict]:
+    """Per-level block counts and timing, plus each level's quantum cost.
+
+    The cost comes from the transpiled template, which is only built for the
+    quantum engine (on its ``simulator``); other engines report no cost.
+    """
+    qubits = gates = None
+    if engine_name == "quantum":
+        simulator = simulator or AerSimulator(method="matrix_product_state")
+        circuit = get_rounding_template(data_bits, simulator).circuit
+        qubits = circuit.num_qubits
+        ops = circuit.count_ops()
+        gates = sum(count for name, count in ops.items() if name not in ("barrier", "measure"))
+    report = []
+    for level in levels:
+        entry = {
+            "level": level.level,
+            "engine": engine_name,
+            "block_grid": list(level.bands["reg_d"].shape),
+            "blocks": level.blocks,
+            "elapsed_sec": level.elapsed_sec,
+            "avg_detail_energy": float(
+                np.mean(sum(level.bands[key].astype(np.int64) for key in DETAIL_BANDS))
+            ),
+        }
+        if gates is not None:
+            entry["quantum_cost"] = {
+                "circuits": level.blocks,
+                "qubits_per_circuit": qubits,
+                "gates_per_circuit": gates,
+                "total_gates": gates * level.blocks,
+            }
+        report.append(entry)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-level morphological Haar pyramid.")
+    parser.add_argument("--image", type=str, default="cameraman.bmp", help="Input BMP")
+    parser.add_argument("--bit-depth", type=int, default=4, help="Logical data bits")
+    parser.add_argument("--levels", type=int, default=3, help="Decomposition depth")
+    parser.add_argument(
+        "--engine", choices=("classical", "lut", "quantum"), default="classical"
+    )
+    parser.add_argument("--lut", type=str, default=None, help="LUT path for --engine lut")
+    parser.add_argument(
+        "--shots", type=int, default=0, help="Shots per block (quantum, 0 = shot-free)"
+    )
+    parser.add_argument("--batch-size", type=int, default=64, help="Blocks per run call")
+    args = parser.parse_args()
+
+    image_path = Path(args.image)
+    quant = quantize(read_bmp_grayscale(image_path), args.bit_depth)
+
+    simulator = None
+    if args.engine == "classical":
+        engine = classical_engine(args.bit_depth)
+    elif args.engine == "lut":
+        path = Path(args.lut) if args.lut else default_lut_path(args.bit_depth)
+        table = load_lut(path, args.bit_depth, template_hash(args.bit_depth))
+        engine = lut_engine(args.bit_depth, table)
+    else:
+        simulator = AerSimulator(method="matrix_product_state")
+        engine = quantum_engine(args.bit_depth, simulator, args.shots, args.batch_size)
+
+    levels = decompose(quant, args.levels, engine)
+    packed = pack_bands(levels)
+
+    stem = image_path.with_name(f"{image_path.stem}_pyramid")
+    write_pgm(stem.with_suffix(".pgm"), packed, maxval=(1 << args.bit_depth) - 1)
+    report = {
+        "image": str(image_path),
+        "bit_depth": args.bit_depth,
+        "levels": level_report(levels, args.bit_depth, args.engine, simulator),
+    }
+    stem.with_suffix(".json").write_text(json.dumps(report, indent=2))
+    print(f"Saved {len(levels)}-level pyramid to {stem.with_suffix('.pgm')}")
+    for entry in report["levels"]:
+        cost = entry.get("quantum_cost")
+        gates = f"{cost['total_gates']} gates, " if cost else ""
+        print(
+            f"  level {entry['level']}: {entry['blocks']} blocks, {gates}"
+            f"{entry['elapsed_sec']:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,23 @@
 from qiskit import QuantumCircuit, QuantumRegister
 
-from qquantum_module import iqft, madd, qft
+from adders import get_adder_strategy, work_registers
 
 
-def build_qmadd_gate(n: int):
-    """n 位量子模加法器：target = (target + control) mod 2**n"""
+def build_qmadd_gate(n: int, approximation_degree: int = 0, adder: str = "qft"):
+    """n 位量子模加法器：target = (target + control) mod 2**n
+
+    adder 选择加法策略（见 ``adders.py``：``qft`` 或 ``ripple``）；需要工作比特的
+    策略在 control 之后追加 ``work`` 寄存器，运算前后均为 |0⟩。
+    approximation_degree > 0 时（仅 qft）省略最小的若干档旋转（近似 QFT，见
+    ``qquantum_module.keep_rotation``），门名追加 ``_approx<d>`` 以区别于精确版本。
+    """
+    strategy = get_adder_strategy(adder, approximation_degree)
     target = QuantumRegister(n, "target")
     control = QuantumRegister(n, "control")
-    qc = QuantumCircuit(target, control, name="QMADD")
+    work = work_registers(strategy, n)
+    qc = QuantumCircuit(target, control, *work, name=strategy.block_name("QMADD"))
 
-    qc.append(qft(n), list(target))
-    qc.append(madd(n), list(target) + list(control))
-    qc.append(iqft(n), list(target))
+    strategy.append_add(qc, target, control, [q for reg in work for q in reg])
 
     return qc.to_instruction()
 
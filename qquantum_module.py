@@ -2,28 +2,45 @@ from qiskit import QuantumCircuit
 import numpy as np
 
 
-def qft(n):
+def keep_rotation(k, n, approximation_degree=0):
+    """Whether a cp(π/2**k) rotation survives on an n-qubit register.
+
+    ``approximation_degree`` drops that many of the smallest angle classes:
+    rotations with ``k > n - 1 - approximation_degree`` are omitted, so 0
+    keeps every rotation (exact arithmetic).
+    """
+    return k <= n - 1 - approximation_degree
+
+
+def adder_name(name, approximation_degree=0):
+    """Instruction name of an adder block; approximate variants get a suffix."""
+    return f"{name}_approx{approximation_degree}" if approximation_degree else name
+
+
+def qft(n, approximation_degree=0):
     """Creates an n-qubit QFT instruction (without final swaps)."""
     qc = QuantumCircuit(n, name="QFT")
     for i in range(n - 1, -1, -1):
         qc.h(i)
         for j in range(i - 1, -1, -1):
-            qc.cp(np.pi / 2 ** (i - j), j, i)
+            if keep_rotation(i - j, n, approximation_degree):
+                qc.cp(np.pi / 2 ** (i - j), j, i)
     return qc.to_instruction(label="QFT")
 
 
-def iqft(n):
+def iqft(n, approximation_degree=0):
     """Creates an n-qubit Inverse QFT instruction as the exact inverse of QFT."""
-    return qft(n).inverse()
+    return qft(n, approximation_degree).inverse()
 
 
-def madd(n, is_inverse=False):
+def madd(n, is_inverse=False, approximation_degree=0):
     """Creates a controlled-phase addition instruction (MADD/MSUB)."""
     name = "MSUB" if is_inverse else "MADD"
     qc = QuantumCircuit(2 * n, name=name)
     angle_sign = -1 if is_inverse else 1
     for i in range(n):
         for j in range(i, n):
-            angle = angle_sign * np.pi / (2 ** (j - i))
-            qc.cp(angle, n + i, j)
+            if keep_rotation(j - i, n, approximation_degree):
+                angle = angle_sign * np.pi / (2 ** (j - i))
+                qc.cp(angle, n + i, j)
     return qc.to_instruction(label=name)
\ No newline at end of file
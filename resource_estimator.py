@@ -0,0 +1,380 @@
+"""Analytical resource estimates for the rounding pipeline at any data_bits.
+
+Gate counts are closed-form in the register width ``n = data_bits + 1`` and
+the approximation degree ``d`` (``K = n - 1 - d`` rotation classes kept):
+
+* ``qft`` / ``iqft``: ``n`` H and ``sum_{k=1..K} (n - k)`` CP,
+* ``madd`` / ``msub``: ``sum_{k=0..K} (n - k)`` CP (none when ``K < 0``),
+* QMADD / QMSUB: QFT + MADD/MSUB + IQFT (``qft`` adder) or ``4n`` CX and
+  ``2n`` CCX, plus ``2n`` X when subtracting (``ripple`` adder),
+* C_QMSUB: QMSUB plus one CX,
+* ``apply_halving``: 2 CX (the shift itself is a relabeling),
+* each CSWAP stage: ``n`` CSWAP.
+
+The pipeline uses 3 C_QMSUB, 6 QMADD, 2 QMSUB, ``n`` CX in Stage 3, 3
+halvings and 3 CSWAP stages; the peephole pass removes two IQFT/QFT pairs.
+Depth and duration are critical paths through the same stages, with every
+block (QFT/IQFT, MADD/MSUB, the ripple MAJ/UMA units, halving, CX copy,
+CSWAP chain) given by a closed-form latency matrix; no circuit is built.
+They count like ``peephole.circuit_cost``: every block decomposed, barriers
+aligning qubits without adding a layer.  For the exact fused QFT pipeline
+the depth is ``32n - 5``.  Durations use ``GATE_TIMES_US`` unless other
+per-gate times are given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from adders import ADDER_STRATEGIES, get_adder_strategy
+from qquantum_module import keep_rotation
+
+# Illustrative gate times in microseconds; override per device.
+GATE_TIMES_US = {
+    "x": 0.035,
+    "h": 0.035,
+    "cx": 0.3,
+    "cp": 0.3,
+    "swap": 0.9,
+    "ccx": 1.5,
+    "cswap": 1.8,
+}
+
+
+@dataclass
+class ResourceEstimate:
+    data_bits: int
+    adder: str
+    approximation_degree: int
+    fuse_qft: bool
+    qubits: int
+    gates: Dict[str, int]
+    depth: int
+    duration_us: float
+
+    @property
+    def total_gates(self) -> int:
+        return sum(self.gates.values())
+
+
+# --- closed-form gate counts -------------------------------------------------
+
+def _times(counts: Counter, k: int) -> Counter:
+    return Counter({name: k * count for name, count in counts.items()})
+
+
+def rotation_count(n: int, first_class: int, approximation_degree: int = 0) -> int:
+    """CP gates of classes ``k >= first_class`` kept on an n-qubit register.
+
+    Class ``k`` has ``n - k`` rotations; ``keep_rotation`` decides which
+    classes survive, exactly as in the builders.
+    """
+    return sum(n - k for k in range(first_class, n) if keep_rotation(k, n, approximation_degree))
+
+
+def qft_counts(n: int, approximation_degree: int = 0) -> Counter:
+    return +Counter({"h": n, "cp": rotation_count(n, 1, approximation_degree)})
+
+
+def madd_counts(n: int, approximation_degree: int = 0) -> Counter:
+    return +Counter({"cp": rotation_count(n, 0, approximation_degree)})
+
+
+def adder_counts(
+    n: int, subtract: bool = False, approximation_degree: int = 0, adder: str = "qft"
+) -> Counter:
+    """QMADD (``subtract=False``) or QMSUB on n-bit registers."""
+    if adder == "qft":
+        return (
+            _times(qft_counts(n, approximation_degree), 2) + madd_counts(n, approximation_degree)
+        )
+    counts = Counter({"cx": 4 * n, "ccx": 2 * n})
+    if subtract:
+        counts["x"] = 2 * n
+    return counts
+
+
+def c_qmsub_counts(n: int, approximation_degree: int = 0, adder: str = "qft") -> Counter:
+    return adder_counts(n, True, approximation_degree, adder) + Counter({"cx": 1})
+
+
+def halving_counts() -> Counter:
+    return Counter({"cx": 2})
+
+
+def cswap_stage_counts(n: int) -> Counter:
+    return Counter({"cswap": n})
+
+
+def pipeline_qubits(data_bits: int, adder: str = "qft") -> int:
+    n = data_bits + 1
+    return 6 * n + 9 + get_adder_strategy(adder).num_ancillas(n)
+
+
+def pipeline_counts(
+    data_bits: int, approximation_degree: int = 0, adder: str = "qft", fuse_qft: bool = True
+) -> Counter:
+    """Gate counts of ``build_rounding_circuit(..., load_inputs=False)``."""
+    n = data_bits + 1
+    d = approximation_degree
+    counts = (
+        _times(c_qmsub_counts(n, d, adder), 3)
+        + _times(adder_counts(n, False, d, adder), 6)
+        + _times(adder_counts(n, True, d, adder), 2)
+        + Counter({"cx": n})
+        + _times(halving_counts(), 3)
+        + _times(cswap_stage_counts(n), 3)
+    )
+    if fuse_qft and adder == "qft":
+        counts -= _times(qft_counts(n, d), 4)  # two IQFT/QFT pairs
+    return +counts
+
+
+# --- critical path per stage ------------------------------------------------
+#
+# Every block is summarized by its latency matrix: entry ``[p, q]`` is the
+# longest gate path from block input qubit ``p`` to output qubit ``q``
+# (``-inf`` without a path), so the ASAP finish times after the block are
+# ``max_p(ready[p] + latency[p, q])`` -- a max-plus product.  Barriers align
+# all qubits without taking time.  Depth is the same critical path with every
+# gate taking one unit.
+
+def qft_latency(
+    n: int, approximation_degree: int = 0, h_time: float = 1.0, cp_time: float = 1.0
+) -> np.ndarray:
+    """Latency matrix of ``qft(n, approximation_degree)``.
+
+    Gate ``cp(j, i)`` (and ``h(i)`` as ``j = i``) is cell ``(j, i)`` of the
+    band ``0 <= i - j <= K``; wire ``p`` runs along row ``p`` down to the
+    diagonal and then up column ``p``, so a path from wire ``p`` to wire ``q``
+    is a staircase from ``(p, min(n-1, p+K))`` to ``(max(0, q-K), q)``.  Its
+    length is fixed; only the number of diagonal (H) cells varies: as many as
+    possible when H is the slower gate, as few as the band allows otherwise.
+    """
+    top = n - 1 - approximation_degree
+    if top < 1:  # no rotations: n parallel H
+        return np.where(np.eye(n, dtype=bool), h_time, -np.inf)
+    p = np.arange(n)[:, None]
+    q = np.arange(n)[None, :]
+    first = np.minimum(n - 1, p + top)
+    last = np.maximum(0, q - top)
+    cells = (p - last) + (first - q) + 1
+    if h_time >= cp_time:
+        diagonal = np.where(q <= p, p - q + 1, 0)
+    elif top == 1:  # the band has two offsets, so H and CP cells alternate
+        diagonal = np.where(first == p, (cells + 1) // 2, cells // 2)
+    else:  # only a start or end on the diagonal is unavoidable
+        diagonal = (first == p).astype(int) + (q == last)
+    latency = cp_time * cells + (h_time - cp_time) * diagonal
+    return np.where((last <= p) & (q <= first), latency, -np.inf)
+
+
+def madd_latency(n: int, approximation_degree: int = 0, cp_time: float = 1.0) -> np.ndarray:
+    """Latency matrix of ``madd(n, ...)`` (MSUB has the same gate order).
+
+    Gate ``cp(control[i], target[j])`` is cell ``(i, j)`` of the band
+    ``0 <= j - i <= K``; control wires run along rows and target wires down
+    columns, so every monotone path between two cells has the same length.
+    Qubits are ordered target then control, as the builder appends them.
+    """
+    top = n - 1 - approximation_degree
+    if top < 0:  # no rotations at all
+        return np.where(np.eye(2 * n, dtype=bool), 0.0, -np.inf)
+    index = np.arange(n)
+    first_i = np.concatenate([np.maximum(0, index - top), index])
+    first_j = np.concatenate([index, index])
+    last_i = np.concatenate([index, index])
+    last_j = np.concatenate([index, np.minimum(n - 1, index + top)])
+    rows = last_i[None, :] - first_i[:, None]
+    cols = last_j[None, :] - first_j[:, None]
+    same_cell = (rows == 0) & (cols == 0)
+    valid = (rows >= 0) & (cols >= 0) & ((top >= 1) | same_cell)
+    return np.where(valid, cp_time * (rows + cols + 1), -np.inf)
+
+
+class CriticalPath:
+    """ASAP finish time of every qubit, advanced stage by stage.
+
+    Follows ``build_rounding_circuit``: registers are lists of qubit labels,
+    halving relabels them, adders act through their latency matrices and
+    ``fuse_qft`` keeps a single QFT/IQFT around consecutive adds into the
+    same target, as ``peephole.cancel_qft_pairs`` does.
+    """
+
+    def __init__(
+        self,
+        data_bits: int,
+        approximation_degree: int = 0,
+        adder: str = "qft",
+        fuse_qft: bool = True,
+        gate_times_us: Optional[Dict[str, float]] = None,
+    ):
+        n = data_bits + 1
+        self.n = n
+        self.adder = adder
+        self.fuse_qft = fuse_qft and adder == "qft"
+        self.times = gate_times_us or GATE_TIMES_US
+        labels = iter(range(pipeline_qubits(data_bits, adder)))
+        self.regs = {name: [next(labels) for _ in range(n)]
+                     for name in ("a", "b", "c", "d", "res1", "res2")}
+        for name in ("res1_shift", "res2_shift", "a_shift", "res1_guard", "res2_guard",
+                     "a_guard", "comp_ab", "comp_cd", "comp_min"):
+            self.regs[name] = [next(labels)]
+        self.work = list(labels)
+        self.ready = np.zeros(pipeline_qubits(data_bits, adder))
+        self.qft = qft_latency(n, approximation_degree, self.times["h"], self.times["cp"])
+        self.madd = madd_latency(n, approximation_degree, self.times["cp"])
+
+    def _block(self, qubits: Sequence[int], latency: np.ndarray):
+        qubits = list(qubits)
+        self.ready[qubits] = np.max(self.ready[qubits][:, None] + latency, axis=0)
+
+    def _gate(self, name: str, *qubits: int):
+        self.ready[list(qubits)] = self.ready[list(qubits)].max() + self.times[name]
+
+    def _ripple(self, target: List[int], control: List[int], subtract: bool):
+        x, cx, ccx = self.times["x"], self.times["cx"], self.times["ccx"]
+        carries = [self.work[0], *control[: self.n - 1]]
+        if subtract:
+            self.ready[target] += x
+        for carry, t, c in zip(carries, target, control):  # MAJ: cx(c,t) cx(c,carry) ccx
+            end = max(self.ready[carry] + cx, max(self.ready[t], self.ready[c]) + 2 * cx) + ccx
+            self.ready[[carry, t, c]] = end
+        # UMA: ccx, cx(c, carry), cx(carry, t)
+        for carry, t, c in reversed(list(zip(carries, target, control))):
+            end = self.ready[[carry, t, c]].max() + ccx
+            self.ready[c] = end + cx
+            self.ready[[carry, t]] = end + 2 * cx
+        if subtract:
+            self.ready[target] += x
+
+    def add(self, target: str, terms: Sequence[Tuple[str, bool]], comp: Optional[str] = None):
+        """``target += / -= control`` for each ``(control, subtract)`` in ``terms``."""
+        t = self.regs[target]
+        if self.adder != "qft":
+            for control, subtract in terms:
+                self._ripple(t, self.regs[control], subtract)
+        else:
+            runs = [terms] if self.fuse_qft else [[term] for term in terms]
+            for run in runs:
+                self._block(t, self.qft)
+                for control, _ in run:
+                    self._block(t + self.regs[control], self.madd)
+                self._block(t, self.qft.T)  # IQFT: the reversed gate order
+        if comp is not None:
+            self._gate("cx", t[self.n - 1], self.regs[comp][0])
+
+    def halve(self, name: str, shift: str, guard: str):
+        register = self.regs[name]
+        self._gate("cx", register[self.n - 1], self.regs[guard][0])
+        self._gate("cx", self.regs[guard][0], register[self.n - 1])
+        self.regs[name] = register[1:] + self.regs[shift]
+        self.regs[shift] = register[:1]
+
+    def copy(self, source: str, target: str):
+        """``cx(source[i], target[i])`` for every bit, all in parallel."""
+        s, t = self.regs[source], self.regs[target]
+        self.ready[s] = self.ready[t] = np.maximum(self.ready[s], self.ready[t]) + self.times["cx"]
+
+    def cswaps(self, comp: str, left: str, right: str):
+        """``cswap(comp, left[i], right[i])`` for i = 0..n-1, chained on ``comp``.
+
+        Gate i ends at ``max_{k<=i}(start_k + (i - k + 1) * t)``.
+        """
+        l, r, t = self.regs[left], self.regs[right], self.times["cswap"]
+        start = np.maximum(self.ready[l], self.ready[r])
+        start[0] = max(start[0], self.ready[self.regs[comp][0]])
+        k = np.arange(self.n)
+        finish = (k + 1) * t + np.maximum.accumulate(start - k * t)
+        self.ready[l] = self.ready[r] = finish
+        self.ready[self.regs[comp][0]] = finish[-1]
+
+    def barrier(self):
+        self.ready[:] = self.ready.max()
+
+    def run(self) -> float:
+        """Critical path of the whole pipeline body (Stages 1-7)."""
+        self.add("a", [("b", True)], comp="comp_ab")
+        self.add("c", [("d", True)], comp="comp_cd")
+        self.barrier()
+        self.add("res1", [("a", False), ("c", False)])
+        self.halve("res1", "res1_shift", "res1_guard")
+        self.copy("a", "res2")
+        self.add("res2", [("c", True)])
+        self.halve("res2", "res2_shift", "res2_guard")
+        self.barrier()
+        self.add("a", [("b", False)])
+        self.add("c", [("d", False)])
+        self.barrier()
+        self.cswaps("comp_ab", "a", "b")
+        self.cswaps("comp_cd", "c", "d")
+        self.barrier()
+        self.add("b", [("d", True)], comp="comp_min")
+        self.add("a", [("c", True), ("b", False)])
+        self.halve("a", "a_shift", "a_guard")
+        self.barrier()
+        self.add("b", [("d", False)])
+        self.cswaps("comp_min", "b", "d")
+        self.barrier()
+        return float(self.ready.max())
+
+
+UNIT_TIMES = {name: 1.0 for name in GATE_TIMES_US}
+
+
+def estimate_resources(
+    data_bits: int,
+    approximation_degree: int = 0,
+    adder: str = "qft",
+    fuse_qft: bool = True,
+    gate_times_us: Optional[Dict[str, float]] = None,
+) -> ResourceEstimate:
+    """Qubits, gate counts, depth and duration of the pipeline body."""
+    get_adder_strategy(adder, approximation_degree)  # same validation as the builders
+    depth = CriticalPath(data_bits, approximation_degree, adder, fuse_qft, UNIT_TIMES).run()
+    duration = CriticalPath(data_bits, approximation_degree, adder, fuse_qft, gate_times_us).run()
+    return ResourceEstimate(
+        data_bits=data_bits,
+        adder=adder,
+        approximation_degree=approximation_degree,
+        fuse_qft=fuse_qft,
+        qubits=pipeline_qubits(data_bits, adder),
+        gates=dict(sorted(pipeline_counts(data_bits, approximation_degree, adder, fuse_qft).items())),
+        depth=int(round(depth)),
+        duration_us=duration,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytical resource estimates.")
+    parser.add_argument("--data-bits", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--adder", choices=tuple(ADDER_STRATEGIES), default="qft")
+    parser.add_argument("--approximation-degree", type=int, default=0)
+    parser.add_argument("--no-fuse", action="store_true", help="Without the peephole pass")
+    parser.add_argument("--output", type=str, default=None, help="Write the estimates as JSON")
+    args = parser.parse_args()
+
+    estimates = [
+        estimate_resources(bits, args.approximation_degree, args.adder, not args.no_fuse)
+        for bits in args.data_bits
+    ]
+    for estimate in estimates:
+        gates = ", ".join(f"{name} {count}" for name, count in estimate.gates.items())
+        print(
+            f"data_bits={estimate.data_bits}: {estimate.qubits} qubits, "
+            f"{estimate.total_gates} gates ({gates}), depth {estimate.depth}, "
+            f"{estimate.duration_us:.1f} us"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps([asdict(e) for e in estimates], indent=2))
+
+
+if __name__ == "__main__":
+    main()
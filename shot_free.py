@@ -0,0 +1,117 @@
+"""Shot-free readout of circuits whose measured output is a basis state.
+
+For basis-state inputs the pipeline's measured registers end in a single
+basis state, so sampling hundreds of shots and taking ``max(counts)`` only
+repeats the same outcome.  ``probe_circuit`` replaces the final measurements
+by one-qubit ``SaveProbabilities`` instructions; a single run then gives the
+marginal of every measured qubit.  If every marginal is 0 or 1 (within
+``tolerance``) the measured qubits are in that basis state and the outcome is
+returned as a one-entry counts dict in Aer's bitstring format, so existing
+parsers work unchanged.  Otherwise the output is not a basis state:
+``run_shot_free`` raises :class:`NotBasisStateError` or, with
+``fallback_shots``, samples the original circuit instead.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+from qiskit import QuantumCircuit
+from qiskit_aer import AerSimulator
+from qiskit_aer.library import SaveProbabilities
+
+
+class NotBasisStateError(ValueError):
+    """The measured qubits are not in a basis state; ``purity`` is the smallest
+    single-qubit outcome probability max(p0, p1) among them."""
+
+    def __init__(self, message: str, purity: float):
+        super().__init__(message)
+        self.purity = purity
+
+
+def probe_circuit(circuit: QuantumCircuit) -> QuantumCircuit:
+    """``circuit`` with its final measurements replaced by probability probes.
+
+    The probe for clbit ``k`` is labelled ``m<k>``; ``metadata["probes"]``
+    lists the probed clbit indices.
+    """
+    result = circuit.copy_empty_like()
+    measured: Dict = {}
+    for instruction in circuit.data:
+        if instruction.operation.name == "measure":
+            measured[instruction.qubits[0]] = circuit.find_bit(instruction.clbits[0]).index
+            continue
+        if any(qubit in measured for qubit in instruction.qubits):
+            raise ValueError("probe_circuit needs every measurement at the end of the circuit")
+        result.append(instruction)
+    for qubit, clbit in measured.items():
+        result.append(SaveProbabilities(1, label=f"m{clbit}"), [qubit])
+    result.metadata = {**(circuit.metadata or {}), "probes": sorted(measured.values())}
+    return result
+
+
+def probed_outcome(data: Dict, circuit: QuantumCircuit, tolerance: float = 1e-9) -> str:
+    """Measured bitstring of a probed run, formatted like ``get_counts`` keys.
+
+    ``circuit`` is the probe circuit (for its classical registers).  Raises
+    :class:`NotBasisStateError` if a probed qubit is not deterministic.
+    """
+    bits = ["0"] * circuit.num_clbits
+    purity = 1.0
+    for clbit in circuit.metadata["probes"]:
+        p0, p1 = data[f"m{clbit}"]
+        purity = min(purity, max(p0, p1))
+        bits[clbit] = "1" if p1 > p0 else "0"
+    if purity < 1.0 - tolerance:
+        raise NotBasisStateError(
+            f"measured qubits are not in a basis state (purity {purity:.6f})", purity
+        )
+    words = []
+    for creg in reversed(circuit.cregs):
+        indices = [circuit.find_bit(clbit).index for clbit in creg]
+        words.append("".join(bits[index] for index in reversed(indices)))
+    return " ".join(words)
+
+
+def run_probes(
+    simulator: AerSimulator, probes: Sequence[QuantumCircuit], tolerance: float = 1e-9
+) -> List[str]:
+    """Bitstrings of ``probe_circuit`` results, one ``shots=1`` run for all."""
+    result = simulator.run(list(probes), shots=1, max_parallel_experiments=0).result()
+    return [
+        probed_outcome(result.data(index), probe, tolerance) for index, probe in enumerate(probes)
+    ]
+
+
+def run_shot_free(
+    simulator: AerSimulator,
+    circuits: Sequence[QuantumCircuit],
+    tolerance: float = 1e-9,
+    fallback_shots: int = 0,
+) -> List[Dict[str, int]]:
+    """Counts dicts for measured ``circuits`` from a single probed run each.
+
+    Deterministic outputs come back as ``{bitstring: 1}``.  For the others,
+    ``fallback_shots > 0`` samples the measured circuit that many times;
+    with ``fallback_shots=0`` :class:`NotBasisStateError` is raised.
+    """
+    probes = [probe_circuit(circuit) for circuit in circuits]
+    result = simulator.run(probes, shots=1, max_parallel_experiments=0).result()
+    counts: List[Dict[str, int]] = []
+    retry: List[int] = []
+    for index, probe in enumerate(probes):
+        try:
+            counts.append({probed_outcome(result.data(index), probe, tolerance): 1})
+        except NotBasisStateError:
+            if not fallback_shots:
+                raise
+            counts.append({})
+            retry.append(index)
+    if retry:
+        sampled = simulator.run(
+            [circuits[index] for index in retry], shots=fallback_shots, max_parallel_experiments=0
+        ).result()
+        for position, index in enumerate(retry):
+            counts[index] = sampled.get_counts(position)
+    return counts
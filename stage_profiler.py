@@ -0,0 +1,193 @@
+"""Per-stage resource and time profile of the rounding pipeline.
+
+``build_rounding_circuit`` records its stages in ``metadata["stages"]``
+(input loading, gate construction, Stages 1-7); the output measurements form
+a final ``measure`` stage.  For each stage ``profile_pipeline`` reports
+
+* the qubits and registers it touches,
+* gate counts by type and depth after decomposing every block,
+* wall time for construction, transpilation, simulation and result parsing.
+
+Simulation time is Aer's own ``time_taken`` for the circuit up to and
+including the stage minus that up to the previous stage (best of
+``repeats``, with Aer's qubit truncation off).  The profile is JSON;
+``folded_stacks`` renders it in the folded-stack format read by
+flamegraph.pl and speedscope.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from qiskit import QuantumCircuit, transpile
+from qiskit_aer import AerSimulator
+from qiskit_aer.library import SaveProbabilities
+
+from main_round import (
+    ArithmeticParams,
+    add_output_measurements,
+    build_rounding_circuit,
+    parse_measurement,
+    pipeline_stages,
+)
+from peephole import DECOMPOSED_BASIS
+
+PHASES = ("build_sec", "transpile_sec", "simulate_sec", "parse_sec")
+
+
+def _aer_time(simulator: AerSimulator, circuit: QuantumCircuit, repeats: int) -> float:
+    if not circuit.num_clbits:
+        # Aer skips circuits with no output; a one-qubit probe keeps every gate.
+        circuit = circuit.copy()
+        circuit.append(SaveProbabilities(1, label="profile"), [0])
+    return min(
+        simulator.run(circuit, shots=1).result().results[0].time_taken for _ in range(repeats)
+    )
+
+
+def stage_resources(piece: QuantumCircuit) -> Dict:
+    """Qubits touched, gate counts by type and depth of one stage."""
+    touched = {
+        qubit
+        for instruction in piece.data
+        if instruction.operation.name != "barrier"
+        for qubit in instruction.qubits
+    }
+    registers = sorted(
+        {register.name for qubit in touched for register, _ in piece.find_bit(qubit).registers}
+    )
+    decomposed = transpile(piece, basis_gates=DECOMPOSED_BASIS, optimization_level=0)
+    gates = {name: count for name, count in decomposed.count_ops().items() if name != "barrier"}
+    return {
+        "qubits_touched": len(touched),
+        "registers": registers,
+        "gates": dict(sorted(gates.items())),
+        "gate_total": sum(gates.values()),
+        "depth": decomposed.depth(lambda instruction: instruction.operation.name != "barrier"),
+    }
+
+
+def profile_pipeline(
+    params: ArithmeticParams,
+    simulator: Optional[AerSimulator] = None,
+    fuse_qft: bool = True,
+    repeats: int = 3,
+) -> Dict:
+    """Per-stage profile of one block (``params.a..d``) through the pipeline.
+
+    Pass ``simulator`` with ``enable_truncation=False``, otherwise Aer drops
+    the gates that do not reach the probed qubit from the stage timings.
+    """
+    simulator = simulator or AerSimulator(
+        method="matrix_product_state", enable_truncation=False
+    )
+    t0 = time.perf_counter()
+    qc = build_rounding_circuit(params, load_inputs=True, fuse_qft=fuse_qft)
+    build_total = time.perf_counter() - t0
+    add_output_measurements(qc)
+    build_sec = {stage["name"]: stage["build_sec"] for stage in qc.metadata["stages"]}
+
+    stages: List[Dict] = []
+    prefix = qc.copy_empty_like()
+    previous = 0.0
+    for name, piece in pipeline_stages(qc):
+        entry = {"name": name}
+        entry.update(stage_resources(piece))
+
+        t0 = time.perf_counter()
+        transpiled = transpile(piece, simulator, optimization_level=0)
+        entry["transpile_sec"] = time.perf_counter() - t0
+        entry["build_sec"] = build_sec.get(name, 0.0)
+
+        prefix.compose(transpiled, inplace=True)
+        elapsed = _aer_time(simulator, prefix, repeats) if piece.data else previous
+        entry["simulate_sec"] = max(0.0, elapsed - previous)
+        previous = max(previous, elapsed)
+
+        entry["parse_sec"] = 0.0
+        if name == "measure":
+            counts = simulator.run(prefix, shots=1).result().get_counts()
+            t0 = time.perf_counter()
+            outcome = max(counts.items(), key=lambda item: item[1])[0]
+            parse_measurement(outcome, params.modulus)
+            entry["parse_sec"] = time.perf_counter() - t0
+        stages.append(entry)
+
+    return {
+        "data_bits": params.data_bits,
+        "adder": params.adder,
+        "approximation_degree": params.approximation_degree,
+        "fuse_qft": fuse_qft,
+        "qubits": qc.num_qubits,
+        "totals": {
+            "gate_total": sum(stage["gate_total"] for stage in stages),
+            "build_sec": build_total,
+            **{phase: sum(stage[phase] for stage in stages) for phase in PHASES[1:]},
+        },
+        "stages": stages,
+    }
+
+
+def folded_stacks(profiles: Sequence[Dict]) -> str:
+    """Folded stacks ``pipeline;stage;phase <microseconds>``, one line each."""
+    lines = []
+    for profile in profiles:
+        root = f"rounding_{profile['data_bits']}bit"
+        for stage in profile["stages"]:
+            for phase in PHASES:
+                micros = int(round(stage[phase] * 1e6))
+                if micros:
+                    lines.append(f"{root};{stage['name']};{phase[:-4]} {micros}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage profile of the rounding pipeline.")
+    parser.add_argument("--data-bits", type=int, nargs="+", default=[2, 4, 6])
+    parser.add_argument("--adder", type=str, default="qft", help="Adder strategy")
+    parser.add_argument("--approximation-degree", type=int, default=0)
+    parser.add_argument("--no-fuse", action="store_true", help="Profile without the peephole pass")
+    parser.add_argument("--repeats", type=int, default=3, help="Simulation repeats (best of)")
+    parser.add_argument("--output", type=str, default=None, help="Write the profile as JSON")
+    parser.add_argument(
+        "--flamegraph", type=str, default=None, help="Write folded stacks for flamegraph.pl"
+    )
+    args = parser.parse_args()
+
+    profiles = [
+        profile_pipeline(
+            ArithmeticParams(
+                data_bits=bits, approximation_degree=args.approximation_degree, adder=args.adder
+            ),
+            fuse_qft=not args.no_fuse,
+            repeats=args.repeats,
+        )
+        for bits in args.data_bits
+    ]
+    for profile in profiles:
+        totals = profile["totals"]
+        print(
+            f"data_bits={profile['data_bits']} ({profile['qubits']} qubits, "
+            f"{totals['gate_total']} gates, simulate {totals['simulate_sec'] * 1e3:.1f} ms)"
+        )
+        for stage in profile["stages"]:
+            print(
+                f"  {stage['name']:<26} {stage['qubits_touched']:>3} qubits "
+                f"{stage['gate_total']:>5} gates depth {stage['depth']:>4} | "
+                f"build {stage['build_sec'] * 1e3:7.2f} ms  "
+                f"transpile {stage['transpile_sec'] * 1e3:7.2f} ms  "
+                f"simulate {stage['simulate_sec'] * 1e3:7.2f} ms  "
+                f"parse {stage['parse_sec'] * 1e6:5.0f} us"
+            )
+    if args.output:
+        Path(args.output).write_text(json.dumps(profiles, indent=2))
+    if args.flamegraph:
+        Path(args.flamegraph).write_text(folded_stacks(profiles))
+
+
+if __name__ == "__main__":
+    main()
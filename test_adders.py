@@ -0,0 +1,104 @@
+"""Tests for the adder strategies."""
+
+import io
+
+import pytest
+from qiskit import QuantumCircuit, qpy
+from qiskit_aer import AerSimulator
+
+from adders import ADDER_STRATEGIES, AdderStrategy, QFTAdder, get_adder_strategy
+from bitsliced_verify import verify_range
+from c_qmsub_gate import build_c_qmsub_gate
+from compositional_verify import adder_permutation, c_qmsub_permutation
+from main_round import OUTPUT_KEYS, ArithmeticParams, simulate_blocks
+from permutation_backend import BasisState, PermutationTemplate, compile_program, run_program
+from qmadd_gate import build_qmadd_gate
+from qmsub_gate import build_qmsub_gate
+from test_rounding import expected_outputs
+
+
+@pytest.mark.parametrize(
+    "builder, exact, width",
+    [
+        (build_qmadd_gate, lambda n: adder_permutation(n, 1), lambda n: 2 * n),
+        (build_qmsub_gate, lambda n: adder_permutation(n, -1), lambda n: 2 * n),
+        (build_c_qmsub_gate, c_qmsub_permutation, lambda n: 2 * n + 1),
+    ],
+)
+def test_ripple_blocks_match_modular_arithmetic(builder, exact, width):
+    n = 3
+    gate = builder(n, adder="ripple")
+    assert gate.num_qubits == width(n) + 1
+    qc = QuantumCircuit(gate.num_qubits)
+    qc.append(gate, range(gate.num_qubits))
+    program = compile_program(qc)
+    assert len(program) == 1  # QMADD_ripple etc. stay whole blocks
+    targets = exact(n)
+    for index in range(1 << width(n)):
+        state = BasisState([(index >> bit) & 1 for bit in range(gate.num_qubits)], 0)
+        run_program(program, state)
+        assert state.read(range(width(n))) == targets[index]
+        assert state.bits[-1] == 0  # work qubit restored
+
+
+def test_qft_strategy_keeps_original_blocks():
+    gate = build_qmadd_gate(4)
+    assert gate.name == "QMADD" and gate.num_qubits == 8
+    assert [inst.operation.name for inst in gate.definition.data] == ["QFT", "MADD", "QFT_dg"]
+
+
+def test_ripple_pipeline_exhaustive_and_on_aer():
+    assert not verify_range(PermutationTemplate(2, adder="ripple"), 0, 1 << 8)
+
+    simulator = AerSimulator(method="matrix_product_state")
+    blocks = [(7, 2, 5, 1), (15, 0, 3, 9)]
+    outputs = simulate_blocks(blocks, 4, simulator, shots=1, adder="ripple")
+    for (a, b, c, d), output in zip(blocks, outputs):
+        expected = expected_outputs(ArithmeticParams(a=a, b=b, c=c, d=d))
+        assert tuple(output[key] for key in OUTPUT_KEYS) == expected
+
+
+class PaddedQFTAdder(QFTAdder):
+    """The QFT adder with two idle work qubits, named ``QMSUB_padded`` etc."""
+
+    name = "padded"
+
+    def num_ancillas(self, n):
+        return 2
+
+    def block_name(self, base):
+        return f"{base}_{self.name}"
+
+
+def test_blocks_with_work_qubits_compile_on_their_width(monkeypatch):
+    monkeypatch.setitem(ADDER_STRATEGIES, PaddedQFTAdder.name, PaddedQFTAdder)
+    n = 3
+    for builder, exact, width in [
+        (build_qmsub_gate, adder_permutation(n, -1), 2 * n),
+        (build_c_qmsub_gate, c_qmsub_permutation(n), 2 * n + 1),
+    ]:
+        gate = builder(n, adder="padded")
+        assert gate.name in ("QMSUB_padded", "C_QMSUB_padded") and gate.num_qubits == width + 2
+        qc = QuantumCircuit(gate.num_qubits)
+        qc.append(gate, range(gate.num_qubits))
+        buffer = io.BytesIO()
+        qpy.dump(qc, buffer)
+        buffer.seek(0)
+        program = compile_program(qpy.load(buffer)[0])  # no builder attributes to rely on
+        assert [op for op, _ in program] == ["add" if gate.name == "QMSUB_padded" else "csub"]
+        for index in range(1 << width):
+            state = BasisState([(index >> bit) & 1 for bit in range(gate.num_qubits)], 0)
+            run_program(program, state)
+            assert state.read(range(width)) == exact[index]
+
+    assert not verify_range(PermutationTemplate(2, adder="padded"), 0, 1 << 8)
+
+
+def test_strategy_validation():
+    with pytest.raises(TypeError):
+        AdderStrategy()
+
+    with pytest.raises(ValueError):
+        get_adder_strategy("carry-lookahead")
+    with pytest.raises(ValueError):
+        get_adder_strategy("ripple", approximation_degree=1)
@@ -0,0 +1,41 @@
+"""Tests for the approximate-QFT adders and their trade-off report."""
+
+import pytest
+
+from approximation_report import block_fidelity, pipeline_cost
+from main_round import ArithmeticParams, build_rounding_circuit
+from permutation_backend import NonPermutationError, compile_program
+from qmadd_gate import build_qmadd_gate
+from qquantum_module import madd, qft
+
+
+def count_cp(instruction):
+    return instruction.definition.count_ops().get("cp", 0)
+
+
+def test_degree_zero_is_exact_and_unnamed():
+    assert build_qmadd_gate(4, 0).name == "QMADD"
+    assert count_cp(qft(4, 0)) == 6
+    assert count_cp(madd(4, approximation_degree=0)) == 10
+    assert block_fidelity("qmadd", 3, 0)["fidelity"] == pytest.approx(1.0)
+
+
+def test_rotations_dropped_by_degree():
+    assert [count_cp(qft(4, d)) for d in range(4)] == [6, 5, 3, 0]
+    assert [count_cp(madd(4, approximation_degree=d)) for d in range(4)] == [10, 9, 7, 4]
+    costs = [pipeline_cost(2, d)["cp"] for d in range(3)]
+    assert costs == sorted(costs, reverse=True) and costs[0] > costs[-1]
+
+
+def test_approximate_adders_are_not_treated_as_permutations():
+    assert build_qmadd_gate(4, 1).name == "QMADD_approx1"
+    qc = build_rounding_circuit(ArithmeticParams(data_bits=2, approximation_degree=1))
+    with pytest.raises(NonPermutationError):
+        compile_program(qc)
+
+
+def test_block_fidelity_drops_with_degree():
+    exact = block_fidelity("c_qmsub", 3, 0)
+    approx = block_fidelity("c_qmsub", 3, 1)
+    assert exact["exact_output_rate"] == 1.0
+    assert approx["fidelity"] < exact["fidelity"]
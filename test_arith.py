@@ -5,6 +5,7 @@ from qiskit_aer import AerSimulator
 from qmadd_gate import build_qmadd_gate
 from qmsub_gate import build_qmsub_gate
 from c_qmsub_gate import build_c_qmsub_gate
+from shot_free import run_shot_free
 
 
 n = 4
@@ -20,9 +21,8 @@ def set_val(qc: QuantumCircuit, reg: QuantumRegister, value: int):
 
 def run_and_parse(qc: QuantumCircuit, creg_names):
     transpiled = transpile(qc, sim)
-    result = sim.run(transpiled, shots=1024).result()
-    counts = result.get_counts(transpiled)
-    top = max(counts.items(), key=lambda item: item[1])[0]
+    (counts,) = run_shot_free(sim, [transpiled])  # basis inputs give a basis output
+    top = next(iter(counts))
     parts = top.split(" ")
     if len(parts) != len(creg_names):
         raise RuntimeError(f"Unexpected measurement format: {top}")
@@ -0,0 +1,54 @@
+"""Tests for the benchmark suite and its baseline comparison."""
+
+import pytest
+
+from benchmark_suite import SCHEMA_VERSION, compare, parse_kind_thresholds, run_suite
+
+
+def _document(**times):
+    return {
+        "schema": SCHEMA_VERSION,
+        "results": {key.replace("__", "/"): {"best_sec": value} for key, value in times.items()},
+    }
+
+
+def test_run_suite_small_sweep():
+    document = run_suite(
+        data_bits=[1], shots=[0, 8], engines=["quantum", "lut", "classical"],
+        blocks=4, pipeline_blocks=4, repeats=1,
+    )
+    assert document["schema"] == SCHEMA_VERSION
+    assert set(document["results"]) == {
+        "build/bits=1",
+        "transpile/bits=1/method=matrix_product_state",
+        "run/bits=1/method=matrix_product_state/shots=0",
+        "run/bits=1/method=matrix_product_state/shots=8",
+        "pipeline/bits=1/engine=quantum/shots=0",
+        "pipeline/bits=1/engine=quantum/shots=8",
+        "pipeline/bits=1/engine=lut",
+        "pipeline/bits=1/engine=classical",
+    }
+    assert all(entry["best_sec"] > 0 for entry in document["results"].values())
+
+
+def test_compare_thresholds():
+    baseline = _document(build__a=0.10, run__a=0.10, run__b=0.10, pipeline__a=1.0, run__gone=1.0)
+    current = _document(build__a=0.13, run__a=0.13, run__b=0.04, pipeline__a=1.4, run__new=1.0)
+
+    rows = compare(baseline, current, threshold=0.2, kind_thresholds=parse_kind_thresholds(["run=0.5"]))
+    status = {row["key"]: row["status"] for row in rows}
+
+    assert status == {
+        "build/a": "regression",
+        "run/a": "ok",
+        "run/b": "improvement",
+        "pipeline/a": "regression",
+        "run/gone": "missing",
+        "run/new": "new",
+    }
+    assert compare(baseline, current, min_delta_sec=0.5)[0]["status"] == "ok"
+
+    with pytest.raises(ValueError):
+        compare({**baseline, "schema": SCHEMA_VERSION + 1}, current)
+    with pytest.raises(ValueError):
+        parse_kind_thresholds(["simulate=0.1"])
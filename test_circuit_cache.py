@@ -0,0 +1,43 @@
+"""Tests for the QPY circuit cache."""
+
+import os
+
+from qiskit import QuantumCircuit
+
+from circuit_cache import cache_key, evict, load_circuit, store_circuit
+
+
+def small_circuit(n):
+    qc = QuantumCircuit(n, name=f"c{n}")
+    qc.h(0)
+    for idx in range(1, n):
+        qc.cx(0, idx)
+    return qc
+
+
+def test_roundtrip_and_key_fields(tmp_path):
+    key = cache_key(data_bits=4, adder="qft", method="matrix_product_state")
+    assert key == cache_key(method="matrix_product_state", adder="qft", data_bits=4)
+    assert key != cache_key(data_bits=5, adder="qft", method="matrix_product_state")
+
+    assert load_circuit(key, tmp_path) is None
+    store_circuit(key, small_circuit(3), tmp_path)
+    assert load_circuit(key, tmp_path) == small_circuit(3)
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    for idx, name in enumerate(("old", "mid", "new")):
+        store_circuit(name, small_circuit(2 + idx), tmp_path, max_bytes=1 << 20)
+        os.utime(tmp_path / f"{name}.qpy", (1000 + idx, 1000 + idx))
+    load_circuit("old", tmp_path)  # touching "old" makes "mid" the LRU entry
+
+    sizes = {path.stem: path.stat().st_size for path in tmp_path.glob("*.qpy")}
+    evict(tmp_path, sizes["old"] + sizes["new"])
+
+    assert sorted(path.stem for path in tmp_path.glob("*.qpy")) == ["new", "old"]
+
+
+def test_disabled_cache_is_a_no_op(monkeypatch):
+    monkeypatch.setenv("HAAR_CIRCUIT_CACHE", "")
+    store_circuit("unused", small_circuit(2))
+    assert load_circuit("unused") is None
@@ -0,0 +1,74 @@
+"""Tests for block certificates and the composed pipeline check."""
+
+import numpy as np
+import pytest
+from qiskit.quantum_info import Operator
+
+from compositional_verify import (
+    BLOCKS,
+    CertificationError,
+    block_circuit,
+    check_block,
+    certify,
+    evolve_columns,
+    verify_pipeline,
+)
+from qmadd_gate import build_qmadd_gate
+from qmsub_gate import build_qmsub_gate
+from qquantum_module import madd
+
+
+@pytest.mark.parametrize("name", sorted(BLOCKS))
+def test_blocks_implement_intended_operation(name):
+    certificate = check_block(name, 3)
+    assert certificate.max_error < 1e-8
+    if certificate.kind == "permutation":
+        assert sorted(certificate.permutation) == list(range(len(certificate.permutation)))
+
+
+def test_columns_match_dense_operator():
+    circuit = block_circuit(BLOCKS["c_qmsub"][0](2), 5)
+    columns = np.array([0, 7, 19, 31])
+    assert np.allclose(evolve_columns(circuit, columns), Operator(circuit).data[:, columns].T)
+
+
+def test_wide_blocks_are_sampled():
+    certificate = check_block("qmadd", 4, max_columns=50, seed=3)
+    assert certificate.columns == 50 and certificate.max_error < 1e-8
+    assert certificate.partial and not check_block("qmadd", 3).partial
+    with pytest.raises(CertificationError):
+        check_block("qmsub", 4, build_qmadd_gate(4), max_columns=50)
+
+
+def test_wrong_block_is_rejected():
+    with pytest.raises(CertificationError):
+        check_block("qmadd", 3, build_qmsub_gate(3))
+    with pytest.raises(CertificationError):
+        check_block("madd", 3, madd(3, is_inverse=True))
+
+
+def test_certificates_are_cached(tmp_path):
+    first = certify("c_qmsub", 3, directory=tmp_path)
+    second = certify("c_qmsub", 3, directory=tmp_path)
+    assert not first.cached and second.cached
+    assert second.size == first.size == 1 << 7 and not second.partial
+    assert np.array_equal(first.permutation, second.permutation)
+
+
+def test_composed_pipeline_matches_reference(tmp_path):
+    certificates, report = verify_pipeline(2, directory=tmp_path)
+    assert set(certificates) == set(BLOCKS)
+    assert report.ok and report.checked == 1 << 8
+
+    _, sampled = verify_pipeline(3, samples=500, directory=tmp_path)
+    assert sampled.ok and sampled.checked == 500
+
+
+def test_partial_certificates_need_opt_in(tmp_path):
+    with pytest.raises(CertificationError, match="sampled"):
+        verify_pipeline(2, samples=100, directory=tmp_path, max_columns=32)
+    certificates, report = verify_pipeline(
+        2, samples=100, directory=tmp_path, max_columns=32, allow_sampled=True
+    )
+    assert certificates["c_qmsub"].partial and not certificates["qft"].partial
+    assert report.ok and report.checked == 100
@@ -0,0 +1,119 @@
+"""Tests for the image experiment runners."""
+
+import json
+import random
+import statistics
+
+import numpy as np
+import pytest
+
+from image_io import read_pgm
+from image_quantum_experiment import (
+    HistogramStats,
+    build_parser,
+    dedup_blocks,
+    percentile,
+    run_experiment,
+    run_streaming,
+    weighted_median,
+)
+from test_image_io import write_bmp
+
+
+def test_histogram_stats_match_list_statistics():
+    rng = random.Random(1)
+    values = [rng.randint(0, 21) for _ in range(257)]
+    stats = HistogramStats(21)
+    stats.update(np.array(values[:100]))
+    stats.update(np.array(values[100:]))
+
+    assert stats.count == len(values)
+    assert stats.mean() == statistics.fmean(values)
+    for q in (0.0, 0.5, 0.9, 1.0):
+        assert stats.percentile(q) == percentile(values, q)
+
+
+def test_weighted_median():
+    samples = [0.5, 0.5, 0.25, 2.0, 0.25, 0.25, 1.0, 2.0]
+    runs = [(value, samples.count(value)) for value in set(samples)]
+    assert weighted_median(runs) == statistics.median(samples)
+    assert weighted_median(runs[:1]) == runs[0][0]
+
+
+@pytest.mark.parametrize("pgm_depth", ["8", "16"])
+def test_streaming_matches_full_run(tmp_path, capsys, pgm_depth):
+    rng = np.random.default_rng(8)
+    pixels = rng.integers(0, 256, size=(6, 5), dtype=np.uint8)  # odd width, 3 block rows
+    image = tmp_path / "tiny.bmp"
+    write_bmp(image, [row.tobytes() for row in pixels], 8, palette=list(range(256)))
+    common = ["--image", str(image), "--bit-depth", "2", "--shots", "1", "--pgm-depth", pgm_depth]
+    summary_path = tmp_path / "tiny_quantum_summary.json"
+
+    run_experiment(build_parser().parse_args(common + ["--max-blocks", "0"]))
+    full = json.loads(summary_path.read_text())
+    maps = [tmp_path / f"tiny_{kind}_energy.pgm" for kind in ("quantum", "classical")]
+    full_maps = [path.read_bytes() for path in maps]
+    capsys.readouterr()
+    run_streaming(build_parser().parse_args(common + ["--strip-rows", "3"]))
+    streamed = json.loads(summary_path.read_text())
+    assert f"maxval={(1 << int(pgm_depth)) - 1}" in capsys.readouterr().out
+
+    for key in ("avg_quantum_energy", "p90_quantum_energy", "avg_classical_energy",
+                "p90_classical_energy", "avg_reg_d", "total_blocks", "sampled_blocks"):
+        assert streamed[key] == full[key]
+    assert streamed["strip_rows"] == 2
+    assert [path.read_bytes() for path in maps] == full_maps
+
+
+def test_packed_run_matches_unpacked(tmp_path):
+    rng = np.random.default_rng(3)
+    pixels = rng.integers(0, 256, size=(6, 6), dtype=np.uint8)  # 9 blocks, last pack partial
+    image = tmp_path / "packed.bmp"
+    write_bmp(image, [row.tobytes() for row in pixels], 8, palette=list(range(256)))
+    common = ["--image", str(image), "--bit-depth", "2", "--pgm-depth", "16", "--max-blocks", "0"]
+
+    run_experiment(build_parser().parse_args(common))
+    plain = read_pgm(tmp_path / "packed_quantum_energy.pgm")
+    run_experiment(build_parser().parse_args(common + ["--pack-size", "4"]))
+    summary = json.loads((tmp_path / "packed_quantum_summary.json").read_text())
+
+    assert summary["pack_size"] == 4
+    np.testing.assert_array_equal(read_pgm(tmp_path / "packed_quantum_energy.pgm"), plain)
+
+
+def test_mps_layout_run_matches_declared_order(tmp_path):
+    rng = np.random.default_rng(11)
+    pixels = rng.integers(0, 256, size=(6, 6), dtype=np.uint8)
+    image = tmp_path / "layout.bmp"
+    write_bmp(image, [row.tobytes() for row in pixels], 8, palette=list(range(256)))
+    common = ["--image", str(image), "--bit-depth", "2", "--pgm-depth", "16", "--max-blocks", "0"]
+
+    run_experiment(build_parser().parse_args(common))
+    plain = read_pgm(tmp_path / "layout_quantum_energy.pgm")
+    run_experiment(build_parser().parse_args(common + ["--mps-layout", "--pack-size", "2"]))
+    summary = json.loads((tmp_path / "layout_quantum_summary.json").read_text())
+
+    assert summary["mps_layout"] is True
+    np.testing.assert_array_equal(read_pgm(tmp_path / "layout_quantum_energy.pgm"), plain)
+
+
+def test_dedup_simulates_each_value_once(tmp_path):
+    rng = np.random.default_rng(5)
+    pixels = np.zeros((8, 8), dtype=np.uint8)  # flat half: 8 identical blocks
+    pixels[4:] = rng.integers(0, 256, size=(4, 8), dtype=np.uint8)
+    image = tmp_path / "flat.bmp"
+    write_bmp(image, [row.tobytes() for row in pixels], 8, palette=list(range(256)))
+    common = ["--image", str(image), "--bit-depth", "2", "--pgm-depth", "16", "--max-blocks", "0"]
+    summary_path = tmp_path / "flat_quantum_summary.json"
+
+    run_experiment(build_parser().parse_args(common + ["--no-dedup"]))
+    plain = read_pgm(tmp_path / "flat_quantum_energy.pgm")
+    run_experiment(build_parser().parse_args(common))
+    summary = json.loads(summary_path.read_text())
+
+    blocks, inverse = dedup_blocks([(1, 2, 3, 0), (0, 0, 0, 0), (1, 2, 3, 0), (0, 0, 0, 0)])
+    assert blocks == [(1, 2, 3, 0), (0, 0, 0, 0)] and inverse == [0, 1, 0, 1]
+    assert summary["sampled_blocks"] == 16
+    assert summary["unique_blocks"] <= 9
+    assert summary["dedup_ratio"] == 16 / summary["unique_blocks"]
+    np.testing.assert_array_equal(read_pgm(tmp_path / "flat_quantum_energy.pgm"), plain)
@@ -0,0 +1,83 @@
+"""Tests for the shared BMP/PGM loaders."""
+
+import struct
+
+import numpy as np
+import pytest
+
+from image_io import PGMWriter, read_bmp_grayscale, read_grayscale, read_pgm, write_pgm
+
+
+def write_bmp(path, rows, bits_per_pixel, top_down=False, palette=None):
+    """Write ``rows`` (top-to-bottom list of per-row byte strings) as a BMP."""
+    height = len(rows)
+    width = len(rows[0]) // (bits_per_pixel // 8)
+    stride = ((bits_per_pixel * width + 31) // 32) * 4
+    palette_bytes = b"".join(bytes([v, v, v, 0]) for v in palette) if palette else b""
+    offset = 14 + 40 + len(palette_bytes)
+    stored = rows if top_down else rows[::-1]
+    body = b"".join(row + b"\0" * (stride - len(row)) for row in stored)
+    header = b"BM" + struct.pack("<IHHI", offset + len(body), 0, 0, offset)
+    dib = struct.pack(
+        "<IiiHHIIiiII", 40, width, -height if top_down else height, 1, bits_per_pixel, 0,
+        len(body), 0, 0, len(palette or []), 0,
+    )
+    path.write_bytes(header + dib + palette_bytes + body)
+
+
+@pytest.mark.parametrize("top_down", [False, True])
+def test_read_24bit_bmp_with_padding(tmp_path, top_down):
+    rng = np.random.default_rng(5)
+    rgb = rng.integers(0, 256, size=(4, 3, 3), dtype=np.uint8)  # width 3 -> padded rows
+    path = tmp_path / "rgb.bmp"
+    write_bmp(path, [row.tobytes() for row in rgb], 24, top_down=top_down)
+
+    pixels = read_bmp_grayscale(path)
+    assert pixels.dtype == np.uint8 and pixels.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(pixels, rgb.sum(axis=2) // 3)
+
+
+def test_read_8bit_bmp_applies_palette(tmp_path):
+    indices = np.array([[0, 1, 2], [3, 4, 255]], dtype=np.uint8)
+    palette = [255 - i for i in range(256)]
+    path = tmp_path / "pal.bmp"
+    write_bmp(path, [row.tobytes() for row in indices], 8, palette=palette)
+
+    np.testing.assert_array_equal(read_grayscale(path), 255 - indices)
+
+
+def test_read_pgm_ascii_and_binary(tmp_path):
+    values = np.array([[0, 7, 255], [12, 128, 3]], dtype=np.uint8)
+    ascii_path = tmp_path / "a.pgm"
+    ascii_path.write_text("P2\n# comment\n3 2\n255\n" + "\n".join(" ".join(map(str, r)) for r in values))
+    binary_path = tmp_path / "b.pgm"
+    binary_path.write_bytes(b"P5\n3 2\n255\n" + values.tobytes())
+    deep_path = tmp_path / "c.pgm"
+    deep = values.astype(np.uint16) * 200
+    deep_path.write_bytes(b"P5\n3 2\n65535\n" + deep.astype(">u2").tobytes())
+
+    np.testing.assert_array_equal(read_pgm(ascii_path), values)
+    np.testing.assert_array_equal(read_grayscale(binary_path), values)
+    assert read_pgm(deep_path).dtype == np.uint16
+    np.testing.assert_array_equal(read_pgm(deep_path), deep)
+
+
+def test_write_pgm_upsamples_while_streaming(tmp_path):
+    values = np.array([[0, 9, 255], [17, 128, 3]], dtype=np.uint8)
+    path = tmp_path / "up.pgm"
+    write_pgm(path, values, upsample=2)
+
+    assert path.read_bytes().startswith(b"P5\n6 4\n255\n")
+    np.testing.assert_array_equal(read_pgm(path), values.repeat(2, axis=0).repeat(2, axis=1))
+
+
+def test_pgm_writer_16bit_keeps_raw_values(tmp_path):
+    energies = np.array([[0, 300], [1024, 40000], [7, 65535]])
+    path = tmp_path / "raw.pgm"
+    with PGMWriter(path, width=2, height=3, depth=16) as writer:
+        writer.write_rows(energies[:1])
+        writer.write_rows(energies[1:])
+
+    np.testing.assert_array_equal(read_pgm(path), energies)
+    with pytest.raises(ValueError):
+        write_pgm(tmp_path / "bad.pgm", np.array([[256]]))
@@ -0,0 +1,61 @@
+"""Tests for the lookup-table engine."""
+
+from itertools import product
+
+import numpy as np
+import pytest
+from qiskit_aer import AerSimulator
+
+from image_quantum_experiment import classical_block
+from lut_engine import (
+    build_lut,
+    load_lut,
+    lut_index,
+    lut_lookup,
+    lut_transform_image,
+    save_lut,
+    template_hash,
+)
+from main_round import OUTPUT_KEYS
+
+
+DATA_BITS = 2
+
+
+@pytest.fixture(scope="module")
+def table():
+    return build_lut(DATA_BITS, AerSimulator(method="matrix_product_state"), batch_size=64)
+
+
+def test_lut_matches_classical(table):
+    modulus = 1 << DATA_BITS
+    assert table.shape == (modulus ** 4, 4) and table.dtype == np.uint8
+    for a, b, c, d in product(range(modulus), repeat=4):
+        expected = classical_block(a, b, c, d, DATA_BITS)
+        row = table[lut_index(a, b, c, d, DATA_BITS)]
+        assert tuple(row) == tuple(expected[key] for key in OUTPUT_KEYS)
+
+
+def test_lut_image_gather(table):
+    rng = np.random.default_rng(3)
+    quant = rng.integers(0, 1 << DATA_BITS, size=(6, 8))
+    bands = lut_transform_image(quant, table, DATA_BITS)
+    blocks = np.stack(
+        [quant[0::2, 0::2], quant[0::2, 1::2], quant[1::2, 0::2], quant[1::2, 1::2]], axis=-1
+    )
+    flat = lut_lookup(blocks.reshape(-1, 4), table, DATA_BITS)
+    for key in OUTPUT_KEYS:
+        assert bands[key].shape == (3, 4)
+        np.testing.assert_array_equal(bands[key].ravel(), flat[key])
+
+
+def test_lut_roundtrip_checks_tags(table, tmp_path):
+    path = tmp_path / "lut.npz"
+    digest = template_hash(DATA_BITS)
+    save_lut(path, table, DATA_BITS, digest)
+
+    np.testing.assert_array_equal(load_lut(path, DATA_BITS, digest), table)
+    with pytest.raises(ValueError):
+        load_lut(path, DATA_BITS + 1)
+    with pytest.raises(ValueError):
+        load_lut(path, DATA_BITS, "0" * 64)
@@ -0,0 +1,37 @@
+"""Tests for the vectorized Max-Plus engine."""
+
+import numpy as np
+
+from image_quantum_experiment import classical_block
+from maxplus_engine import max_plus_bands, quantize, transform_image
+
+
+def test_modular_bands_match_classical_block():
+    rng = np.random.default_rng(7)
+    for data_bits in (2, 4, 6):
+        quant = rng.integers(0, 1 << data_bits, size=(10, 12))
+        bands = max_plus_bands(quant, data_bits)
+        for by in range(5):
+            for bx in range(6):
+                a, b = quant[2 * by, 2 * bx], quant[2 * by, 2 * bx + 1]
+                c, d = quant[2 * by + 1, 2 * bx], quant[2 * by + 1, 2 * bx + 1]
+                expected = classical_block(int(a), int(b), int(c), int(d), data_bits)
+                for key, value in expected.items():
+                    assert bands[key][by, bx] == value
+                assert bands["energy"][by, bx] == expected["res1"] + expected["res2"] + expected["reg_a"]
+
+
+def test_signed_bands_match_floor_halving():
+    rng = np.random.default_rng(11)
+    image = rng.integers(0, 256, size=(9, 7), dtype=np.uint8)  # odd edges are dropped
+    quant = quantize(image, 4)
+    bands = transform_image(image, 4, modular=False)
+    assert bands["energy"].shape == (4, 3)
+    for by in range(4):
+        for bx in range(3):
+            a, b, c, d = (int(v) for v in quant[2 * by : 2 * by + 2, 2 * bx : 2 * bx + 2].ravel())
+            res1, res2 = ((a - b) + (c - d)) // 2, ((a - b) - (c - d)) // 2
+            reg_a, reg_d = ((a + b) - (c + d)) // 2, min(a, b, c, d)
+            assert (bands["res1"][by, bx], bands["res2"][by, bx]) == (res1, res2)
+            assert (bands["reg_a"][by, bx], bands["reg_d"][by, bx]) == (reg_a, reg_d)
+            assert bands["energy"][by, bx] == abs(res1) + abs(res2) + abs(reg_a)
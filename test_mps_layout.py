@@ -0,0 +1,67 @@
+"""Tests for the MPS qubit layout pass and the MPS log telemetry."""
+
+from qiskit import QuantumCircuit
+from qiskit_aer import AerSimulator
+
+from main_round import ArithmeticParams, RoundingTemplate, build_rounding_circuit
+from mps_layout import (
+    MPSLogReader,
+    apply_layout,
+    interaction_sequence,
+    mps_swap_count,
+    optimize_layout,
+    parse_mps_log,
+)
+from test_rounding import expected_outputs
+
+
+def test_swap_model_matches_aer_log():
+    qc = QuantumCircuit(8)
+    qc.cx(0, 5)
+    qc.cx(1, 6)
+    qc.cx(7, 2)
+    qc.ccx(0, 4, 7)
+    qc.cswap(3, 0, 6)
+    qc.measure_all()
+    simulator = AerSimulator(method="matrix_product_state", mps_log_data=True)
+    reader = MPSLogReader()
+    reader.read(simulator.run(qc, shots=1).result().results[0].metadata)  # skip older logs
+
+    order = [3, 1, 4, 0, 7, 2, 6, 5]
+    reordered = apply_layout(qc, order)
+    stats = reader.read(simulator.run(reordered, shots=1).result().results[0].metadata)
+
+    assert stats["internal_swaps"] == mps_swap_count(interaction_sequence(qc), order)
+    assert stats["gates"] == 5
+    assert stats["max_bond_dimension"] == 1
+
+
+def test_layout_reduces_swaps_and_keeps_outputs():
+    params = ArithmeticParams(data_bits=2)
+    qc = build_rounding_circuit(params, load_inputs=False, fuse_qft=True)
+    sequence = interaction_sequence(qc)
+    order = optimize_layout(qc)
+    assert sorted(order) == list(range(qc.num_qubits))
+    assert mps_swap_count(sequence, order) < mps_swap_count(sequence, range(qc.num_qubits))
+
+    simulator = AerSimulator(method="matrix_product_state")
+    template = RoundingTemplate(2, simulator, mps_layout=True)
+    for block in [(3, 1, 2, 0), (0, 3, 3, 1), (2, 2, 1, 3)]:
+        counts = simulator.run(template.bind(*block), shots=1).result().get_counts()
+        expected = expected_outputs(ArithmeticParams(2, *block))
+        assert template.parse(counts) == expected
+
+
+def test_parse_mps_log_truncation():
+    log = (
+        "{I0:cx on qubits 0,1, BD=[2 1],  discarded_value=0.25, "
+        "internal_swap on qubits 2,1, BD=[4 2],  I1:cp on qubits 1,2, BD=[2 2],  "
+        "discarded_value=0.5, }"
+    )
+    stats = parse_mps_log(log)
+    assert stats["gates"] == 2
+    assert stats["internal_swaps"] == 1
+    assert stats["max_bond_dimension"] == 4
+    assert stats["truncations"] == 2
+    assert stats["discarded_total"] == 0.75
+    assert stats["discarded_max"] == 0.5
@@ -0,0 +1,51 @@
+"""Tests for the IQFT/QFT peephole pass."""
+
+from qiskit import QuantumCircuit, transpile
+from qiskit.quantum_info import Operator
+from qiskit_aer import AerSimulator
+
+from approximation_report import fusion_savings
+from main_round import ArithmeticParams, add_output_measurements, build_rounding_circuit
+from peephole import cancel_qft_pairs, optimize_adders, unwrap_adders
+from qmadd_gate import build_qmadd_gate
+from qmsub_gate import build_qmsub_gate
+from qquantum_module import qft
+
+
+def test_back_to_back_adders_share_one_qft_round_trip():
+    n = 3
+    qc = QuantumCircuit(3 * n)
+    qc.append(build_qmsub_gate(n), [*range(n), *range(n, 2 * n)])
+    qc.append(build_qmadd_gate(n), [*range(n), *range(2 * n, 3 * n)])
+    fused, removed = optimize_adders(qc)
+    assert removed == 1
+    assert fused.count_ops()["QFT"] == 1
+    assert Operator(fused).equiv(Operator(qc))
+
+
+def test_pairs_separated_by_other_gates_are_kept():
+    qc = QuantumCircuit(3)
+    qc.append(qft(3).inverse(), range(3))
+    qc.x(1)
+    qc.append(qft(3), range(3))
+    assert cancel_qft_pairs(qc)[1] == 0
+    assert cancel_qft_pairs(unwrap_adders(qc))[1] == 0
+
+
+def test_fused_pipeline_output_unchanged():
+    simulator = AerSimulator(method="matrix_product_state")
+    for a, b, c, d in [(3, 1, 2, 0), (0, 3, 3, 1), (2, 2, 1, 3)]:
+        params = ArithmeticParams(data_bits=2, a=a, b=b, c=c, d=d)
+        counts = []
+        for fuse_qft in (False, True):
+            qc = build_rounding_circuit(params, fuse_qft=fuse_qft)
+            add_output_measurements(qc)
+            result = simulator.run(transpile(qc, simulator), shots=16).result()
+            counts.append(result.get_counts())
+        assert counts[0] == counts[1] and len(counts[0]) == 1
+
+
+def test_fusion_savings_reported():
+    report = fusion_savings(4)
+    assert report["saved"]["gates"] > 0 and report["saved"]["depth"] > 0
+    assert report["before"]["gates"] - report["after"]["gates"] == report["saved"]["gates"]
@@ -0,0 +1,68 @@
+"""Tests for the basis-state permutation backend."""
+
+from itertools import product
+
+import pytest
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister, transpile
+from qiskit_aer import AerSimulator
+
+from c_qmsub_gate import build_c_qmsub_gate
+from image_quantum_experiment import simulate_block
+from main_round import ArithmeticParams, add_output_measurements, build_rounding_circuit
+from permutation_backend import (
+    NonPermutationError,
+    basis_counts,
+    get_permutation_template,
+    simulate_block_basis,
+)
+from qmadd_gate import build_qmadd_gate
+from verify_all_inputs import classical_reference
+
+
+def test_counts_match_aer_for_arithmetic_blocks():
+    n = 3
+    comp = QuantumRegister(1, "comp")
+    t = QuantumRegister(n, "t")
+    c = QuantumRegister(n, "c")
+    qc = QuantumCircuit(comp, t, c, ClassicalRegister(1, "m0"), ClassicalRegister(2 * n, "m1"))
+    qc.x([t[0], t[2], c[1]])
+    qc.append(build_qmadd_gate(n), [*t, *c])
+    qc.cswap(t[0], c[0], c[2])
+    qc.append(build_c_qmsub_gate(n), [comp[0], *t, *c])
+    qc.ccx(comp[0], t[1], c[0])
+    qc.measure(comp, qc.cregs[0])
+    qc.measure([*t, *c], qc.cregs[1])
+
+    simulator = AerSimulator()
+    expected = simulator.run(transpile(qc, simulator), shots=1).result().get_counts()
+    assert basis_counts(qc) == expected
+
+
+def test_template_matches_classical_reference():
+    template = get_permutation_template(4)
+    for block in product(range(0, 16, 3), repeat=4):
+        assert template.run(*block) == classical_reference(*block)
+
+
+def test_templates_are_cached_per_adder():
+    qft_template = get_permutation_template(2)
+    ripple_template = get_permutation_template(2, adder="ripple")
+    assert ripple_template is not qft_template
+    assert ripple_template.params.adder == "ripple"
+    assert get_permutation_template(2, adder="ripple") is ripple_template
+    assert get_permutation_template(2, approximation_degree=1) is None  # not a permutation
+
+
+def test_output_format_matches_simulate_block():
+    simulator = AerSimulator(method="matrix_product_state")
+    for block in [(7, 2, 5, 1), (0, 15, 9, 9)]:
+        assert simulate_block_basis(*block, 4) == simulate_block(*block, 4, simulator, 1)
+
+
+def test_non_permutation_gates_are_rejected():
+    params = ArithmeticParams()
+    qc = build_rounding_circuit(params)
+    add_output_measurements(qc)
+    qc.h(0)
+    with pytest.raises(NonPermutationError):
+        basis_counts(qc)
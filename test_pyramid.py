@@ -0,0 +1,68 @@
+"""Tests for the multi-level Haar pyramid."""
+
+import numpy as np
+from qiskit_aer import AerSimulator
+
+from maxplus_engine import max_plus_bands
+import pyramid
+from pyramid import classical_engine, decompose, level_report, pack_bands, quantum_engine
+
+
+def test_levels_feed_reg_d_back():
+    rng = np.random.default_rng(2)
+    quant = rng.integers(0, 16, size=(16, 12))
+    levels = decompose(quant, levels=5, engine=classical_engine(4))
+
+    assert [level.bands["reg_d"].shape for level in levels] == [(8, 6), (4, 3), (2, 1)]
+    assert [level.blocks for level in levels] == [48, 12, 2]
+    previous = quant
+    for level in levels:
+        expected = max_plus_bands(previous, 4)
+        for key, band in level.bands.items():
+            np.testing.assert_array_equal(band, expected[key])
+        previous = level.bands["reg_d"]
+
+
+def test_pack_bands_layout():
+    quant = np.arange(64).reshape(8, 8) % 16
+    levels = decompose(quant, levels=2, engine=classical_engine(4))
+    packed = pack_bands(levels)
+
+    assert packed.shape == (8, 8)
+    np.testing.assert_array_equal(packed[:4, 4:], levels[0].bands["res1"])
+    np.testing.assert_array_equal(packed[4:, :4], levels[0].bands["res2"])
+    np.testing.assert_array_equal(packed[4:, 4:], levels[0].bands["reg_a"])
+    np.testing.assert_array_equal(packed[:2, 2:4], levels[1].bands["res1"])
+    np.testing.assert_array_equal(packed[:2, :2], levels[1].bands["reg_d"])
+
+
+def test_quantum_engine_matches_classical_per_level():
+    rng = np.random.default_rng(4)
+    quant = rng.integers(0, 4, size=(4, 4))
+    simulator = AerSimulator(method="matrix_product_state")
+    quantum = decompose(quant, levels=2, engine=quantum_engine(2, simulator))
+    classical = decompose(quant, levels=2, engine=classical_engine(2))
+
+    for q_level, c_level in zip(quantum, classical):
+        for key, band in q_level.bands.items():
+            np.testing.assert_array_equal(band, c_level.bands[key])
+
+
+def test_level_report_builds_template_only_for_quantum(monkeypatch):
+    levels = decompose(np.zeros((4, 4), dtype=int), levels=2, engine=classical_engine(2))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("template built for a classical report")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(pyramid, "get_rounding_template", fail)
+        patch.setattr(pyramid, "AerSimulator", fail)
+        report = level_report(levels, 2, "classical")
+    assert [entry["blocks"] for entry in report] == [4, 1]
+    assert all("quantum_cost" not in entry for entry in report)
+
+    report = level_report(levels, 2, "quantum", AerSimulator(method="matrix_product_state"))
+    assert [entry["quantum_cost"]["total_gates"] for entry in report] == [
+        4 * report[0]["quantum_cost"]["gates_per_circuit"],
+        report[0]["quantum_cost"]["gates_per_circuit"],
+    ]
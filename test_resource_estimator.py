@@ -0,0 +1,120 @@
+"""Tests for the analytical resource estimator against built circuits."""
+
+from collections import Counter
+
+import numpy as np
+import pytest
+from qiskit import transpile
+
+from main_round import ArithmeticParams, build_rounding_circuit, pipeline_stages
+from peephole import DECOMPOSED_BASIS
+from qquantum_module import iqft, madd, qft
+from resource_estimator import (
+    GATE_TIMES_US,
+    estimate_resources,
+    madd_counts,
+    madd_latency,
+    qft_counts,
+    qft_latency,
+)
+
+SLOW_H_TIMES = {**GATE_TIMES_US, "h": 1.0, "cp": 0.2, "x": 0.7}
+
+
+def _expand(operation, qubits):
+    if operation.name == "barrier" or operation.name in DECOMPOSED_BASIS:
+        yield operation.name, qubits
+        return
+    definition = operation.definition
+    for instruction in definition.data:
+        inner = tuple(qubits[definition.find_bit(qubit).index] for qubit in instruction.qubits)
+        yield from _expand(instruction.operation, inner)
+
+
+def circuit_gates(qc):
+    """``qc`` as ``(gate, qubit indices)`` in ``DECOMPOSED_BASIS``, stage by stage."""
+    gates = []
+    for _, stage in pipeline_stages(qc):
+        for instruction in stage.data:
+            qubits = tuple(stage.find_bit(qubit).index for qubit in instruction.qubits)
+            gates.extend(_expand(instruction.operation, qubits))
+    return gates
+
+
+def schedule(gates, times):
+    """Gate-by-gate ASAP critical path; barriers align their qubits for free."""
+    times = {**times, "barrier": 0.0}
+    finish = {}
+    for name, qubits in gates:
+        end = times[name] + max(finish.get(qubit, 0.0) for qubit in qubits)
+        finish.update({qubit: end for qubit in qubits})
+    return max(finish.values())
+
+
+def block_latency(block, times):
+    """Latency matrix of ``block`` from one gate-level schedule per input qubit."""
+    gates = list(_expand(block, tuple(range(block.num_qubits))))
+    latency = np.full((block.num_qubits, block.num_qubits), -np.inf)
+    for source in range(block.num_qubits):
+        finish = {source: 0.0}
+        for name, qubits in gates:
+            starts = [finish[qubit] for qubit in qubits if qubit in finish]
+            if starts:
+                finish.update({qubit: max(starts) + times[name] for qubit in qubits})
+        for target, end in finish.items():
+            latency[source, target] = end
+    return latency
+
+
+@pytest.mark.parametrize(
+    "adder,degree,fuse",
+    [("qft", 0, True), ("qft", 0, False), ("qft", 1, True), ("qft", 5, True), ("ripple", 0, True)],
+)
+@pytest.mark.parametrize("data_bits", [1, 2, 4])
+def test_estimate_matches_built_circuit(adder, degree, fuse, data_bits):
+    params = ArithmeticParams(data_bits=data_bits, adder=adder, approximation_degree=degree)
+    qc = build_rounding_circuit(params, load_inputs=False, fuse_qft=fuse)
+    decomposed = transpile(qc, basis_gates=DECOMPOSED_BASIS, optimization_level=0)
+    gates = {name: count for name, count in decomposed.count_ops().items() if name != "barrier"}
+
+    estimate = estimate_resources(data_bits, degree, adder, fuse)
+
+    assert estimate.qubits == qc.num_qubits
+    assert estimate.gates == gates
+    assert estimate.depth == decomposed.depth(lambda inst: inst.operation.name != "barrier")
+    sequence = circuit_gates(qc)
+    assert estimate.duration_us == pytest.approx(schedule(sequence, GATE_TIMES_US))
+    slow_h = estimate_resources(data_bits, degree, adder, fuse, SLOW_H_TIMES)
+    assert slow_h.duration_us == pytest.approx(schedule(sequence, SLOW_H_TIMES))
+
+
+@pytest.mark.parametrize("n", [1, 3, 5])
+def test_block_counts_for_every_approximation_degree(n):
+    for degree in range(n + 1):
+        for counts, block in [
+            (qft_counts(n, degree), qft(n, degree)),
+            (qft_counts(n, degree), iqft(n, degree)),
+            (madd_counts(n, degree), madd(n, approximation_degree=degree)),
+            (madd_counts(n, degree), madd(n, is_inverse=True, approximation_degree=degree)),
+        ]:
+            built = transpile(block.definition, basis_gates=DECOMPOSED_BASIS, optimization_level=0)
+            assert counts == Counter(built.count_ops()), (block.name, degree)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 6])
+def test_block_latency_is_the_longest_path(n):
+    for degree in range(n + 1):
+        for times in (GATE_TIMES_US, SLOW_H_TIMES):
+            h, cp = times["h"], times["cp"]
+            expected = qft_latency(n, degree, h, cp)
+            np.testing.assert_allclose(block_latency(qft(n, degree), times), expected)
+            np.testing.assert_allclose(block_latency(iqft(n, degree), times), expected.T)
+            np.testing.assert_allclose(
+                block_latency(madd(n, approximation_degree=degree), times),
+                madd_latency(n, degree, cp),
+            )
+
+
+def test_depth_is_linear_without_building_circuits():
+    for bits in (8, 16, 32, 64):
+        assert estimate_resources(bits).depth == 32 * (bits + 1) - 5
@@ -1,61 +1,156 @@
 """Tests for the rounded arithmetic circuit."""
 
-from main_round import ArithmeticParams, build_rounding_circuit
-from qiskit import ClassicalRegister, transpile
+from types import SimpleNamespace
+
+import pytest
+
+import main_round
+from main_round import (
+    OUTPUT_KEYS,
+    ArithmeticParams,
+    add_output_measurements,
+    build_rounding_circuit,
+    RegisterView,
+    build_packed_rounding_circuit,
+    get_rounding_template,
+    logical_qubits,
+    parse_measurement,
+    parse_packed_measurement,
+    simulate_blocks,
+    tune_pack_size,
+)
+from qiskit import QuantumRegister, transpile
 from qiskit_aer import AerSimulator
+from shot_free import NotBasisStateError
 
 
-def parse_counts(counts, cr_names, mask):
-    """Return masked tuple (a_round, d, res1_round, res2_round)."""
-    (bitstring, _) = max(counts.items(), key=lambda item: item[1])
-    parts = bitstring.split(" ")[::-1]
-    if len(parts) != len(cr_names):
-        raise AssertionError("Unexpected measurement format")
-    values = [int(bits, 2) & mask for bits in parts]
-    return tuple(values)
+def expected_outputs(params):
+    exp_res1 = ((params.a - params.b + params.c - params.d) % params.modulus) // 2
+    exp_res2 = ((params.a - params.b - (params.c - params.d)) % params.modulus) // 2
+    exp_reg_a = ((params.a + params.b - params.c - params.d) % params.modulus) // 2
+    exp_min = min(params.a, params.b, params.c, params.d)
+    return (exp_reg_a, exp_min, exp_res1, exp_res2)
 
 
 def test_rounding_default():
     params = ArithmeticParams()
-    qc = build_rounding_circuit(params)
+    simulator = AerSimulator(method="matrix_product_state")
+    template = get_rounding_template(params.data_bits, simulator)
+
+    bound = template.bind(params.a, params.b, params.c, params.d)
+    result = simulator.run(bound, shots=2048).result()
+    values = template.parse(result.get_counts())
+
+    assert values == expected_outputs(params)
 
-    n = params.arith_bits
 
-    cr_a = ClassicalRegister(n, "c_a")
-    cr_d = ClassicalRegister(n, "c_d")
-    cr_res1 = ClassicalRegister(n, "c_res1")
-    cr_res2 = ClassicalRegister(n, "c_res2")
+def test_template_matches_direct_build():
+    simulator = AerSimulator(method="matrix_product_state")
+    template = get_rounding_template(4, simulator)
+    assert get_rounding_template(4, simulator) is template
+
+    for a, b, c, d in [(0, 0, 0, 0), (15, 3, 9, 12), (4, 11, 2, 14)]:
+        params = ArithmeticParams(data_bits=4, a=a, b=b, c=c, d=d)
+        qc = build_rounding_circuit(params)
+        add_output_measurements(qc)
+        transpiled = transpile(qc, simulator, optimization_level=0)
+        direct = simulator.run(transpiled, shots=1).result().get_counts()
+        bound = simulator.run(template.bind(a, b, c, d), shots=1).result().get_counts()
 
-    reg_a = next(reg for reg in qc.qregs if reg.name == "a")
-    reg_d = next(reg for reg in qc.qregs if reg.name == "d")
-    res1 = next(reg for reg in qc.qregs if reg.name == "res1")
-    res2 = next(reg for reg in qc.qregs if reg.name == "res2")
+        assert bound == direct
+        assert parse_measurement(next(iter(direct)), params.modulus) == expected_outputs(params)
 
-    qc.add_register(cr_a, cr_d, cr_res1, cr_res2)
-    qc.measure(reg_a, cr_a)
-    qc.measure(reg_d, cr_d)
-    qc.measure(res1, cr_res1)
-    qc.measure(res2, cr_res2)
 
+def test_simulate_blocks_chunked():
     simulator = AerSimulator(method="matrix_product_state")
-    transpiled = transpile(qc, simulator, optimization_level=0)
-    result = simulator.run(transpiled, shots=2048).result()
-    mask = params.modulus - 1
-    values = parse_counts(
-        result.get_counts(transpiled),
-        [cr_a.name, cr_d.name, cr_res1.name, cr_res2.name],
-        mask,
-    )
+    blocks = [(7, 2, 5, 1), (0, 15, 15, 0), (3, 3, 3, 3), (9, 1, 12, 6), (1, 14, 8, 2)]
 
-    exp_res1 = ((params.a - params.b + params.c - params.d) % params.modulus) // 2
-    exp_res2 = ((params.a - params.b - (params.c - params.d)) % params.modulus) // 2
-    exp_reg_a = ((params.a + params.b - params.c - params.d) % params.modulus) // 2
-    exp_min = min(params.a, params.b, params.c, params.d)
+    outputs = simulate_blocks(blocks, 4, simulator, shots=1, chunk_size=2)
+
+    assert len(outputs) == len(blocks)
+    for (a, b, c, d), values in zip(blocks, outputs):
+        params = ArithmeticParams(data_bits=4, a=a, b=b, c=c, d=d)
+        assert tuple(values[key] for key in OUTPUT_KEYS) == expected_outputs(params)
+
+
+def test_register_view_relabels_without_gates():
+    reg, spill = QuantumRegister(3, "r"), QuantumRegister(1, "s")
+    view = RegisterView(reg, spill)
+    assert view.shift_right("r", "s") == [reg[1], reg[2], spill[0]]
+    assert view["s"] == [reg[0]]
+    assert view.shift_left("r", "s") == list(reg)
+    assert view["s"] == [spill[0]]
 
-    assert values == (exp_reg_a, exp_min, exp_res1, exp_res2)
+    qc = build_rounding_circuit(ArithmeticParams(data_bits=4), fuse_qft=True)
+    assert "swap" not in qc.count_ops()
+    layout = qc.metadata["logical_registers"]
+    assert logical_qubits(qc, "res1") == [qc.qubits[i] for i in layout["res1"]]
+    assert logical_qubits(qc, "res1")[0] != next(r for r in qc.qregs if r.name == "res1")[0]
+
+
+def test_packed_blocks_match_single_blocks():
+    simulator = AerSimulator(method="matrix_product_state")
+    blocks = [(7, 2, 5, 1), (0, 15, 15, 0), (3, 3, 3, 3), (9, 1, 12, 6), (1, 14, 8, 2)]
+    expected = [
+        expected_outputs(ArithmeticParams(data_bits=4, a=a, b=b, c=c, d=d))
+        for a, b, c, d in blocks
+    ]
+
+    for shots in (0, 1):
+        outputs = simulate_blocks(blocks, 4, simulator, shots, chunk_size=4, pack_size=3)
+        assert [tuple(values[key] for key in OUTPUT_KEYS) for values in outputs] == expected
+
+    packed = build_packed_rounding_circuit(ArithmeticParams(data_bits=2), 2, fuse_qft=True)
+    names = [reg.name for reg in packed.cregs]
+    assert names[:5] == ["c_a_0", "c_d_0", "c_res1_0", "c_res2_0", "c_a_1"]
+    slots = parse_packed_measurement("01 10 11 00 11 10 01 00", 4, 2)
+    assert slots == [(0, 1, 2, 3), (0, 3, 2, 1)]
+
+
+def test_tune_pack_size_picks_the_fastest_candidate(monkeypatch):
+    cost = {1: 5.0, 2: 1.0, 4: 3.0}  # seconds per timed run of each pack size
+    clock, runs = [0.0], []
+
+    def fake_simulate_blocks(blocks, data_bits, simulator, shots, chunk_size, adder, pack_size,
+                             *args):
+        runs.append(pack_size)
+        clock[0] += cost[pack_size]
+
+    monkeypatch.setattr(main_round, "_PACK_SIZES", {})
+    monkeypatch.setattr(main_round, "simulate_blocks", fake_simulate_blocks)
+    monkeypatch.setattr(main_round, "time", SimpleNamespace(perf_counter=lambda: clock[0]))
+    simulator = AerSimulator(method="matrix_product_state")
+    assert tune_pack_size(2, simulator, 0, candidates=(1, 2, 4)) == 2
+    assert runs == [1, 1, 2, 2, 4, 4]  # warm-up and timed run per candidate
+    assert tune_pack_size(2, simulator, 0, candidates=(1, 2, 4)) == 2 and len(runs) == 6
+    cost[4] = 0.5
+    assert tune_pack_size(2, simulator, 1, candidates=(1, 2, 4)) == 4  # new setup, re-timed
+
+
+def test_tuned_pack_size_matches_unpacked():
+    simulator = AerSimulator(method="matrix_product_state")
+    blocks = [(a, b, 3 - a, b ^ 1) for a in range(4) for b in range(4)]
+    chosen = tune_pack_size(2, simulator, 0, candidates=(1, 2, 4), sample_blocks=4)
+    assert chosen in (1, 2, 4)
+    packed = simulate_blocks(blocks, 2, simulator, 0, pack_size=0)
+    assert packed == simulate_blocks(blocks, 2, simulator, 0, pack_size=1)
+
+
+def test_batches_follow_the_approximation_degree():
+    simulator = AerSimulator(method="matrix_product_state")
+    blocks = [(a, b, c, d) for a in range(4) for b in range(4) for c in range(4) for d in (0, 1)]
+    for pack_size in (1, 2):
+        assert len(simulate_blocks(blocks, 2, simulator, 0, pack_size=pack_size)) == len(blocks)
+        with pytest.raises(NotBasisStateError):  # approximate adders leave superpositions
+            simulate_blocks(blocks, 2, simulator, 0, pack_size=pack_size, approximation_degree=1)
 
 
 if __name__ == "__main__":
     test_rounding_default()
+    test_template_matches_direct_build()
+    test_simulate_blocks_chunked()
+    test_register_view_relabels_without_gates()
+    test_packed_blocks_match_single_blocks()
+    test_tuned_pack_size_matches_unpacked()
+    test_batches_follow_the_approximation_degree()
     print("Rounded circuit test passed.")
-
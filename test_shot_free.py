@@ -0,0 +1,58 @@
+"""Tests for the shot-free readout of basis-state outputs."""
+
+import pytest
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+from qiskit_aer import AerSimulator
+
+from main_round import ArithmeticParams, get_rounding_template, simulate_blocks
+from shot_free import NotBasisStateError, probe_circuit, run_shot_free
+from test_rounding import expected_outputs
+
+
+def test_probed_outcome_matches_sampling():
+    simulator = AerSimulator(method="matrix_product_state")
+    template = get_rounding_template(4, simulator)
+    circuits = [template.bind(*block) for block in [(7, 2, 5, 1), (0, 15, 15, 0), (9, 1, 12, 6)]]
+
+    shot_free = run_shot_free(simulator, circuits)
+    sampled = simulator.run(circuits, shots=8).result()
+
+    for idx, counts in enumerate(shot_free):
+        assert counts == {next(iter(sampled.get_counts(idx))): 1}
+
+
+def test_simulate_blocks_shot_free():
+    simulator = AerSimulator(method="matrix_product_state")
+    blocks = [(7, 2, 5, 1), (3, 3, 3, 3), (1, 14, 8, 2)]
+
+    outputs = simulate_blocks(blocks, 4, simulator, shots=0)
+
+    for (a, b, c, d), values in zip(blocks, outputs):
+        expected = expected_outputs(ArithmeticParams(data_bits=4, a=a, b=b, c=c, d=d))
+        assert tuple(values.values()) == expected
+
+
+def test_superposition_raises_or_falls_back():
+    qr, cr_a, cr_b = QuantumRegister(3), ClassicalRegister(2, "a"), ClassicalRegister(1, "b")
+    qc = QuantumCircuit(qr, cr_a, cr_b)
+    qc.x(0)
+    qc.h(2)
+    qc.measure(qr[0], cr_a[0])
+    qc.measure(qr[1], cr_a[1])
+    qc.measure(qr[2], cr_b[0])
+    simulator = AerSimulator()
+
+    with pytest.raises(NotBasisStateError) as error:
+        run_shot_free(simulator, [qc])
+    assert error.value.purity == pytest.approx(0.5)
+
+    (counts,) = run_shot_free(simulator, [qc], fallback_shots=64)
+    assert sum(counts.values()) == 64
+    assert set(counts) <= {"0 01", "1 01"}
+
+    qc.remove_final_measurements()
+    qc.measure_all()
+    qc.h(2)
+    qc.measure_all(add_bits=False)
+    with pytest.raises(ValueError):
+        probe_circuit(qc)
@@ -0,0 +1,36 @@
+"""Tests for the stage metadata and the per-stage profiler."""
+
+from main_round import ArithmeticParams, build_rounding_circuit, pipeline_stages
+from peephole import circuit_cost, optimize_adders
+from stage_profiler import folded_stacks, profile_pipeline
+
+
+def test_stage_fusion_matches_whole_circuit_fusion():
+    params = ArithmeticParams(data_bits=3)
+    whole, _ = optimize_adders(build_rounding_circuit(params))
+    staged = build_rounding_circuit(params, fuse_qft=True)
+
+    assert circuit_cost(staged) == circuit_cost(whole)
+    names = [name for name, _ in pipeline_stages(staged)]
+    assert names[0] == "load_inputs" and names[-1] == "measure"
+    assert len([name for name in names if name.startswith("stage")]) == 7
+    assert sum(len(piece.data) for _, piece in pipeline_stages(staged)) == len(staged.data)
+
+
+def test_profile_accounts_for_every_gate():
+    params = ArithmeticParams(data_bits=2, a=3, b=1, c=2, d=0)
+    profile = profile_pipeline(params, repeats=1)
+
+    qc = build_rounding_circuit(params, fuse_qft=True)
+    measured = profile["totals"]["gate_total"] - profile["stages"][-1]["gate_total"]
+    assert measured == circuit_cost(qc)["gates"]
+    for stage in profile["stages"]:
+        assert stage["qubits_touched"] <= profile["qubits"]
+        assert sum(stage["gates"].values()) == stage["gate_total"]
+        assert min(stage["simulate_sec"], stage["transpile_sec"], stage["build_sec"]) >= 0
+    assert profile["stages"][-1]["parse_sec"] > 0
+
+    for line in folded_stacks([profile]).splitlines():
+        stack, micros = line.rsplit(" ", 1)
+        assert stack.startswith("rounding_2bit;") and stack.count(";") == 2
+        assert int(micros) > 0
@@ -0,0 +1,66 @@
+"""Tests for the sharded, checkpointed exhaustive verifier."""
+
+import json
+
+import numpy as np
+import pytest
+
+import verify_all_inputs
+from verify_all_inputs import Checkpoint, InputPlan, verify
+
+
+def test_stratified_plan():
+    plan = InputPlan(data_bits=3, samples=100, seed=5, strata=16)
+    assert not plan.exhaustive
+    assert plan.size == 16 * 7
+
+    indices = plan.indices(0, plan.size)
+    assert len(np.unique(indices)) == plan.size
+    width = plan.space // 16
+    assert np.all(np.bincount(indices // width, minlength=16) == 7)
+    np.testing.assert_array_equal(plan.indices(10, 30), indices[10:30])
+    np.testing.assert_array_equal(InputPlan(3, 100, 5, 16).indices(0, plan.size), indices)
+
+    exhaustive = InputPlan(data_bits=1)
+    assert exhaustive.size == 16
+    np.testing.assert_array_equal(exhaustive.indices(3, 7), np.arange(3, 7))
+
+
+def test_checkpoint_pending_ranges():
+    state = Checkpoint(InputPlan(data_bits=1))
+    state.add(4, 6, [])
+    state.add(6, 9, [])
+    state.add(12, 13, [])
+    assert state.done == [[4, 9], [12, 13]]
+    assert state.pending(3) == [(0, 3), (3, 4), (9, 12), (13, 16)]
+
+
+def test_interrupted_run_resumes(tmp_path, monkeypatch):
+    plan = InputPlan(data_bits=1)
+    path = tmp_path / "verify.json"
+    real_range = verify_all_inputs._verify_range
+    calls = []
+
+    def interrupted(*args):
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        calls.append(args)
+        return real_range(*args)
+
+    monkeypatch.setattr(verify_all_inputs, "_verify_range", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        verify(plan, shard_size=5, checkpoint_path=path)
+    assert json.loads(path.read_text())["done"] == [[0, 10]]
+
+    monkeypatch.setattr(verify_all_inputs, "_verify_range", real_range)
+    state = verify(plan, workers=2, shard_size=2, checkpoint_path=path, resume=True)
+    assert state.complete and state.checked == 16
+    assert state.mismatches == []
+
+    with pytest.raises(ValueError):
+        verify(InputPlan(data_bits=2), checkpoint_path=path, resume=True)
+
+
+def test_mps_layout_run_agrees():
+    state = verify(InputPlan(data_bits=1), shard_size=8, mps_layout=True)
+    assert state.complete and state.mismatches == []
@@ -1,90 +1,328 @@
-"""Brute-force verification of the rounded Haar circuit for all 4-bit inputs."""
+"""Brute-force verification of the rounded Haar circuit against the classical reference.
 
-from itertools import product
+The input space of ``data_bits`` (``2**(4*data_bits)`` tuples in ``product``
+order) is split into index ranges that are simulated in-process or across a
+process pool.  Finished ranges and mismatches are checkpointed to JSON every
+``checkpoint_every`` seconds (and on interrupt), so ``--resume`` continues an
+interrupted run.  When the space is larger than ``--max-exhaustive`` the run
+checks a stratified random sample instead: the index space is cut into equal
+strata and the same number of inputs is drawn from each (reproducible per
+seed), so the sample covers the whole range of ``a``.
+"""
 
-from qiskit import ClassicalRegister, transpile
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 from qiskit_aer import AerSimulator
 
-from main_round import ArithmeticParams, build_rounding_circuit
+from bitsliced_verify import classical_reference_arrays, split_inputs
+from main_round import OUTPUT_KEYS, get_rounding_template, iter_block_batches
 
 
 DATA_BITS = 4
-ARITH_BITS = DATA_BITS + 1
-MOD = 1 << DATA_BITS
+BATCH_SIZE = 256  # circuits per simulator.run call
+MAX_EXHAUSTIVE = 1 << 16  # larger input spaces are sampled
+CHECKPOINT_VERSION = 1
 
 
-def _add_measurements(qc):
-    """Attach measurement registers for reg_a, reg_d, res1, res2."""
-    cr_a = ClassicalRegister(ARITH_BITS, "c_a")
-    cr_d = ClassicalRegister(ARITH_BITS, "c_d")
-    cr_res1 = ClassicalRegister(ARITH_BITS, "c_res1")
-    cr_res2 = ClassicalRegister(ARITH_BITS, "c_res2")
+def simulate_quantum(a, b, c, d, simulator, data_bits=DATA_BITS, mps_layout=False):
+    template = get_rounding_template(data_bits, simulator, mps_layout=mps_layout)
+    result = simulator.run(template.bind(a, b, c, d), shots=1).result()
+    counts = result.get_counts()
+    if len(counts) != 1:  # deterministic circuit: single outcome
+        raise AssertionError(f"Unexpected measurement outcomes: {counts}")
+    return template.parse(counts)
 
-    reg_a = next(reg for reg in qc.qregs if reg.name == "a")
-    reg_d = next(reg for reg in qc.qregs if reg.name == "d")
-    res1 = next(reg for reg in qc.qregs if reg.name == "res1")
-    res2 = next(reg for reg in qc.qregs if reg.name == "res2")
 
-    qc.add_register(cr_a, cr_d, cr_res1, cr_res2)
-    qc.measure(reg_a, cr_a)
-    qc.measure(reg_d, cr_d)
-    qc.measure(res1, cr_res1)
-    qc.measure(res2, cr_res2)
+def classical_reference(a, b, c, d, data_bits=DATA_BITS):
+    mod = 1 << data_bits
+    ab = (a - b) % mod
+    cd = (c - d) % mod
+    res1 = ((ab + cd) % mod) // 2
+    res2 = ((ab - cd) % mod) // 2
 
-    return cr_a, cr_d, cr_res1, cr_res2
+    max_ab, min_ab = max(a, b), min(a, b)
+    max_cd, min_cd = max(c, d), min(c, d)
+    reg_a = ((max_ab - max_cd) + (min_ab - min_cd)) % mod
+    reg_a //= 2
+    reg_d = min(min_ab, min_cd)
 
+    return reg_a, reg_d, res1, res2
 
-def _parse_measurement(counts, cr_names):
-    bitstring = next(iter(counts))  # deterministic circuit: single outcome
-    parts = bitstring.split(" ")[::-1]  # reverse to align with add order
-    if len(parts) != len(cr_names):
-        raise AssertionError(f"Unexpected measurement format: {bitstring}")
-    mask = MOD - 1
-    return tuple(int(bits, 2) & mask for bits in parts)
 
+@dataclass(frozen=True)
+class InputPlan:
+    """The input indices to check, addressed by plan position.
 
-def simulate_quantum(a, b, c, d, simulator):
-    params = ArithmeticParams(data_bits=DATA_BITS, a=a, b=b, c=c, d=d)
-    qc = build_rounding_circuit(params)
-    crs = _add_measurements(qc)
-    transpiled = transpile(qc, simulator, optimization_level=0)
-    result = simulator.run(transpiled, shots=1).result()
-    counts = result.get_counts(transpiled)
-    return _parse_measurement(counts, [cr.name for cr in crs])
+    ``samples=0`` is exhaustive (position == input index).  Otherwise the
+    space is cut into ``strata`` equal ranges and ``ceil(samples / strata)``
+    sorted indices are drawn from each with a generator seeded by
+    ``(seed, stratum)``, so any range of positions can be regenerated alone.
+    """
 
+    data_bits: int
+    samples: int = 0
+    seed: int = 0
+    strata: int = 256
 
-def classical_reference(a, b, c, d):
-    ab = (a - b) % MOD
-    cd = (c - d) % MOD
-    res1 = ((ab + cd) % MOD) // 2
-    res2 = ((ab - cd) % MOD) // 2
+    def __post_init__(self):
+        if 4 * self.data_bits > 62:
+            raise ValueError("input indices are int64; data_bits must be <= 15")
 
-    max_ab, min_ab = max(a, b), min(a, b)
-    max_cd, min_cd = max(c, d), min(c, d)
-    reg_a = ((max_ab - max_cd) + (min_ab - min_cd)) % MOD
-    reg_a //= 2
-    reg_d = min(min_ab, min_cd)
+    @property
+    def space(self) -> int:
+        return 1 << (4 * self.data_bits)
 
-    return reg_a, reg_d, res1, res2
+    @property
+    def exhaustive(self) -> bool:
+        return self.samples <= 0 or self.samples >= self.space
 
+    @property
+    def num_strata(self) -> int:
+        return min(self.strata, self.space)
 
-def main():
-    simulator = AerSimulator(method="matrix_product_state")
-    total = MOD ** 4
-    for idx, (a, b, c, d) in enumerate(product(range(MOD), repeat=4), start=1):
-        q_outputs = simulate_quantum(a, b, c, d, simulator)
-        ref_outputs = classical_reference(a, b, c, d)
-        if q_outputs != ref_outputs:
-            raise AssertionError(
-                f"Mismatch for inputs (a={a}, b={b}, c={c}, d={d}): "
-                f"quantum={q_outputs}, classical={ref_outputs}"
+    @property
+    def per_stratum(self) -> int:
+        return min(-(-self.samples // self.num_strata), self.space // self.num_strata)
+
+    @property
+    def size(self) -> int:
+        return self.space if self.exhaustive else self.num_strata * self.per_stratum
+
+    def _stratum(self, stratum: int) -> np.ndarray:
+        low = stratum * self.space // self.num_strata
+        width = (stratum + 1) * self.space // self.num_strata - low
+        rng = np.random.default_rng([self.seed, stratum])
+        if width <= 1 << 20:
+            offsets = rng.choice(width, self.per_stratum, replace=False)
+        else:  # duplicates are negligible in spaces this wide
+            offsets = rng.integers(0, width, self.per_stratum)
+        return low + np.sort(offsets).astype(np.int64)
+
+    def indices(self, start: int, stop: int) -> np.ndarray:
+        if self.exhaustive:
+            return np.arange(start, stop, dtype=np.int64)
+        per = self.per_stratum
+        strata = range(start // per, (stop - 1) // per + 1) if stop > start else range(0)
+        chosen = np.concatenate([self._stratum(s) for s in strata] or [np.zeros(0, np.int64)])
+        first = strata.start * per if strata else start
+        return chosen[start - first : stop - first]
+
+
+@dataclass
+class Checkpoint:
+    """Finished position ranges (merged, sorted) and mismatches of one plan."""
+
+    plan: InputPlan
+    done: List[List[int]] = field(default_factory=list)
+    mismatches: List[Dict] = field(default_factory=list)
+
+    @property
+    def checked(self) -> int:
+        return sum(stop - start for start, stop in self.done)
+
+    @property
+    def complete(self) -> bool:
+        return self.done == [[0, self.plan.size]]
+
+    def add(self, start: int, stop: int, mismatches: List[Dict]):
+        ranges = sorted(self.done + [[start, stop]])
+        merged = [ranges[0]]
+        for low, high in ranges[1:]:
+            if low <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], high)
+            else:
+                merged.append([low, high])
+        self.done = merged
+        self.mismatches.extend(mismatches)
+
+    def pending(self, shard_size: int) -> List[Tuple[int, int]]:
+        """Unfinished position ranges, at most ``shard_size`` long."""
+        gaps, cursor = [], 0
+        for start, stop in self.done + [[self.plan.size, self.plan.size]]:
+            gaps.extend(
+                (low, min(low + shard_size, start)) for low in range(cursor, start, shard_size)
             )
-        if idx % 1000 == 0:
-            print(f"Validated {idx}/{total} combinations...", end="\r")
+            cursor = stop
+        return gaps
+
+    def save(self, path: Path):
+        document = {"version": CHECKPOINT_VERSION, **asdict(self)}
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(document, indent=1))
+        os.replace(tmp, path)  # never leave a half-written checkpoint
+
+    @classmethod
+    def load(cls, path: Path, plan: InputPlan) -> "Checkpoint":
+        document = json.loads(path.read_text())
+        if document.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"{path} has checkpoint version {document.get('version')}")
+        if InputPlan(**document["plan"]) != plan:
+            raise ValueError(f"{path} was written for {document['plan']}, not {asdict(plan)}")
+        return cls(plan, document["done"], document["mismatches"])
+
+
+_WORKER_SIMULATOR: Optional[AerSimulator] = None
+
 
-    print(f"\nAll {total} combinations validated successfully.")
+def _init_worker(data_bits: int, threads: int, mps_layout: bool = False):
+    global _WORKER_SIMULATOR
+    _WORKER_SIMULATOR = AerSimulator(method="matrix_product_state", max_parallel_threads=threads)
+    # warm the template cache
+    get_rounding_template(data_bits, _WORKER_SIMULATOR, mps_layout=mps_layout)
+
+
+def _verify_range(
+    plan: InputPlan, start: int, stop: int, mps_layout: bool = False
+) -> Tuple[int, int, List[Dict]]:
+    """Simulate plan positions ``[start, stop)``; returns them with the mismatches."""
+    if _WORKER_SIMULATOR is None:
+        _init_worker(plan.data_bits, 0, mps_layout)
+    inputs = split_inputs(plan.indices(start, stop), plan.data_bits)
+    blocks = [tuple(int(v) for v in values) for values in zip(*inputs)]
+    expected = np.stack(classical_reference_arrays(*inputs, plan.data_bits), axis=1)
+    quantum = [
+        tuple(outputs[key] for key in OUTPUT_KEYS)
+        for batch in iter_block_batches(
+            blocks,
+            plan.data_bits,
+            _WORKER_SIMULATOR,
+            shots=0,
+            chunk_size=BATCH_SIZE,
+            mps_layout=mps_layout,
+        )
+        for outputs in batch
+    ]
+    mismatches = [
+        {"inputs": list(block), "quantum": list(q_out), "classical": ref.tolist()}
+        for block, q_out, ref in zip(blocks, quantum, expected)
+        if tuple(ref.tolist()) != q_out
+    ]
+    return start, stop, mismatches
+
+
+def verify(
+    plan: InputPlan,
+    workers: int = 1,
+    shard_size: int = 1024,
+    checkpoint_path: Optional[Path] = None,
+    resume: bool = False,
+    checkpoint_every: float = 60.0,
+    verbose: bool = False,
+    mps_layout: bool = False,
+) -> Checkpoint:
+    """Check every pending range of ``plan``; returns the final checkpoint state.
+
+    With ``resume`` the ranges finished in ``checkpoint_path`` are skipped.
+    The checkpoint is written every ``checkpoint_every`` seconds, at the end
+    and when the run is interrupted.  ``mps_layout`` simulates the
+    MPS-reordered circuit, which measures the same outputs.
+    """
+    if resume and checkpoint_path is not None and checkpoint_path.exists():
+        state = Checkpoint.load(checkpoint_path, plan)
+    else:
+        state = Checkpoint(plan)
+    pending = state.pending(shard_size)
+    last_save = time.monotonic()
+
+    def record(start: int, stop: int, mismatches: List[Dict]):
+        nonlocal last_save
+        state.add(start, stop, mismatches)
+        if verbose:
+            print(
+                f"Validated {state.checked}/{plan.size} inputs, "
+                f"{len(state.mismatches)} mismatches...",
+                end="\r",
+            )
+        if checkpoint_path is not None and time.monotonic() - last_save >= checkpoint_every:
+            state.save(checkpoint_path)
+            last_save = time.monotonic()
+
+    pool = None
+    try:
+        if workers > 1 and len(pending) > 1:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            # Forking after Aer has run in this process can deadlock its OpenMP pool.
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(plan.data_bits, threads, mps_layout),
+            )
+            futures = [
+                pool.submit(_verify_range, plan, start, stop, mps_layout) for start, stop in pending
+            ]
+            for future in as_completed(futures):
+                record(*future.result())
+        else:
+            for start, stop in pending:
+                record(*_verify_range(plan, start, stop, mps_layout))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if checkpoint_path is not None:
+            state.save(checkpoint_path)
+        if verbose:
+            print()
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the circuit against the classical reference.")
+    parser.add_argument("--data-bits", type=int, default=DATA_BITS, help="Logical data bits")
+    parser.add_argument(
+        "--max-exhaustive",
+        type=int,
+        default=MAX_EXHAUSTIVE,
+        help="Largest input space checked exhaustively; larger ones are sampled",
+    )
+    parser.add_argument("--samples", type=int, default=0,
+                        help="Stratified sample size (default: --max-exhaustive when sampling)")
+    parser.add_argument("--strata", type=int, default=256, help="Strata of the sampled index space")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (1 = in-process)")
+    parser.add_argument("--shard-size", type=int, default=1024, help="Inputs per work unit")
+    parser.add_argument("--checkpoint", type=str, default=None,
+                        help="Checkpoint path (default: verify_<bits>bit.checkpoint.json)")
+    parser.add_argument("--checkpoint-every", type=float, default=60.0, help="Seconds between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="Skip ranges finished in the checkpoint")
+    parser.add_argument("--mps-layout", action="store_true",
+                        help="Simulate the MPS-reordered circuit (see mps_layout.py)")
+    args = parser.parse_args()
+
+    space = 1 << (4 * args.data_bits)
+    samples = args.samples
+    if space > args.max_exhaustive and not samples:
+        samples = args.max_exhaustive
+    plan = InputPlan(args.data_bits, samples, args.seed, args.strata)
+    if not plan.exhaustive:
+        print(f"Sampling {plan.size} of {space} inputs from {plan.num_strata} strata (seed {plan.seed}).")
+    checkpoint = Path(args.checkpoint or f"verify_{args.data_bits}bit.checkpoint.json")
+
+    state = verify(
+        plan, args.workers, args.shard_size, checkpoint, args.resume, args.checkpoint_every,
+        verbose=True, mps_layout=args.mps_layout,
+    )
+    if state.mismatches:
+        first = state.mismatches[0]
+        raise AssertionError(
+            f"{len(state.mismatches)} mismatches (see {checkpoint}); first for inputs "
+            f"{tuple(first['inputs'])}: quantum={tuple(first['quantum'])}, "
+            f"classical={tuple(first['classical'])}"
+        )
+    kind = "combinations" if plan.exhaustive else "sampled combinations"
+    print(f"All {plan.size} {kind} validated successfully.")
 
 
 if __name__ == "__main__":
     main()
-